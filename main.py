@@ -1,34 +1,176 @@
+import time
+
+# Startup times are measured from here, before the heavy imports
+STARTED = time.perf_counter()
+
 from PyQt5.QtWidgets import (
-                            QMainWindow, QLabel, QVBoxLayout, QWidget, QTableWidget, QTableWidgetItem,
-                            QFileDialog, QApplication, QDialog, QTextEdit)
-from PyQt5.QtGui import QIcon, QFont
-from PyQt5 import uic
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
+                            QMainWindow, QLabel, QVBoxLayout, QWidget, QTableView, QLineEdit,
+                            QFileDialog, QApplication, QDialog, QTextEdit, QShortcut, QActionGroup, QInputDialog)
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QIcon, QFont, QKeySequence
 from typing import Optional
-import xlsxwriter
-import os
 import sys
-import qdarkstyle
-import pandas as pd
-import joblib
-
-
-def load_model(file_path):
-    return joblib.load(file_path)
-
-
-def predict(model, x, R, q, lambda_):
-    input_data = pd.DataFrame([[x, R, q, lambda_]], columns=['x', 'R', 'q', 'lambda'])
-    y_pred = model.predict(input_data)
-    return y_pred[0]
+from mmi.cache import prediction_cache
+from mmi.instrument import instrumentation
+from mmi.core import SECTIONS, QOutOfRangeError, beam_features, get_lambda, model_registry, round_q
+from mmi.engines import ENGINES, default_engine, engine_index, engine_path
+from mmi.results import DISPLAY_COLUMNS, ResultsTable, display_values
+from mmi.ui import setup_ui
+import numpy as np
+
+
+class CalculationSignals(QObject):
+    """Signals a CalculationTask uses to report back to the GUI thread."""
+    finished = pyqtSignal(int, tuple)
+    failed = pyqtSignal(int, str)
+
+
+class CalculationTask(QRunnable):
+    """Compute one alpha value on a worker thread."""
+
+    def __init__(self, job_id: int, length: float, opening_diameter: float, parent_section: str, R: float,
+                 engine: str) -> None:
+        super(CalculationTask, self).__init__()
+        # MainApp keeps a reference so queued tasks can be taken back from the pool
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.inputs = (length, opening_diameter, parent_section, R)
+        self.engine = engine
+        self.model_path = engine_path(engine)
+        self.signals = CalculationSignals()
+        self.cancelled = False
+
+    def run(self) -> None:
+        if self.cancelled:
+            return
+        try:
+            with instrumentation.profile("calculation"):
+                with instrumentation.stage("model_lookup"):
+                    model = model_registry.get(self.model_path)
+                length, opening_diameter, parent_section, R = self.inputs
+                with instrumentation.stage("beam_features"):
+                    x, q, lambda_ = beam_features(length, opening_diameter, parent_section, R)
+                with instrumentation.stage("predict"):
+                    y_predicted = prediction_cache.predict(model, x, R, q, lambda_)
+                if np.isnan(y_predicted):
+                    raise ValueError(f"R, q or lambda is outside the input domain of the {self.engine} engine")
+                instrumentation.count("rows_scored")
+        except QOutOfRangeError as e:
+            self.signals.failed.emit(self.job_id, f"Warning! {e}")
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, f"Error: {e}")
+        else:
+            self.signals.finished.emit(self.job_id, (length, opening_diameter, parent_section, R, x, q, lambda_,
+                                                     y_predicted, self.engine))
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """Table model over a ResultsTable, formatting cells only when the view asks for them.
+
+    Sorting and filtering compute a row order on the NumPy columns; no per-cell Qt objects
+    are ever created, so the view stays fluid with millions of rows.
+    """
+
+    def __init__(self, results: ResultsTable, parent: Optional[QObject] = None) -> None:
+        super(ResultsTableModel, self).__init__(parent)
+        self.results = results
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self.filter_expression = ""
+        # Result rows shown, in display order; None shows every row in insertion order
+        self.order = None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.results) if self.order is None else len(self.order)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(DISPLAY_COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row = index.row() if self.order is None else self.order[index.row()]
+        column, _, decimals = DISPLAY_COLUMNS[index.column()]
+        if decimals is None:
+            return str(display_values(column, self.results.column(column)[row:row + 1])[0])
+        return f"{self.results.column(column)[row]:.{decimals}f}"
+
+    def headerData(self, section: int, orientation: int, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return DISPLAY_COLUMNS[section][1]
+        # Row numbers follow the results, so they stay attached to a row when sorting
+        return str((section if self.order is None else int(self.order[section])) + 1)
+
+    def append_rows(self, columns: dict) -> None:
+        """Append a batch of result rows in a single insert."""
+        count = len(np.atleast_1d(columns["alpha"]))
+        if count == 0:
+            return
+        if self.order is not None:
+            self.results.extend(columns)
+            self.refresh()
+            return
+        first = len(self.results)
+        self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self.results.extend(columns)
+        self.endInsertRows()
+
+    def set_results(self, results: ResultsTable) -> None:
+        """Show another results table, keeping the current sort and filter if it still applies."""
+        self.beginResetModel()
+        self.results = results
+        try:
+            self.order = self.compute_order()
+        except ValueError:
+            self.filter_expression = ""
+            self.order = self.compute_order()
+        self.endResetModel()
+
+    def clear(self) -> None:
+        """Remove every row."""
+        self.beginResetModel()
+        self.results.clear()
+        self.order = self.compute_order()
+        self.endResetModel()
+
+    def sort(self, column: int, order: int = Qt.AscendingOrder) -> None:
+        self.sort_column = column
+        self.sort_order = order
+        self.refresh()
+
+    def set_filter(self, expression: str) -> None:
+        """Show only the rows matching expression (see ResultsTable.filter_mask)."""
+        self.results.filter_mask(expression)
+        self.filter_expression = expression.strip()
+        self.refresh()
+
+    def compute_order(self) -> Optional[np.ndarray]:
+        """Rows to display for the current filter and sort, None when neither is active."""
+        if self.sort_column < 0 and not self.filter_expression:
+            return None
+        order = np.flatnonzero(self.results.filter_mask(self.filter_expression))
+        if self.sort_column >= 0:
+            values = self.results.column(DISPLAY_COLUMNS[self.sort_column][0])[order]
+            if self.sort_order == Qt.DescendingOrder:
+                values = -values
+            order = order[np.argsort(values, kind="stable")]
+        return order
+
+    def refresh(self) -> None:
+        """Recompute the displayed rows after the filter, the sort or the data changed."""
+        self.layoutAboutToBeChanged.emit()
+        self.order = self.compute_order()
+        self.layoutChanged.emit()
 
 
 class MainApp(QMainWindow):
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super(MainApp, self).__init__(parent)
-        uic.loadUi(os.path.join(os.path.dirname(__file__), r"_internal\inertia_calculator.ui"), self)
+        setup_ui(self)
         self.setWindowTitle('Modified Moment of Inertia Calculator')
         self.setWindowIcon(QIcon(r"_internal\alpha.png"))
 
@@ -38,12 +180,35 @@ class MainApp(QMainWindow):
         self.actionExit.triggered.connect(self.close)
         self.actionLicense.triggered.connect(self.show_popup)
         self.actionExport_to_HTML.triggered.connect(self.export_to_html)
+        self.actionSave_Results.triggered.connect(self.save_results)
+        self.actionOpen_Results.triggered.connect(self.open_results)
+        self.actionAppend_Results.triggered.connect(self.append_results)
+        self.actionApply_R.triggered.connect(lambda: self.edit_shown_rows("R", self.comboBox_2.currentText()))
+        self.actionApply_Opening.triggered.connect(lambda: self.edit_shown_rows("d0", self.lineEdit_2.text()))
+        self.actionApply_Section.triggered.connect(
+            lambda: self.edit_shown_rows("section", self.comboBox_3.currentText()))
+        self.actionSolve_Opening.triggered.connect(lambda: self.solve_for("d0"))
+        self.actionSolve_Length.triggered.connect(lambda: self.solve_for("L"))
+        self.actionOptimize_Section.triggered.connect(self.optimize_section)
+        self.initialize_engine_menu()
 
         # Connect buttons
         self.pushButton.clicked.connect(self.inertia_calculator)
         self.pushButton_2.clicked.connect(self.clear_table)
+        QShortcut(QKeySequence(Qt.Key_Escape), self, activated=self.cancel_pending_calculations)
         self.initialize_summary_table()
 
+        # Calculations run on a single worker thread so results keep their submission order
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.pending_tasks = {}
+        self.next_job_id = 0
+        self.last_latency = None
+        self.startup_times = {}
+        self.queue_label = QLabel()
+        self.statusBar().addPermanentWidget(self.queue_label)
+        self.update_queue_label()
+
         # Create a permanent label
         self.permanent_label = QLabel("Yousef A. Sedik ©")
         font = QFont()
@@ -51,496 +216,352 @@ class MainApp(QMainWindow):
         self.permanent_label.setFont(font)
         self.statusBar().addPermanentWidget(self.permanent_label)
 
+    def showEvent(self, event) -> None:
+        """Once the first window is on screen, prewarm the model behind it."""
+        super(MainApp, self).showEvent(event)
+        if "first_window" not in self.startup_times:
+            # A zero timer fires once the event loop has painted the window
+            QTimer.singleShot(0, self.on_first_window)
+
+    def on_first_window(self) -> None:
+        if "first_window" in self.startup_times:
+            return
+        self.record_startup_time("first_window")
+        model_registry.prewarm(engine_path(self.engine))
+
+    def record_startup_time(self, name: str) -> None:
+        """Note the time since launch at which name happened and show it in the status bar."""
+        seconds = time.perf_counter() - STARTED
+        self.startup_times[name] = seconds
+        if instrumentation.enabled:
+            instrumentation.record(f"time_to_{name}", seconds)
+        self.statusBar().showMessage(", ".join(f"Time to {key.replace('_', ' ')}: {value * 1000:.0f} ms"
+                                               for key, value in self.startup_times.items()))
+        if "--startup-report" in sys.argv:
+            print(f"time_to_{name}_ms {seconds * 1000:.1f}", file=sys.stderr)
+
     def initialize_summary_table(self) -> None:
         """Initialize the summary table."""
         self.summary_table_frame = self.findChild(QWidget, "frame")
         self.summary_table_layout = QVBoxLayout(self.summary_table_frame)
-        self.table = QTableWidget(self.summary_table_frame)
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Alpha α", "L/dg", "q", "R", "λ"])
+        self.filter_edit = QLineEdit(self.summary_table_frame)
+        self.filter_edit.setPlaceholderText("Filter, e.g. alpha > 0.9 and section == IPE300")
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        self.summary_table_layout.addWidget(self.filter_edit)
+        self.results = ResultsTable()
+        self.table_model = ResultsTableModel(self.results, self)
+        self.table = QTableView(self.summary_table_frame)
+        self.table.setModel(self.table_model)
+        # Start unsorted, in insertion order, until a header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         self.summary_table_layout.addWidget(self.table)
         self.statusBar().setStyleSheet("color:#bfbfbf")
 
+    def initialize_engine_menu(self) -> None:
+        """Fill the Engine menu with one exclusive entry per inference engine."""
+        self.engine = default_engine()
+        self.engine_group = QActionGroup(self)
+        for name in ENGINES:
+            action = self.menuEngine.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name == self.engine)
+            action.triggered.connect(lambda checked, name=name: self.set_engine(name))
+            self.engine_group.addAction(action)
+
+    def set_engine(self, name: str) -> None:
+        """Use engine name for the next calculations and load it in the background."""
+        self.engine = name
+        model_registry.prewarm(engine_path(name))
+        self.statusBar().showMessage(f"Engine: {name}")
+
     def inertia_calculator(self) -> None:
-        """Perform the inertia calculation and update the table."""
+        """Read the inputs and queue the inertia calculation on the worker thread."""
         try:
-            model_file_path = r'_internal\xgboost_model.pkl'
-            model = load_model(model_file_path)
-
-            # Extract and calculate the necessary values
-            ipe_sections = {
-                "IPE80": {
-                    "area": 7.64,
-                    "weight": 6,
-                    "h": 80,
-                    "b": 46,
-                    "s": 3.8,
-                    "r": 5,
-                    "t": 5.2,
-                    "c": 10.2,
-                    "h-2c": 59,
-                    "Ix": 80.1,
-                    "Sx": 20,
-                    "rx": 3.24,
-                    "Iy": 8.49,
-                    "Sy": 3.69,
-                    "ry": 1.05
-                },
-                "IPE100": {
-                    "area": 10.3,
-                    "weight": 8.1,
-                    "h": 100,
-                    "b": 55,
-                    "s": 4.1,
-                    "r": 7,
-                    "t": 5.7,
-                    "c": 12.7,
-                    "h-2c": 74,
-                    "Ix": 171,
-                    "Sx": 34.2,
-                    "rx": 4.07,
-                    "Iy": 15.9,
-                    "Sy": 5.79,
-                    "ry": 1.24
-                },
-                "IPE120": {
-                    "area": 13.2,
-                    "weight": 10.4,
-                    "h": 120,
-                    "b": 64,
-                    "s": 4.4,
-                    "r": 7,
-                    "t": 6.3,
-                    "c": 13.3,
-                    "h-2c": 93,
-                    "Ix": 318,
-                    "Sx": 53,
-                    "rx": 4.9,
-                    "Iy": 27.7,
-                    "Sy": 8.65,
-                    "ry": 1.45
-                },
-                "IPE140": {
-                    "area": 16.4,
-                    "weight": 12.9,
-                    "h": 140,
-                    "b": 73,
-                    "s": 4.7,
-                    "r": 7,
-                    "t": 6.9,
-                    "c": 13.9,
-                    "h-2c": 112,
-                    "Ix": 541,
-                    "Sx": 77.3,
-                    "rx": 5.74,
-                    "Iy": 44.9,
-                    "Sy": 12.3,
-                    "ry": 1.65
-                },
-                "IPE160": {
-                    "area": 20.1,
-                    "weight": 15.8,
-                    "h": 160,
-                    "b": 82,
-                    "s": 5,
-                    "r": 9,
-                    "t": 7.4,
-                    "c": 16.4,
-                    "h-2c": 127,
-                    "Ix": 869,
-                    "Sx": 109,
-                    "rx": 6.58,
-                    "Iy": 68.3,
-                    "Sy": 16.7,
-                    "ry": 1.84
-                },
-                "IPE180": {
-                    "area": 23.9,
-                    "weight": 18.8,
-                    "h": 180,
-                    "b": 91,
-                    "s": 5.3,
-                    "r": 9,
-                    "t": 8,
-                    "c": 17,
-                    "h-2c": 146,
-                    "Ix": 1320,
-                    "Sx": 146,
-                    "rx": 7.42,
-                    "Iy": 101,
-                    "Sy": 22.2,
-                    "ry": 2.05
-                },
-                "IPE200": {
-                    "area": 28.5,
-                    "weight": 22.4,
-                    "h": 200,
-                    "b": 100,
-                    "s": 5.6,
-                    "r": 12,
-                    "t": 8.5,
-                    "c": 20.5,
-                    "h-2c": 159,
-                    "Ix": 1940,
-                    "Sx": 194,
-                    "rx": 8.26,
-                    "Iy": 142,
-                    "Sy": 28.5,
-                    "ry": 2.24
-                },
-                "IPE220": {
-                    "area": 33.4,
-                    "weight": 26.2,
-                    "h": 220,
-                    "b": 110,
-                    "s": 5.9,
-                    "r": 12,
-                    "t": 9.2,
-                    "c": 21.2,
-                    "h-2c": 177,
-                    "Ix": 2770,
-                    "Sx": 252,
-                    "rx": 9.11,
-                    "Iy": 205,
-                    "Sy": 37.3,
-                    "ry": 2.48
-                },
-                "IPE240": {
-                    "area": 39.1,
-                    "weight": 30.7,
-                    "h": 240,
-                    "b": 120,
-                    "s": 6.2,
-                    "r": 15,
-                    "t": 9.8,
-                    "c": 24.8,
-                    "h-2c": 190,
-                    "Ix": 3890,
-                    "Sx": 324,
-                    "rx": 9.97,
-                    "Iy": 284,
-                    "Sy": 47.3,
-                    "ry": 2.69
-                },
-                "IPE270": {
-                    "area": 45.9,
-                    "weight": 36.1,
-                    "h": 270,
-                    "b": 135,
-                    "s": 6.6,
-                    "r": 15,
-                    "t": 10.2,
-                    "c": 25.2,
-                    "h-2c": 219,
-                    "Ix": 5790,
-                    "Sx": 429,
-                    "rx": 11.2,
-                    "Iy": 420,
-                    "Sy": 62.2,
-                    "ry": 3.02
-                },
-                "IPE300": {
-                    "area": 53.8,
-                    "weight": 42.2,
-                    "h": 300,
-                    "b": 150,
-                    "s": 7.1,
-                    "r": 15,
-                    "t": 10.7,
-                    "c": 25.7,
-                    "h-2c": 248,
-                    "Ix": 8360,
-                    "Sx": 557,
-                    "rx": 12.5,
-                    "Iy": 604,
-                    "Sy": 80.5,
-                    "ry": 3.35
-                },
-                "IPE330": {
-                    "area": 62.6,
-                    "weight": 49.1,
-                    "h": 330,
-                    "b": 160,
-                    "s": 7.5,
-                    "r": 18,
-                    "t": 11.5,
-                    "c": 29.5,
-                    "h-2c": 271,
-                    "Ix": 11770,
-                    "Sx": 713,
-                    "rx": 13.7,
-                    "Iy": 788,
-                    "Sy": 98.5,
-                    "ry": 3.55
-                },
-                "IPE360": {
-                    "area": 72.7,
-                    "weight": 57.1,
-                    "h": 360,
-                    "b": 170,
-                    "s": 8,
-                    "r": 18,
-                    "t": 12.7,
-                    "c": 30.7,
-                    "h-2c": 298,
-                    "Ix": 16270,
-                    "Sx": 904,
-                    "rx": 15,
-                    "Iy": 1040,
-                    "Sy": 123,
-                    "ry": 3.79
-                },
-                "IPE400": {
-                    "area": 84.5,
-                    "weight": 66.3,
-                    "h": 400,
-                    "b": 180,
-                    "s": 8.6,
-                    "r": 21,
-                    "t": 13.5,
-                    "c": 34.5,
-                    "h-2c": 331,
-                    "Ix": 23130,
-                    "Sx": 1160,
-                    "rx": 16.5,
-                    "Iy": 1320,
-                    "Sy": 146,
-                    "ry": 3.95
-                },
-                "IPE450": {
-                    "area": 98.8,
-                    "weight": 77.6,
-                    "h": 450,
-                    "b": 190,
-                    "s": 9.4,
-                    "r": 21,
-                    "t": 14.6,
-                    "c": 35.6,
-                    "h-2c": 378,
-                    "Ix": 33740,
-                    "Sx": 1500,
-                    "rx": 18.5,
-                    "Iy": 1680,
-                    "Sy": 176,
-                    "ry": 4.12
-                },
-                "IPE500": {
-                    "area": 116,
-                    "weight": 90.7,
-                    "h": 500,
-                    "b": 200,
-                    "s": 10.2,
-                    "r": 21,
-                    "t": 16,
-                    "c": 37,
-                    "h-2c": 426,
-                    "Ix": 48200,
-                    "Sx": 1930,
-                    "rx": 20.4,
-                    "Iy": 2140,
-                    "Sy": 214,
-                    "ry": 4.31
-                },
-                "IPE550": {
-                    "area": 134,
-                    "weight": 106,
-                    "h": 550,
-                    "b": 210,
-                    "s": 11.1,
-                    "r": 24,
-                    "t": 17.2,
-                    "c": 41.2,
-                    "h-2c": 467,
-                    "Ix": 67120,
-                    "Sx": 2440,
-                    "rx": 22.3,
-                    "Iy": 2670,
-                    "Sy": 254,
-                    "ry": 4.45
-                },
-                "IPE600": {
-                    "area": 156,
-                    "weight": 122,
-                    "h": 600,
-                    "b": 220,
-                    "s": 12,
-                    "r": 24,
-                    "t": 19,
-                    "c": 43,
-                    "h-2c": 514,
-                    "Ix": 92080,
-                    "Sx": 3070,
-                    "rx": 24.3,
-                    "Iy": 3390,
-                    "Sy": 308,
-                    "ry": 4.66
-                }
-            }
+            # Extract the necessary values
             length = float(self.lineEdit.text())
             opening_diameter = float(self.lineEdit_2.text())
             parent_section = self.comboBox_3.currentText()
-            dimensions = ipe_sections[parent_section]
             R = float(self.comboBox_2.currentText())
-
-            beam_height = dimensions["h"]
-            dg = R * beam_height
-            x = length / dg
-            q = dg / opening_diameter
-
-            if not (1.25 <= q <= 1.75):
-                self.statusBar().showMessage(f"Warning! q is out of range: 1.25 ≤ q ≤ 1.75, q = {q:.3f}")
-                return
-
-            q = self.round_q(q)
-            lambda_ = self.get_lambda(parent_section)
-            y_predicted = predict(model, x, R, q, lambda_)
-
-            # Insert values into the table
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-            self.table.setItem(row_position, 0, QTableWidgetItem(f"{y_predicted:.3f}"))
-            self.table.setItem(row_position, 1, QTableWidgetItem(f"{x:.3f}"))
-            self.table.setItem(row_position, 2, QTableWidgetItem(f"{q:.3f}"))
-            self.table.setItem(row_position, 3, QTableWidgetItem(f"{R:.3f}"))
-            self.table.setItem(row_position, 4, QTableWidgetItem(f"{lambda_:.4f}"))
-
+        except Exception as e:
+            self.statusBar().showMessage(f"Error: {e}")
+            return
+        self.submit_calculation(length, opening_diameter, parent_section, R)
+
+    def submit_calculation(self, length: float, opening_diameter: float, parent_section: str, R: float) -> int:
+        """Queue one calculation and return its job id."""
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        task = CalculationTask(job_id, length, opening_diameter, parent_section, R, self.engine)
+        task.signals.finished.connect(self.on_calculation_finished)
+        task.signals.failed.connect(self.on_calculation_failed)
+        self.pending_tasks[job_id] = (task, time.perf_counter())
+        self.thread_pool.start(task)
+        self.update_queue_label()
+        return job_id
+
+    def cancel_pending_calculations(self) -> None:
+        """Drop every queued calculation and ignore the result of the one running."""
+        for task, _ in self.pending_tasks.values():
+            task.cancelled = True
+            self.thread_pool.tryTake(task)
+        self.pending_tasks.clear()
+        self.update_queue_label()
+
+    def on_calculation_finished(self, job_id: int, result: tuple) -> None:
+        """Insert the result of a finished calculation into the table."""
+        if not self.finish_job(job_id):
+            return
+        length, opening_diameter, parent_section, R, x, q, lambda_, y_predicted, engine = result
+
+        # Insert values into the table
+        with instrumentation.stage("table_insert"):
+            self.table_model.append_rows({
+                "L": length, "d0": opening_diameter, "section_index": SECTIONS.index([parent_section]),
+                "R": R, "x": x, "q": q, "lambda": lambda_, "alpha": y_predicted, "engine_index": engine_index(engine),
+            })
+        if "first_result" not in self.startup_times:
+            self.record_startup_time("first_result")
+
+    def apply_filter(self) -> None:
+        """Filter the table with the expression typed in the filter box."""
+        try:
+            self.table_model.set_filter(self.filter_edit.text())
+            self.statusBar().showMessage(f"{self.table_model.rowCount()} of {len(self.results)} rows shown")
         except Exception as e:
             self.statusBar().showMessage(f"Error: {e}")
 
+    def on_calculation_failed(self, job_id: int, message: str) -> None:
+        """Show the warning or error of a failed calculation."""
+        if self.finish_job(job_id):
+            self.statusBar().showMessage(message)
+
+    def finish_job(self, job_id: int) -> bool:
+        """Forget a finished job and record its latency; False if it was cancelled."""
+        entry = self.pending_tasks.pop(job_id, None)
+        if entry is None:
+            return False
+        self.last_latency = time.perf_counter() - entry[1]
+        self.update_queue_label()
+        return True
+
+    def update_queue_label(self) -> None:
+        """Show the number of queued calculations and the latency of the last one."""
+        latency = "-" if self.last_latency is None else f"{self.last_latency * 1000:.1f} ms"
+        self.queue_label.setText(f"Queue: {len(self.pending_tasks)}   Last: {latency}")
+
     def round_q(self, q: float) -> float:
         """Round the value of q to the nearest acceptable value."""
-        if 0 < q <= 1.25:
-            return 1.25
-        elif 1.25 < q <= 1.35:
-            return 1.35
-        elif 1.35 < q <= 1.45:
-            return 1.45
-        elif 1.45 < q <= 1.55:
-            return 1.55
-        elif 1.55 < q <= 1.65:
-            return 1.65
-        elif 1.65 < q <= 1.75:
-            return 1.75
-        return q
+        return round_q(q)
 
     def get_lambda(self, parent_section: str) -> float:
         """Get lambda value based on the parent section."""
-        section_lambdas = {
-            "IPE80": 0.4878, "IPE100": 0.4878,
-            "IPE120": 0.5238, "IPE140": 0.5238, "IPE160": 0.5238, "IPE180": 0.5238, "IPE200": 0.5238,
-            "IPE220": 0.5499, "IPE240": 0.5499, "IPE270": 0.5499, "IPE300": 0.5499,
-            "IPE330": 0.5857, "IPE360": 0.5857, "IPE400": 0.5857,
-            "IPE450": 0.6789, "IPE500": 0.6789,
-            "IPE550": 0.7378, "IPE600": 0.7378
-        }
-        return section_lambdas.get(parent_section, 0.0)
+        return get_lambda(parent_section)
 
     def clear_table(self) -> None:
-        """Clear the summary table."""
-        self.table.setRowCount(0)
+        """Clear the summary table and cancel the calculations still queued for it."""
+        self.cancel_pending_calculations()
+        self.table_model.clear()
+
+    def closeEvent(self, event) -> None:
+        """Cancel queued calculations and let the running one finish before closing."""
+        self.cancel_pending_calculations()
+        self.thread_pool.waitForDone()
+        super(MainApp, self).closeEvent(event)
 
     def export_to_pdf(self) -> None:
-        """Export the table to a PDF file."""
+        """Export the results to a PDF file."""
         try:
             file_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", "", "PDF files (*.pdf)")
             if file_path:
-                pdf = SimpleDocTemplate(file_path, pagesize=letter)
-                table_data = [["L/dg", "q", "R", "λ", "Alpha α"]]
-
-                for row in range(self.table.rowCount()):
-                    row_data = [
-                        self.table.item(row, column).text() if self.table.item(row, column) else ""
-                        for column in range(self.table.columnCount())
-                    ]
-                    table_data.append(row_data)
-
-                table = Table(table_data)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                pdf.build([table])
+                from mmi.export import export_to_pdf
+
+                with instrumentation.profile("export_pdf"):
+                    export_to_pdf(self.results, file_path)
                 self.statusBar().showMessage(f"Exported to PDF: {file_path}")
         except Exception as e:
             self.statusBar().showMessage(f"Error exporting to PDF: {e}")
 
+    def edit_shown_rows(self, name: str, text: str) -> None:
+        """Set one input of every shown row to the value in its input field and rescore them.
+
+        Only the rows and stages affected by the edit are recomputed. An edit that would
+        leave any row unscored, e.g. with q out of range, is rejected and nothing changes.
+        """
+        from mmi.study import Study
+
+        try:
+            value = text if name == "section" else float(text)
+            if name != "section" and not value > 0:
+                raise ValueError(f"{name} must be a positive number")
+            study = Study.from_results(self.results, engine=self.engine)
+            rows = np.arange(len(self.results)) if self.table_model.order is None else self.table_model.order
+            changed = study.edit(name, value, rows)
+            counts = study.recompute()
+            unscored = int(np.count_nonzero(np.isnan(study.column("alpha"))))
+            if unscored:
+                self.statusBar().showMessage(f"{name} = {text} rejected: {unscored} of the shown rows could not "
+                                             f"be scored (q out of range or unknown section)")
+                return
+            results = study.to_results()
+        except Exception as e:
+            self.statusBar().showMessage(f"Error: {e}")
+            return
+        self.results = results
+        self.table_model.set_results(results)
+        self.statusBar().showMessage(f"{name} = {text} on {changed} rows, {counts['alpha']} rescored")
+
+    def solve_for(self, unknown: str) -> None:
+        """Ask for a target alpha, solve the current inputs for d0 or L and calculate the result.
+
+        The solved value replaces its input field, so the calculated row shows the beam
+        that meets the target.
+        """
+        from mmi.solve import solve_length, solve_opening
+
+        label = "largest opening diameter" if unknown == "d0" else "shortest span"
+        target, accepted = QInputDialog.getDouble(self, "Target Alpha", f"Alpha the {label} must reach:",
+                                                  0.9, 0.0, 1.0, 4)
+        if not accepted:
+            return
+        try:
+            parent_section = self.comboBox_3.currentText()
+            R = float(self.comboBox_2.currentText())
+            if unknown == "d0":
+                result = solve_opening(float(self.lineEdit.text()), parent_section, R, target, engine=self.engine)
+            else:
+                result = solve_length(float(self.lineEdit_2.text()), parent_section, R, target, engine=self.engine)
+        except Exception as e:
+            self.statusBar().showMessage(f"Error: {e}")
+            return
+        status, value = result["status"][0], result[unknown][0]
+        # Round to the field's precision towards the side that still meets the target
+        value = np.floor(value * 10) / 10 if unknown == "d0" else np.ceil(value * 10) / 10
+        if status in ("infeasible", "invalid"):
+            self.statusBar().showMessage(f"No {label} reaches alpha = {target}" if status == "infeasible"
+                                         else "Warning! q is out of range or the section is unknown")
+            return
+        (self.lineEdit_2 if unknown == "d0" else self.lineEdit).setText(f"{value:.1f}")
+        self.inertia_calculator()
+        message = f"{unknown} = {value:.1f} reaches alpha = {result['alpha'][0]:.4f}"
+        if status == "bound":
+            message += " (limit of the valid range)"
+        if unknown == "L":
+            # Alpha is not monotonic in the span, so a longer span may fall below the target again
+            stable = np.ceil(result["L_stable"][0] * 10) / 10
+            if np.isnan(stable):
+                message += "; some longer spans fall below the target"
+            elif stable > value:
+                message += f"; every span from {stable:.1f} on reaches it"
+        self.statusBar().showMessage(message)
+
+    def optimize_section(self) -> None:
+        """Pick the lightest section and R whose modified inertia reaches a required value.
+
+        Every section and R is scored for the current span and opening; the choice is put in
+        the input fields and calculated, and the Pareto front of weight against modified
+        inertia is listed.
+        """
+        from mmi.optimize import optimize_sections
+        from mmi.validate import X_EXTRAPOLATED
+
+        required, accepted = QInputDialog.getDouble(self, "Required Inertia",
+                                                    "Modified moment of inertia to reach (cm^4):",
+                                                    0.0, 0.0, 1e7, 0)
+        if not accepted:
+            return
+        try:
+            result = optimize_sections(float(self.lineEdit.text()), float(self.lineEdit_2.text()), required,
+                                       engine=self.engine)
+        except Exception as e:
+            self.statusBar().showMessage(f"Error: {e}")
+            return
+        candidates = result["candidates"]
+        front = np.flatnonzero(candidates["pareto"][0])
+        lines = [f"{'Section':<10}{'R':>6}{'Weight (kg/m)':>16}{'q':>8}{'Alpha':>10}{'Modified Ix (cm^4)':>22}"]
+        for i in front:
+            marker = "  <- chosen" if candidates["rank"][0, i] == 0 else ""
+            if candidates["reason"][0, i] & X_EXTRAPOLATED:
+                marker += "  (x extrapolated)"
+            lines.append(f"{SECTIONS.names[candidates['section_index'][0, i]]:<10}{candidates['R'][0, i]:>6g}"
+                         f"{candidates['weight'][0, i]:>16.1f}{candidates['q_rounded'][0, i]:>8.2f}"
+                         f"{candidates['alpha'][0, i]:>10.4f}{candidates['inertia'][0, i]:>22.0f}{marker}")
+        if result["section_index"][0] < 0:
+            self.statusBar().showMessage(f"No section reaches {required:g} cm^4 with this span and opening")
+        else:
+            self.comboBox_3.setCurrentText(SECTIONS.names[result["section_index"][0]])
+            self.comboBox_2.setCurrentText(f"{result['R'][0]:g}")
+            self.inertia_calculator()
+            self.statusBar().showMessage(f"Lightest: {self.comboBox_3.currentText()} with R = {result['R'][0]:g}, "
+                                         f"modified Ix {result['inertia'][0]:.0f} cm^4")
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Pareto Front: Weight vs Modified Inertia")
+        layout = QVBoxLayout(dialog)
+        text_edit = QTextEdit(dialog)
+        text_edit.setFont(QFont("Courier New", 10))
+        text_edit.setPlainText("\n".join(lines) if len(front) else "No section can be scored with this opening")
+        text_edit.setReadOnly(True)
+        layout.addWidget(text_edit)
+        dialog.resize(640, 360)
+        dialog.exec_()
+
+    def save_results(self) -> None:
+        """Save the raw results to a results directory that can be reopened later."""
+        try:
+            file_path, _ = QFileDialog.getSaveFileName(self, "Save Results", "", "Results (*.mmires)")
+            if file_path:
+                if not file_path.lower().endswith(".mmires"):
+                    file_path += ".mmires"
+                self.results.save(file_path)
+                self.statusBar().showMessage(f"Saved {len(self.results)} results: {file_path}")
+        except Exception as e:
+            self.statusBar().showMessage(f"Error saving results: {e}")
+
+    def append_results(self) -> None:
+        """Append the results as a new run to an existing results directory."""
+        try:
+            file_path = QFileDialog.getExistingDirectory(self, "Append to Results")
+            if file_path:
+                self.results.save(file_path, append=True)
+                self.statusBar().showMessage(f"Appended {len(self.results)} results: {file_path}")
+        except Exception as e:
+            self.statusBar().showMessage(f"Error appending results: {e}")
+
+    def open_results(self) -> None:
+        """Replace the table with the results of a saved results directory."""
+        try:
+            file_path = QFileDialog.getExistingDirectory(self, "Open Results")
+            if file_path:
+                results = ResultsTable.open(file_path)
+                self.cancel_pending_calculations()
+                self.results = results
+                self.table_model.set_results(results)
+                self.statusBar().showMessage(f"Opened {len(results)} results: {file_path}")
+        except Exception as e:
+            self.statusBar().showMessage(f"Error opening results: {e}")
+
     def export_to_excel(self) -> None:
-        """Export the table to an Excel file with styling."""
+        """Export the results to an Excel file with styling."""
         try:
             file_path, _ = QFileDialog.getSaveFileName(self, "Save Excel", "", "Excel files (*.xlsx)")
             if file_path:
-                workbook = xlsxwriter.Workbook(file_path)
-                worksheet = workbook.add_worksheet()
-
-                # Define some formats
-                header_format = workbook.add_format({
-                    'bold': True, 'bg_color': '#f4cccc', 'border': 1, 'align': 'center'
-                })
-                center_format = workbook.add_format({'align': 'center', 'valign': 'vcenter'})
-
-                # Write headers with styling
-                headers = [self.table.horizontalHeaderItem(i).text() for i in range(self.table.columnCount())]
-                for col, header in enumerate(headers):
-                    worksheet.write(0, col, header, header_format)
-
-                # Write data with styling
-                for row in range(self.table.rowCount()):
-                    for col in range(self.table.columnCount()):
-                        item = self.table.item(row, col)
-                        value = item.text() if item else ''
-                        worksheet.write(row + 1, col, value, center_format)
-
-                # Set column width
-                for col in range(self.table.columnCount()):
-                    worksheet.set_column(col, col, 15)
-
-                workbook.close()
+                from mmi.export import export_to_excel
+
+                with instrumentation.profile("export_excel"):
+                    export_to_excel(self.results, file_path)
                 self.statusBar().showMessage(f"Exported to Excel: {file_path}")
         except Exception as e:
             self.statusBar().showMessage(f"Error exporting to Excel: {e}")
 
     def export_to_html(self) -> None:
-        """Export the table to an HTML file with styling."""
+        """Export the results to an HTML file with styling."""
         try:
             file_path, _ = QFileDialog.getSaveFileName(self, "Save HTML", "", "HTML files (*.html)")
             if file_path:
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write("<html>\n<head>\n")
-                    file.write("<style>\n")
-                    file.write("table { border-collapse: collapse; width: 100%; }\n")
-                    file.write("th, td { border: 1px solid #ddd; padding: 8px; }\n")
-                    file.write("th { background-color: #f2f2f2; color: #333; text-align: center; }\n")
-                    file.write("tr:nth-child(even) { background-color: #f9f9f9; }\n")
-                    file.write("tr:hover { background-color: #f1f1f1; }\n")
-                    file.write("</style>\n</head>\n<body>\n")
-                    file.write("<h1>Table Export</h1>\n")
-                    file.write("<table>\n")
-
-                    # Write table headers
-                    file.write("<thead>\n<tr>\n")
-                    headers = [self.table.horizontalHeaderItem(i).text() for i in range(self.table.columnCount())]
-                    for header in headers:
-                        file.write(f"<th>{header}</th>\n")
-                    file.write("</tr>\n</thead>\n")
-
-                    # Write table data
-                    file.write("<tbody>\n")
-                    for row in range(self.table.rowCount()):
-                        file.write("<tr>\n")
-                        for col in range(self.table.columnCount()):
-                            item = self.table.item(row, col)
-                            value = item.text() if item else ''
-                            file.write(f"<td>{value}</td>\n")
-                        file.write("</tr>\n")
-                    file.write("</tbody>\n</table>\n")
-                    file.write("</body>\n</html>\n")
+                from mmi.export import export_to_html
 
+                with instrumentation.profile("export_html"):
+                    export_to_html(self.results, file_path)
                 self.statusBar().showMessage(f"Exported to HTML: {file_path}")
         except Exception as e:
             self.statusBar().showMessage(f"Error exporting to HTML: {e}")
@@ -612,6 +633,10 @@ Email: waleed.sayed@eng.asu.edu.eg""")
 
 
 if __name__ == "__main__":
+    import qdarkstyle
+
+    # The model is prewarmed once the window is up (MainApp.on_first_window), so loading
+    # it does not compete with building the window
     app = QApplication(sys.argv)
     app.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
     mainWindow = MainApp()
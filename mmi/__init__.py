@@ -0,0 +1 @@
+"""Modified moment of inertia calculator for castellated and cellular IPE beams."""
@@ -0,0 +1,262 @@
+"""Command line entry point, e.g. ``python -m mmi batch input.xlsx -o out.parquet``."""
+import argparse
+import json
+import os
+import sys
+
+from mmi.core import MODEL_FILE_PATH
+from mmi.engines import ENGINES, engine_path
+from mmi.surface import SURFACE_DIRECTORY
+from mmi.ui import COMPILED_UI_PATH, UI_FILE_PATH
+
+
+def _model_path(args) -> str:
+    """Model file given with --model, or the one of --engine."""
+    return args.model or engine_path(args.engine)
+
+
+def _run_batch(args) -> int:
+    from mmi.batch import run_batch
+    from mmi.cache import prediction_cache
+
+    prediction_cache.configure(maxsize=args.cache_size, x_tolerance=args.x_tolerance)
+    summary = run_batch(args.input, args.output, _model_path(args), args.chunksize,
+                        allow_extrapolation=not args.reject_extrapolation)
+    stats = prediction_cache.stats()
+    print(f"Scored {summary['scored']} of {summary['rows']} rows "
+          f"({summary['errors']} errors, {summary['warnings']} warnings) -> {args.output}", file=sys.stderr)
+    flagged = {name: count for name, count in summary["reasons"].items() if count}
+    if flagged:
+        print("Rows flagged: " + ", ".join(f"{count} {name}" for name, count in flagged.items()), file=sys.stderr)
+    print(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions",
+          file=sys.stderr)
+    return 0
+
+
+def _run_precompute(args) -> int:
+    import numpy as np
+
+    from mmi.core import load_model
+    from mmi.surface import AlphaSurface
+
+    x = None if args.x_points is None else np.linspace(args.x_min, args.x_max, args.x_points)
+    surface = AlphaSurface.build(load_model(args.model), x=x)
+    surface.save(args.output)
+    print(f"Surface {surface.values.shape} ({surface.interpolation} interpolation) written to {args.output}, "
+          f"max error vs model {surface.max_error:.3g}", file=sys.stderr)
+    return 0
+
+
+def _run_sweep(args) -> int:
+    from mmi.sweep import SweepGrid, parse_values, run_sweep
+
+    grid = SweepGrid(parse_values(args.length), parse_values(args.opening), args.section,
+                     None if args.R is None else parse_values(args.R))
+    summary = run_sweep(grid, args.output, _model_path(args), args.workers, args.shard_size, args.keep_shards)
+    print(f"Scored {summary['scored']} of {summary['rows']} grid points in {summary['shards']} shards "
+          f"({summary['errors']} errors, {summary['warnings']} warnings) -> {args.output}", file=sys.stderr)
+    flagged = {name: count for name, count in summary["reasons"].items() if count}
+    if flagged:
+        print("Points flagged: " + ", ".join(f"{count} {name}" for name, count in flagged.items()), file=sys.stderr)
+    return 0
+
+
+def _run_bench(args) -> int:
+    from mmi.bench import BASELINE_FILE_PATH, compare, load_report, machine_differences, run_benchmarks, save_report
+
+    try:
+        report = run_benchmarks(_model_path(args), args.batch_sizes, args.export_rows, args.only)
+    except ValueError as e:
+        print(f"mmi bench: error: {e}", file=sys.stderr)
+        return 2
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report, indent=1))
+    for name, result in report["results"].items():
+        print(f"{name:>14}: p50 {result['p50_ms']:10.3f} ms  p99 {result['p99_ms']:10.3f} ms  "
+              f"{result['rows_per_s']:14.0f} rows/s  ({result['runs']} runs)", file=sys.stderr)
+    baseline_path = args.baseline or BASELINE_FILE_PATH
+    if args.save_baseline:
+        save_report(report, baseline_path)
+        print(f"Baseline saved to {baseline_path}", file=sys.stderr)
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; nothing to compare", file=sys.stderr)
+        return 0
+    baseline = load_report(baseline_path)
+    differences = machine_differences(report, baseline)
+    if differences:
+        print(f"Baseline {baseline_path} was recorded with a different {', '.join(differences)}; not comparing. "
+              "Save a baseline on this machine with --save-baseline", file=sys.stderr)
+        return 0
+    regressions = compare(report, baseline, args.tolerance)
+    for name, reference, current in regressions:
+        print(f"REGRESSION {name}: p50 {current:.3f} ms vs baseline {reference:.3f} ms "
+              f"({current / reference - 1:+.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _run_accuracy(args) -> int:
+    from mmi.engines import accuracy_report
+
+    report = accuracy_report(args.engine, args.reference, args.samples, tolerance=args.tolerance)
+    print(json.dumps(report, indent=1))
+    overall = report["overall"]
+    print(f"{args.engine} vs {args.reference}: max |error| {overall['max_abs']:.4g}, RMSE {overall['rmse']:.4g}, "
+          f"{overall['within_tolerance']:.1%} within {args.tolerance}, "
+          f"{report['rows_per_s'] / report['reference_rows_per_s']:.0f}x the reference throughput", file=sys.stderr)
+    return 0
+
+
+def _run_solve(args) -> int:
+    from mmi.solve import run_solve
+
+    summary = run_solve(args.input, args.output, args.unknown, _model_path(args), args.chunksize, args.tolerance)
+    print(f"Solved {sum(summary.values())} rows for {args.unknown}: "
+          + ", ".join(f"{count} {status}" for status, count in summary.items()) + f" -> {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+def _run_serve(args) -> int:
+    from mmi.server import serve
+
+    def ready(server) -> None:
+        print(f"Scoring with the {server.engine} engine on http://{server.host}:{server.port} "
+              f"(batches of up to {server.max_batch} rows, {server.max_wait * 1e3:g} ms max wait)", file=sys.stderr)
+
+    serve(args.host, args.port, args.engine, args.max_batch, args.max_wait_ms / 1e3, ready)
+    return 0
+
+
+def _run_loadtest(args) -> int:
+    from mmi.loadtest import load_test
+
+    report = load_test(args.host, args.port, args.requests, args.concurrency, args.rows, args.engine)
+    print(json.dumps(report, indent=1))
+    print(f"{report['requests_per_s']:.0f} requests/s ({report['rows_per_s']:.0f} rows/s), latency "
+          f"p50 {report['p50_ms']:.2f} ms  p99 {report['p99_ms']:.2f} ms  max {report['max_ms']:.2f} ms, "
+          f"{report['failures']} failures", file=sys.stderr)
+    return 1 if report["failures"] else 0
+
+
+def _run_compile_ui(args) -> int:
+    from mmi.ui import compile_ui
+
+    compile_ui(args.ui, args.output)
+    print(f"{args.ui} compiled to {args.output}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="mmi", description="Modified moment of inertia calculator")
+    parser.add_argument("--instrument", choices=["off", "timing", "profile", "tracemalloc"],
+                        help="record stage timings and counters, optionally with profiling captures")
+    parser.add_argument("--instrument-log", help="rotating log file receiving every stage timing")
+    parser.add_argument("--metrics", help="Prometheus-style text file of the timings and counters, written at exit")
+    parser.add_argument("--profile-dir", help="directory of the profiling captures (default: current directory)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="score a beam schedule from a CSV/XLSX file")
+    batch_parser.add_argument("input", help="CSV or XLSX file with L, d0, section and R columns")
+    batch_parser.add_argument("-o", "--output", required=True, help="Parquet, CSV or .mmires results file to write")
+    batch_parser.add_argument("--model", help="trained model file, overrides --engine")
+    batch_parser.add_argument("--engine", choices=list(ENGINES), help="inference engine, the default engine by default")
+    batch_parser.add_argument("--chunksize", type=int, default=10000, help="rows scored per chunk")
+    batch_parser.add_argument("--cache-size", type=int, default=65536, help="predictions kept in the LRU cache")
+    batch_parser.add_argument("--x-tolerance", type=float, default=1e-6,
+                              help="quantization step of x in cache keys, 0 for exact keys")
+    batch_parser.add_argument("--reject-extrapolation", action="store_true",
+                              help="leave rows whose x is outside the training range unscored")
+    batch_parser.set_defaults(func=_run_batch)
+
+    precompute_parser = subparsers.add_parser("precompute", help="tabulate the model into an alpha surface")
+    precompute_parser.add_argument("-o", "--output", default=SURFACE_DIRECTORY, help="surface directory to write")
+    precompute_parser.add_argument("--model", default=MODEL_FILE_PATH, help="trained model file")
+    precompute_parser.add_argument("--x-points", type=int, help="use a uniform x grid of this many points "
+                                                                "instead of the model's split points")
+    precompute_parser.add_argument("--x-min", type=float, default=0.0, help="start of the uniform x grid")
+    precompute_parser.add_argument("--x-max", type=float, default=60.0, help="end of the uniform x grid")
+    precompute_parser.set_defaults(func=_run_precompute)
+
+    sweep_parser = subparsers.add_parser("sweep", help="score a length x opening x section x R grid in parallel")
+    sweep_parser.add_argument("--length", required=True, help="beam lengths, start:stop:step or a comma list")
+    sweep_parser.add_argument("--opening", required=True, help="opening diameters, start:stop:step or a comma list")
+    sweep_parser.add_argument("--section", nargs="+", help="parent sections, all catalogue sections by default")
+    sweep_parser.add_argument("--R", help="R values, start:stop:step or a comma list (default 1.3,1.4,1.5)")
+    sweep_parser.add_argument("-o", "--output", required=True, help="Parquet, CSV or .mmires results file to write")
+    sweep_parser.add_argument("--model", help="trained model file, overrides --engine")
+    sweep_parser.add_argument("--engine", choices=list(ENGINES), help="inference engine, the default engine by default")
+    sweep_parser.add_argument("--workers", type=int, help="worker processes, one per core by default")
+    sweep_parser.add_argument("--shard-size", type=int, default=1000000, help="grid points per shard")
+    sweep_parser.add_argument("--keep-shards", action="store_true", help="keep the per-shard files")
+    sweep_parser.set_defaults(func=_run_sweep)
+
+    bench_parser = subparsers.add_parser("bench", help="benchmark inference and compare with a stored baseline")
+    bench_parser.add_argument("-o", "--output", help="JSON report to write, printed to stdout by default")
+    bench_parser.add_argument("--model", help="trained model file, overrides --engine")
+    bench_parser.add_argument("--engine", choices=list(ENGINES), help="inference engine, the default engine by default")
+    bench_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 1000, 100000],
+                              help="rows per predict_batch call of the batch benchmarks")
+    bench_parser.add_argument("--export-rows", type=int, default=10000, help="rows written by the export benchmarks")
+    bench_parser.add_argument("--only", nargs="+", help="run only these benchmarks, e.g. batch_1000 export_pdf")
+    bench_parser.add_argument("--baseline", help="baseline report, mmi/data/benchmark_baseline.json by default")
+    bench_parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    bench_parser.add_argument("--tolerance", type=float, default=0.25,
+                              help="fail when a median is this fraction slower than the baseline")
+    bench_parser.set_defaults(func=_run_bench)
+
+    accuracy_parser = subparsers.add_parser("accuracy", help="compare an engine with the reference model")
+    accuracy_parser.add_argument("engine", choices=list(ENGINES), help="engine to check")
+    accuracy_parser.add_argument("--reference", choices=list(ENGINES), default="tree", help="reference engine")
+    accuracy_parser.add_argument("--samples", type=int, default=100000, help="random in-domain inputs compared")
+    accuracy_parser.add_argument("--tolerance", type=float, default=0.005,
+                                 help="absolute alpha error counted as acceptable")
+    accuracy_parser.set_defaults(func=_run_accuracy)
+
+    solve_parser = subparsers.add_parser("solve",
+                                         help="find the largest opening or shortest span reaching a target alpha")
+    solve_parser.add_argument("unknown", choices=["d0", "L"], help="column to solve for")
+    solve_parser.add_argument("input", help="CSV or XLSX file with section, R and target columns, plus L or d0")
+    solve_parser.add_argument("-o", "--output", required=True, help="Parquet, CSV or .mmires results file to write")
+    solve_parser.add_argument("--model", help="trained model file, overrides --engine")
+    solve_parser.add_argument("--engine", choices=list(ENGINES), help="inference engine, the default engine by default")
+    solve_parser.add_argument("--chunksize", type=int, default=10000, help="rows solved per chunk")
+    solve_parser.add_argument("--tolerance", type=float, help="precision of the solution (default 0.1 for d0, 1 for L)")
+    solve_parser.set_defaults(func=_run_solve)
+
+    serve_parser = subparsers.add_parser("serve", help="run the local HTTP/JSON scoring server")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve_parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    serve_parser.add_argument("--engine", choices=list(ENGINES), help="inference engine, the default engine by default")
+    serve_parser.add_argument("--max-batch", type=int, default=8192, help="most rows scored in one model call")
+    serve_parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                              help="how long a batch waits for concurrent requests before it is scored")
+    serve_parser.set_defaults(func=_run_serve)
+
+    loadtest_parser = subparsers.add_parser("loadtest", help="measure the throughput and latency of a running server")
+    loadtest_parser.add_argument("--host", default="127.0.0.1", help="server address")
+    loadtest_parser.add_argument("--port", type=int, default=8765, help="server port")
+    loadtest_parser.add_argument("--requests", type=int, default=10000, help="requests sent in total")
+    loadtest_parser.add_argument("--concurrency", type=int, default=32, help="connections sending at once")
+    loadtest_parser.add_argument("--rows", type=int, default=1, help="beams per request, more than 1 uses /score/batch")
+    loadtest_parser.add_argument("--engine", choices=list(ENGINES), help="engine asked for, the server's by default")
+    loadtest_parser.set_defaults(func=_run_loadtest)
+
+    compile_ui_parser = subparsers.add_parser("compile-ui", help="compile the main window .ui file to Python")
+    compile_ui_parser.add_argument("--ui", default=UI_FILE_PATH, help="Qt Designer file")
+    compile_ui_parser.add_argument("-o", "--output", default=COMPILED_UI_PATH, help="Python module to write")
+    compile_ui_parser.set_defaults(func=_run_compile_ui)
+
+    args = parser.parse_args(argv)
+    if args.instrument or args.instrument_log or args.metrics or args.profile_dir:
+        from mmi.instrument import instrumentation
+
+        instrumentation.configure(args.instrument or ("timing" if not instrumentation.enabled else None),
+                                  args.instrument_log, args.metrics, args.profile_dir)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Headless batch scoring of beam schedules read from CSV or XLSX files.
+
+The input needs the columns ``L`` (beam length, mm), ``d0`` (opening diameter, mm),
+``section`` (parent section, e.g. ``IPE300``) and ``R``. Rows are scored chunk by chunk
+and every chunk is appended to the output as soon as it is ready, so the schedule is
+never held in memory as a whole. Problems are reported per row in the ``error`` and
+``warning`` columns, and as mmi.validate bit flags in the ``reason`` column, instead of
+aborting the run.
+"""
+import os
+
+import numpy as np
+
+from mmi.cache import prediction_cache
+from mmi.core import MODEL_FILE_PATH, SECTIONS, model_registry
+from mmi.engines import engine_index, engine_of
+from mmi.instrument import instrumentation
+from mmi.validate import ERRORS, WARNINGS, reason_counts, reason_messages, validate
+
+
+INPUT_COLUMNS = ["L", "d0", "section", "R"]
+OUTPUT_COLUMNS = INPUT_COLUMNS + ["x", "q", "q_rounded", "lambda", "alpha", "reason", "error", "warning"]
+
+
+def read_schedule(file_path: str, chunksize: int = 10000):
+    """Yield the beam schedule as DataFrames of at most chunksize rows."""
+    import pandas as pd
+
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(file_path, chunksize=chunksize, dtype={"section": str})
+    elif extension in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [str(name).strip() for name in header]
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunksize:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported input format: {extension}")
+
+
+def score_schedule(frame, model, cache=prediction_cache, allow_extrapolation: bool = True):
+    """Score one chunk of the schedule and return it with the derived and result columns.
+
+    Every row is validated in one pass (see mmi.validate). The error and warning columns
+    describe the mmi.validate ERRORS and WARNINGS of every row, as the scoring server does;
+    rows with errors are not scored. Unless allow_extrapolation, an x outside the training
+    range is not scored either and reported as an error.
+    Predictions go through cache, which deduplicates the chunk's model inputs and reuses
+    predictions made for earlier chunks.
+    """
+    import pandas as pd
+
+    missing = [column for column in INPUT_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing input columns: {', '.join(missing)}")
+
+    with instrumentation.stage("batch_features"):
+        validation = validate(pd.to_numeric(frame["L"], errors="coerce").to_numpy(dtype=np.float64),
+                              pd.to_numeric(frame["d0"], errors="coerce").to_numpy(dtype=np.float64),
+                              frame["section"].fillna("").astype(str).str.strip().tolist(),
+                              pd.to_numeric(frame["R"], errors="coerce").to_numpy(dtype=np.float64),
+                              allow_extrapolation, model)
+        valid = validation["valid"]
+        rejected = ERRORS if allow_extrapolation else ERRORS | WARNINGS
+        error = reason_messages(validation, rejected)
+        warning = reason_messages(validation, WARNINGS & ~rejected)
+    alpha = np.full(len(frame), np.nan)
+    if valid.any():
+        with instrumentation.stage("batch_predict"):
+            alpha[valid] = cache.predict_batch(model, validation["x"][valid], validation["R"][valid],
+                                               validation["q_rounded"][valid], validation["lambda"][valid])
+        instrumentation.count("rows_scored", int(np.count_nonzero(valid)))
+
+    with instrumentation.stage("batch_frame"):
+        columns = {name: validation[name] for name in OUTPUT_COLUMNS if name in validation}
+        return pd.DataFrame({**columns, "alpha": alpha, "error": error, "warning": warning}, columns=OUTPUT_COLUMNS)
+
+
+def write_results(chunks, file_path: str, engine: str = None) -> None:
+    """Stream result chunks to a Parquet or CSV file, or to a results directory (.mmires).
+
+    A results directory only keeps the scored rows, with the rounded q the model was
+    evaluated at and the engine that scored them (unknown unless engine is given), and can
+    be opened in the calculator.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".mmires":
+        from mmi.results import append_results, remove_results
+
+        remove_results(file_path)
+        stored_engine = -1 if engine is None else engine_index(engine)
+        for i, chunk in enumerate(chunks):
+            scored = chunk[chunk["alpha"].notna()]
+            with instrumentation.stage("batch_write"):
+                append_results(file_path, {
+                    "L": scored["L"].to_numpy(np.float64), "d0": scored["d0"].to_numpy(np.float64),
+                    "section_index": SECTIONS.index(scored["section"].tolist()),
+                    "R": scored["R"].to_numpy(np.float64), "x": scored["x"].to_numpy(np.float64),
+                    "q": scored["q_rounded"].to_numpy(np.float64), "lambda": scored["lambda"].to_numpy(np.float64),
+                    "alpha": scored["alpha"].to_numpy(np.float64), "engine_index": stored_engine}, new_run=i == 0)
+    elif extension == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                with instrumentation.stage("batch_write"):
+                    if writer is None:
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        writer = pq.ParquetWriter(file_path, table.schema)
+                    else:
+                        table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif extension == ".csv":
+        with open(file_path, "w", encoding="utf-8", newline="") as file:
+            header = True
+            for chunk in chunks:
+                with instrumentation.stage("batch_write"):
+                    chunk.to_csv(file, header=header, index=False)
+                header = False
+    else:
+        raise ValueError(f"Unsupported output format: {extension}")
+
+
+def run_batch(input_path: str, output_path: str, model_path: str = MODEL_FILE_PATH, chunksize: int = 10000,
+              cache=prediction_cache, allow_extrapolation: bool = True) -> dict:
+    """Score the schedule in input_path, write it to output_path and return row and reason counts."""
+    model = model_registry.get(model_path)
+    summary = {"rows": 0, "scored": 0, "errors": 0, "warnings": 0, "reasons": reason_counts(np.zeros(0, np.uint8))}
+
+    def scored_chunks():
+        frames = read_schedule(input_path, chunksize)
+        while True:
+            with instrumentation.stage("batch_read"):
+                frame = next(frames, None)
+            if frame is None:
+                return
+            result = score_schedule(frame, model, cache, allow_extrapolation)
+            for name, count in reason_counts(result["reason"].to_numpy()).items():
+                summary["reasons"][name] += count
+            summary["rows"] += len(result)
+            summary["scored"] += int(result["alpha"].notna().sum())
+            summary["errors"] += int((result["error"] != "").sum())
+            summary["warnings"] += int((result["warning"] != "").sum())
+            yield result
+
+    with instrumentation.profile("batch"):
+        write_results(scored_chunks(), output_path, engine_of(model_path))
+    return summary
@@ -0,0 +1,228 @@
+"""Inference benchmarks with a regression gate against a stored baseline.
+
+Every benchmark times a number of runs and reports the p50 and p99 of the run times and
+the rows scored (or written) per second at the median. A discarded warm-up run comes
+first, and runs stop early once a benchmark's time budget is spent, so the slow cases
+are timed fewer times. Each benchmark runs in a fresh interpreter, so its timings do
+not depend on the heap and caches the benchmarks before it left behind.
+
+Results are plain JSON and record the machine and interpreter they were taken on;
+compare() checks them against a baseline file and lists every benchmark whose median
+got slower by more than the tolerance. Timings from another machine are not comparable,
+so machine_differences() tells whether a baseline applies at all.
+"""
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from mmi.core import MODEL_FILE_PATH, Q_BUCKETS, R_VALUES, SECTIONS, beam_features, load_model, model_registry, \
+    predict, predict_batch
+
+
+BASELINE_FILE_PATH = os.path.join(os.path.dirname(__file__), "data", "benchmark_baseline.json")
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rows per predict_batch call of the batch benchmarks. Every size is timed at least
+# BATCH_MIN_RUNS times within its budget, so a million rows would take minutes per run
+BATCH_SIZES = (1, 1000, 100000)
+BATCH_MIN_RUNS = 5
+EXPORT_FORMATS = (("excel", "xlsx"), ("html", "html"), ("pdf", "pdf"))
+
+
+def _measure(function, rows: int = 1, repeats: int = 100, budget: float = 5.0, warmup: int = 1) -> dict:
+    """Time function repeatedly, after warmup untimed calls, and summarize the run times."""
+    for _ in range(warmup):
+        function()
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeats and (not times or time.perf_counter() - started < budget):
+        t0 = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - t0)
+    times = np.array(times)
+    p50 = float(np.percentile(times, 50))
+    return {"runs": len(times), "rows": rows, "p50_ms": p50 * 1e3, "p99_ms": float(np.percentile(times, 99)) * 1e3,
+            "rows_per_s": rows / p50 if p50 > 0 else float("inf")}
+
+
+def _features(n: int, seed: int = 0) -> tuple:
+    """Random model inputs inside the training domain."""
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(6.86, 26.4, n), rng.choice(R_VALUES, n), rng.choice(Q_BUCKETS, n),
+            SECTIONS.column("lambda")[rng.integers(len(SECTIONS), size=n)])
+
+
+def bench_cold_start(model_path: str = MODEL_FILE_PATH) -> dict:
+    """Fresh interpreter importing mmi.core, loading the model and scoring one row."""
+    code = ("from mmi.core import load_model, predict; "
+            f"predict(load_model({model_path!r}), 10.0, 1.5, 1.45, 0.5499)")
+    return _measure(lambda: subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIRECTORY, check=True), repeats=5,
+                    budget=30)
+
+
+def bench_model_load(model_path: str = MODEL_FILE_PATH) -> dict:
+    """load_model with the file in the page cache."""
+    return _measure(lambda: load_model(model_path), repeats=20)
+
+
+def bench_predict(model) -> dict:
+    """Latency of one uncached predict call."""
+    x, R, q, lambda_ = (column.tolist() for column in _features(1000))
+    calls = iter(range(10 ** 9))
+
+    def call():
+        i = next(calls) % 1000
+        predict(model, x[i], R[i], q[i], lambda_[i])
+
+    return _measure(call, repeats=1000)
+
+
+def bench_batch(model, rows: int) -> dict:
+    """Throughput of one predict_batch call over rows inputs.
+
+    Large batches get a budget for BATCH_MIN_RUNS runs, so their median is not a single
+    run as it would be within the default budget.
+    """
+    features = _features(rows)
+    return _measure(lambda: predict_batch(model, *features), rows,
+                    repeats=min(1000, max(BATCH_MIN_RUNS, 100000 // rows)), budget=30)
+
+
+def bench_end_to_end(model_path: str = MODEL_FILE_PATH) -> dict:
+    """The calculator's path from the four inputs to alpha, without Qt, on an empty cache.
+
+    Makes the same calls as main.CalculationTask.run: registry lookup, beam_features and
+    the prediction cache.
+    """
+    from mmi.cache import PredictionCache
+
+    cache = PredictionCache()
+    lengths = iter(np.linspace(4000, 8000, 100000).tolist())
+
+    def call():
+        model = model_registry.get(model_path)
+        x, q, lambda_ = beam_features(next(lengths), 300.0, "IPE300", 1.5)
+        cache.predict(model, x, 1.5, q, lambda_)
+
+    return _measure(call, repeats=1000)
+
+
+def bench_exports(rows: int = 10000, formats=None) -> dict:
+    """Time to write rows results with each exporter, or with the given ones of EXPORT_FORMATS."""
+    from mmi import export
+    from mmi.results import ResultsTable
+
+    x, R, q, lambda_ = _features(rows)
+    results = ResultsTable(rows)
+    results.extend({"L": x * 450.0, "d0": 300.0, "section_index": SECTIONS.index(["IPE300"]), "R": R, "x": x,
+                    "q": q, "lambda": lambda_, "alpha": np.linspace(0.7, 0.95, rows), "engine_index": 0})
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, extension in EXPORT_FORMATS:
+            if formats is not None and name not in formats:
+                continue
+            exporter = getattr(export, f"export_to_{name}")
+            path = os.path.join(directory, f"results.{extension}")
+            timings[f"export_{name}"] = _measure(lambda: exporter(results, path), rows, repeats=3, budget=10)
+    return timings
+
+
+def benchmark_names(batch_sizes=BATCH_SIZES) -> list:
+    """Names of the benchmarks of the suite, in the order they run."""
+    return (["cold_start", "model_load", "predict"] + [f"batch_{rows}" for rows in batch_sizes] + ["end_to_end"]
+            + [f"export_{name}" for name, _ in EXPORT_FORMATS])
+
+
+def run_benchmark(name: str, model_path: str = MODEL_FILE_PATH, export_rows: int = 10000) -> dict:
+    """Run one benchmark of the suite in this process and return its result."""
+    if name == "cold_start":
+        return bench_cold_start(model_path)
+    if name == "model_load":
+        return bench_model_load(model_path)
+    if name == "predict":
+        return bench_predict(load_model(model_path))
+    if name.startswith("batch_"):
+        return bench_batch(load_model(model_path), int(name[len("batch_"):]))
+    if name == "end_to_end":
+        return bench_end_to_end(model_path)
+    if name.startswith("export_"):
+        return bench_exports(export_rows, [name[len("export_"):]])[name]
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def _run_isolated(name: str, model_path: str, export_rows: int) -> dict:
+    """run_benchmark in a fresh interpreter; its result comes back as JSON on stdout."""
+    code = ("import json, sys; from mmi.bench import run_benchmark; "
+            f"json.dump(run_benchmark({name!r}, {os.path.abspath(model_path)!r}, {export_rows}), sys.stdout)")
+    finished = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIRECTORY, check=True, stdout=subprocess.PIPE,
+                              text=True)
+    return json.loads(finished.stdout)
+
+
+def _cpu_model() -> str:
+    # platform.processor() is empty on most Linux systems, which name the CPU in /proc/cpuinfo
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def machine_info() -> dict:
+    """The machine and interpreter timings are taken on."""
+    return {"node": platform.node(), "platform": platform.platform(), "cpu": _cpu_model(), "cpus": os.cpu_count(),
+            "python": f"{platform.python_implementation()} {platform.python_version()}", "numpy": np.__version__}
+
+
+def run_benchmarks(model_path: str = MODEL_FILE_PATH, batch_sizes=BATCH_SIZES, export_rows: int = 10000,
+                   only=None, isolate: bool = True) -> dict:
+    """Run the suite (or only the benchmarks named in only) and return the report.
+
+    Every benchmark runs in its own interpreter unless isolate is False.
+    """
+    names = benchmark_names(batch_sizes)
+    unknown = sorted(set(only or ()) - set(names))
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}; expected some of {', '.join(names)}")
+    run = _run_isolated if isolate else run_benchmark
+    results = {name: run(name, model_path, export_rows) for name in names if not only or name in only}
+    return {"created": datetime.datetime.now().isoformat(timespec="seconds"), "machine": machine_info(),
+            "model": os.path.basename(model_path), "results": results}
+
+
+def machine_differences(report: dict, baseline: dict) -> list:
+    """Names of the machine details (and the model) in which report and baseline differ."""
+    differences = [key for key in sorted(set(report["machine"]) | set(baseline.get("machine", {})))
+                   if report["machine"].get(key) != baseline.get("machine", {}).get(key)]
+    return differences + (["model"] if report.get("model") != baseline.get("model") else [])
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.25) -> list:
+    """Return (name, baseline p50, current p50) for every benchmark slower than the baseline by more than tolerance."""
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is not None and result["p50_ms"] > reference["p50_ms"] * (1 + tolerance):
+            regressions.append((name, reference["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def load_report(file_path: str) -> dict:
+    with open(file_path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_report(report: dict, file_path: str) -> None:
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=1)
+        file.write("\n")
@@ -0,0 +1,111 @@
+"""Bounded LRU memoization of model predictions.
+
+round_q snaps q to six buckets and lambda only depends on the section family, so many
+beams share the same (x, R, q, lambda) model inputs. The cache keys predictions on those
+inputs, with x quantized to a configurable tolerance, and only sends unseen keys to the
+model. Batches are deduplicated first, scored in one call and scattered back to their rows.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from mmi.core import predict_batch
+from mmi.instrument import instrumentation
+
+
+class PredictionCache:
+    """Thread-safe LRU cache in front of predict_batch.
+
+    x is quantized to multiples of x_tolerance, and the model is scored at the quantized
+    value, so a key always maps to the same prediction. An x_tolerance of 0 keys on the
+    exact value. The cache empties itself when it is used with a different model object.
+    """
+
+    def __init__(self, maxsize: int = 65536, x_tolerance: float = 1e-6) -> None:
+        if maxsize < 0 or x_tolerance < 0:
+            raise ValueError("maxsize and x_tolerance must not be negative")
+        self.maxsize = maxsize
+        self.x_tolerance = x_tolerance
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._model = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxsize: int = None, x_tolerance: float = None) -> None:
+        """Change the size or tolerance; the cache is emptied since keys depend on the tolerance."""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if x_tolerance is not None:
+                self.x_tolerance = x_tolerance
+            self._entries.clear()
+
+    def clear(self) -> None:
+        """Drop every cached prediction and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return the hit, miss and eviction counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+    def _quantize(self, x: np.ndarray) -> np.ndarray:
+        if self.x_tolerance == 0:
+            return x
+        return np.round(x / self.x_tolerance) * self.x_tolerance
+
+    def predict(self, model, x: float, R: float, q: float, lambda_: float) -> float:
+        """Cached prediction for a single set of inputs."""
+        return self.predict_batch(model, x, R, q, lambda_).item()
+
+    def predict_batch(self, model, x, R, q, lambda_) -> np.ndarray:
+        """Cached, deduplicated prediction for every (x, R, q, lambda); scalars broadcast."""
+        columns = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (x, R, q, lambda_)))
+        shape = columns[0].shape
+        keys = np.column_stack([self._quantize(columns[0].ravel())] + [column.ravel() for column in columns[1:]])
+        if len(keys) == 0:
+            return np.empty(shape, dtype=np.float32)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        unique_values = np.empty(len(unique_keys), dtype=np.float32)
+
+        key_tuples = list(map(tuple, unique_keys.tolist()))
+        with self._lock:
+            if model is not self._model:
+                self._entries.clear()
+                self._model = model
+            missing = []
+            for i, key in enumerate(key_tuples):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    unique_values[i] = value
+            # Every row that does not need its own model evaluation counts as a hit
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            missing = np.array(missing)
+            scored = unique_keys[missing]
+            unique_values[missing] = predict_batch(model, scored[:, 0], scored[:, 1], scored[:, 2], scored[:, 3])
+            with self._lock:
+                if model is self._model and self.maxsize:
+                    # Only the most recent maxsize keys of a large batch are worth keeping
+                    for i in missing[-self.maxsize:].tolist():
+                        self._entries[key_tuples[i]] = float(unique_values[i])
+                    overflow = len(self._entries) - self.maxsize
+                    for _ in range(max(overflow, 0)):
+                        self._entries.popitem(last=False)
+                    self.evictions += max(overflow, 0)
+
+        return unique_values[inverse.ravel()].reshape(shape)
+
+
+prediction_cache = PredictionCache()
+instrumentation.register_gauges("prediction_cache", prediction_cache.stats)
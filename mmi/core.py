@@ -0,0 +1,325 @@
+"""Calculation core of the modified moment of inertia calculator.
+
+Only NumPy is imported at module level; the model runtime is imported when a model is
+first loaded, so scripts and the GUI can import this module without paying for it.
+"""
+import os
+import threading
+
+import numpy as np
+
+from mmi.instrument import instrumentation
+from mmi.sections import load_sections
+
+
+INTERNAL_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "_internal")
+# Flat export of the trained ensemble, scored by FlatForest without xgboost
+MODEL_FILE_PATH = os.path.join(INTERNAL_DIRECTORY, "xgboost_model.npz")
+# The pickled XGBRegressor it was exported from, kept as the reference model
+REFERENCE_MODEL_FILE_PATH = os.path.join(INTERNAL_DIRECTORY, "xgboost_model.pkl")
+
+# Admissible range of q = dg / d0
+Q_MIN = 1.25
+Q_MAX = 1.75
+# Values round_q snaps q to
+Q_BUCKETS = (1.25, 1.35, 1.45, 1.55, 1.65, 1.75)
+# R values offered by the calculator
+R_VALUES = (1.3, 1.4, 1.5)
+
+# Section catalogue, built once per process from mmi/data/sections
+SECTIONS = load_sections()
+
+
+def round_q(q: float) -> float:
+    """Round the value of q to the nearest acceptable value."""
+    if 0 < q <= 1.25:
+        return 1.25
+    elif 1.25 < q <= 1.35:
+        return 1.35
+    elif 1.35 < q <= 1.45:
+        return 1.45
+    elif 1.45 < q <= 1.55:
+        return 1.55
+    elif 1.55 < q <= 1.65:
+        return 1.65
+    elif 1.65 < q <= 1.75:
+        return 1.75
+    return q
+
+
+def round_q_batch(q) -> np.ndarray:
+    """Vectorized round_q: snap every q in (0, 1.75] up to its bucket, leave the rest as is."""
+    q = np.asarray(q, dtype=np.float64)
+    buckets = np.asarray(Q_BUCKETS)
+    index = np.minimum(np.searchsorted(buckets, q, side="left"), len(buckets) - 1)
+    return np.where((q > 0) & (q <= buckets[-1]), buckets[index], q)
+
+
+def get_lambda(parent_section: str) -> float:
+    """Get lambda value based on the parent section."""
+    if parent_section not in SECTIONS:
+        return 0.0
+    return float(SECTIONS[parent_section]["lambda"])
+
+
+class QOutOfRangeError(ValueError):
+    """Raised when q = dg / d0 falls outside the range covered by the model."""
+
+    def __init__(self, q: float) -> None:
+        super().__init__(f"q is out of range: {Q_MIN} ≤ q ≤ {Q_MAX}, q = {q:.3f}")
+        self.q = q
+
+
+def beam_features(length: float, opening_diameter: float, parent_section: str, R: float):
+    """Return the model features (x, q, lambda) of a beam, with q rounded to its bucket."""
+    beam_height = float(SECTIONS[parent_section]["h"])
+    dg = R * beam_height
+    x = length / dg
+    q = dg / opening_diameter
+    if not (Q_MIN <= q <= Q_MAX):
+        raise QOutOfRangeError(q)
+    return x, round_q(q), get_lambda(parent_section)
+
+
+class FlatForest:
+    """Tree ensemble stored as flat NumPy node arrays and evaluated without XGBoost.
+
+    Nodes of every tree are concatenated. The children of a split are stored next to each
+    other, so the next node is left[node] + go_right, and leaves point back to themselves
+    with an infinite threshold. Splits follow XGBoost: go left when value < threshold, or
+    by default_left for missing values.
+
+    For prediction every tree is laid out as a perfect binary tree of depth max_depth
+    (short branches repeat their leaf), and every node refers to one of the distinct
+    (feature, threshold, default_left) splits of the ensemble. A batch compares its rows
+    with the few distinct splits once, then descends all trees in lockstep with boolean
+    operations on those outcomes instead of gathering features and thresholds per node.
+    Leaf values are accumulated in float32 in tree order, as XGBoost does, so predictions
+    match it bit for bit. Batches of a few rows, where the setup of that would dominate,
+    walk the node arrays directly instead.
+    """
+
+    # Rows evaluated together, chosen so the (trees x rows) split outcomes stay cache-resident
+    CHUNK_CELLS = 1 << 17
+    # Fewer rows than this walk the node arrays, which costs less per call than the split outcomes
+    SMALL_BATCH_ROWS = 10
+
+    def __init__(self, feature, threshold, left, default_left, value, roots, base_score: float,
+                 max_depth: int) -> None:
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float32)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.base_score = np.float32(base_score)
+        self.max_depth = int(max_depth)
+        self._build_perfect_trees()
+
+    def _build_perfect_trees(self) -> None:
+        is_leaf = self.left == np.arange(len(self.left))
+        inner = np.flatnonzero(~is_leaf)
+        # Distinct splits sorted by feature, so every feature compares against one slice of them
+        feature, threshold, default_left = self.feature[inner], self.threshold[inner], self.default_left[inner]
+        order = np.lexsort((default_left, threshold, feature))
+        new = np.ones(len(order), dtype=bool)
+        new[1:] = ((np.diff(feature[order]) != 0) | (np.diff(threshold[order]) != 0)
+                   | (default_left[order][1:] != default_left[order][:-1]))
+        distinct = order[new]
+        # One extra split that is never taken stands in for the leaves of short branches
+        split = np.full(len(self.left), len(distinct), dtype=np.intp)
+        split[inner[order]] = np.cumsum(new) - 1
+        self._split_threshold = threshold[distinct]
+        self._split_missing_right = np.append(~default_left[distinct], False)
+        self._split_bounds = np.searchsorted(feature[distinct], np.arange(self.feature.max(initial=0) + 2))
+
+        # Breadth-first: level d of a tree holds its 2^d nodes, children 2i and 2i + 1 of node i
+        node = self.roots[:, None]
+        levels = [np.empty((self.n_trees, 0), dtype=np.intp)]
+        for _ in range(self.max_depth):
+            levels.append(split[node])
+            left = np.where(is_leaf[node], node, self.left[node])
+            node = np.stack([left, np.where(is_leaf[node], node, left + 1)], axis=-1).reshape(self.n_trees, -1)
+        self._node_split = np.concatenate(levels, axis=1).ravel()
+        self._leaf_value = self.value[node].ravel()
+
+    @classmethod
+    def load(cls, file_path: str) -> "FlatForest":
+        """Load a forest written by model_training_XGB.export_flat_model."""
+        with np.load(file_path) as data:
+            return cls(data["feature"], data["threshold"], data["left"], data["default_left"], data["value"],
+                       data["roots"], data["base_score"], data["max_depth"])
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def split_points(self, feature: int) -> np.ndarray:
+        """Sorted distinct thresholds the ensemble uses on one feature."""
+        thresholds = self.threshold[(self.feature == feature) & np.isfinite(self.threshold)]
+        return np.unique(thresholds)
+
+    def predict(self, data) -> np.ndarray:
+        """Predict one value per row of the (rows, features) matrix data."""
+        data = np.asarray(data, dtype=np.float32)
+        if data.ndim != 2:
+            raise ValueError("Expected a 2-D (rows, features) matrix")
+        result = np.empty(len(data), dtype=np.float32)
+        chunk_rows = max(1, self.CHUNK_CELLS // max(self.n_trees, 1))
+        for start in range(0, len(data), chunk_rows):
+            chunk = data[start:start + chunk_rows]
+            result[start:start + len(chunk)] = self._predict_chunk(chunk)
+        return result
+
+    def _walk_nodes(self, chunk: np.ndarray) -> np.ndarray:
+        n_rows = len(chunk)
+        # Feature-major copy, so the value of feature f for row r sits at f * n_rows + r
+        columns = np.ascontiguousarray(chunk.T).ravel()
+        rows = np.arange(n_rows)[:, None]
+        has_missing = np.isnan(columns).any()
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            value = columns.take(self.feature.take(node) * n_rows + rows)
+            go_right = ~(value < self.threshold.take(node))
+            if has_missing:
+                missing = np.isnan(value)
+                go_right[missing] = ~self.default_left.take(node[missing])
+            node = self.left.take(node) + go_right
+        leaves = np.empty((n_rows, self.n_trees + 1), dtype=np.float32)
+        leaves[:, 0] = self.base_score
+        self.value.take(node, out=leaves[:, 1:])
+        return leaves.cumsum(axis=1, dtype=np.float32)[:, -1]
+
+    def _predict_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        n_rows = len(chunk)
+        if n_rows < self.SMALL_BATCH_ROWS:
+            return self._walk_nodes(chunk)
+        # Whether every row goes right at every distinct split, the last one never taken
+        go_right = np.zeros((len(self._split_missing_right), n_rows), dtype=bool)
+        for feature in range(len(self._split_bounds) - 1):
+            first, last = self._split_bounds[feature], self._split_bounds[feature + 1]
+            if first == last:
+                continue
+            values = chunk[:, feature]
+            np.less_equal(self._split_threshold[first:last, None], values, out=go_right[first:last])
+            missing = np.isnan(values)
+            if missing.any():
+                go_right[first:last, missing] = self._split_missing_right[first:last, None]
+
+        n_inner = (1 << self.max_depth) - 1
+        node_go_right = go_right.take(self._node_split, axis=0).reshape(self.n_trees, n_inner, n_rows)
+        # The branch taken at each level: the outcome of the node reached, picked among the
+        # nodes of the level by the branches above it with left ^ (branch & (left ^ right))
+        path = []
+        for depth in range(self.max_depth):
+            outcomes = [node_go_right[:, (1 << depth) - 1 + i] for i in range(1 << depth)]
+            for branch in reversed(path):
+                outcomes = [left ^ (branch & (left ^ right)) for left, right in zip(outcomes[::2], outcomes[1::2])]
+            path.append(outcomes[0])
+        leaf = np.zeros((self.n_trees, n_rows), dtype=np.uint8 if self.max_depth <= 8 else np.intp)
+        for branch in path:
+            leaf <<= 1
+            leaf |= branch
+
+        leaves = np.empty((self.n_trees + 1, n_rows), dtype=np.float32)
+        leaves[0] = self.base_score
+        self._leaf_value.take((np.arange(self.n_trees) << self.max_depth)[:, None] + leaf, out=leaves[1:])
+        # Reducing over the leading axis of several rows adds the trees one after the other, like XGBoost
+        return np.add.reduce(leaves, axis=0, dtype=np.float32)
+
+
+@instrumentation.timed("load_model")
+def load_model(file_path):
+    """Load a model file: a flat .npz forest, a surface directory, a logistic surrogate .csv table,
+    a native .ubj/.json booster or a joblib pickle."""
+    if os.path.isdir(file_path):
+        from mmi.surface import AlphaSurface
+
+        return AlphaSurface.load(file_path)
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".npz":
+        return FlatForest.load(file_path)
+    if extension == ".csv":
+        from mmi.surrogate import LogisticSurrogate
+
+        return LogisticSurrogate.load(file_path)
+    if extension in (".ubj", ".json"):
+        from xgboost import XGBRegressor
+
+        model = XGBRegressor()
+        model.load_model(file_path)
+        return model
+
+    import joblib
+
+    return joblib.load(file_path)
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models, reloaded only when the file changes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def get(self, file_path: str):
+        """Return the model stored at file_path, loading it on first use or after a change."""
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = os.path.abspath(file_path)
+        entry = self._models.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None or entry[0] != signature:
+                entry = (signature, load_model(file_path))
+                self._models[key] = entry
+        return entry[1]
+
+    def prewarm(self, file_path: str) -> threading.Thread:
+        """Load and exercise the model on a background thread so the first calculation does not wait for it."""
+        thread = threading.Thread(target=self._prewarm, args=(file_path,), daemon=True)
+        thread.start()
+        return thread
+
+    def _prewarm(self, file_path: str) -> None:
+        try:
+            # One prediction also runs the first-call setup of the model and NumPy
+            predict_batch(self.get(file_path), 10.0, R_VALUES[0], Q_BUCKETS[0], SECTIONS.column("lambda")[:1])
+        except Exception:
+            # The first calculation retries the load and reports the error in the status bar.
+            pass
+
+    def clear(self) -> None:
+        """Drop every cached model."""
+        with self._lock:
+            self._models.clear()
+
+
+model_registry = ModelRegistry()
+
+
+def predict_batch(model, x, R, q, lambda_):
+    """Score every (x, R, q, lambda) combination in one booster call; scalars broadcast."""
+    columns = np.broadcast_arrays(*(np.asarray(value, dtype=np.float32) for value in (x, R, q, lambda_)))
+    input_data = np.empty((columns[0].size, 4), dtype=np.float32)
+    for i, column in enumerate(columns):
+        input_data[:, i] = column.ravel()
+    return model.predict(input_data).reshape(columns[0].shape)
+
+
+def model_covers(model, x, R, q, lambda_) -> np.ndarray:
+    """Mask of the (x, R, q, lambda) combinations inside the input domain of model; scalars broadcast.
+
+    Tabulated models (surfaces, surrogates) only answer on their q, R and lambda grids and
+    tell through a covers() method; tree ensembles answer everywhere.
+    """
+    covers = getattr(model, "covers", None)
+    if covers is None:
+        return np.ones(np.broadcast_shapes(*(np.shape(value) for value in (x, R, q, lambda_))), dtype=bool)
+    return covers(x, R, q, lambda_)
+
+
+def predict(model, x, R, q, lambda_):
+    return predict_batch(model, x, R, q, lambda_).item()
@@ -0,0 +1,123 @@
+"""Named inference engines and their accuracy against the reference model.
+
+Every model type the core can load answers the same predict_batch(model, x, R, q,
+lambda) call, so an engine is just a name for a model file, loaded and cached through
+the model registry:
+
+    tree      the XGBoost ensemble as a flat forest (the reference)
+    surface   the ensemble tabulated on its own x split points; exact and faster
+    logistic  the closed-form logistic surrogate; approximate and much faster
+
+The engine is chosen per call by name, or process-wide with set_default_engine() or the
+MMI_ENGINE environment variable. register_engine() adds further backends.
+"""
+import os
+import time
+
+import numpy as np
+
+from mmi.core import MODEL_FILE_PATH, Q_BUCKETS, R_VALUES, SECTIONS, model_registry, predict_batch
+from mmi.surface import SURFACE_DIRECTORY
+from mmi.surrogate import SURROGATE_FILE_PATH
+
+
+REFERENCE_ENGINE = "tree"
+ENGINES = {
+    "tree": MODEL_FILE_PATH,
+    "surface": SURFACE_DIRECTORY,
+    "logistic": SURROGATE_FILE_PATH,
+}
+
+# x range of the training data, where the engines are compared
+X_MIN = 6.857
+X_MAX = 26.4
+
+_default_engine = os.environ.get("MMI_ENGINE") or REFERENCE_ENGINE
+
+
+def register_engine(name: str, model_path: str) -> None:
+    """Make the model stored at model_path available as engine name."""
+    ENGINES[name] = model_path
+
+
+def default_engine() -> str:
+    return _default_engine
+
+
+def set_default_engine(name: str) -> None:
+    """Use engine name wherever no engine is given."""
+    global _default_engine
+    engine_path(name)
+    _default_engine = name
+
+
+def engine_path(name: str = None) -> str:
+    """Model file of engine name, or of the default engine."""
+    name = name or _default_engine
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine: {name} (available: {', '.join(ENGINES)})")
+    return ENGINES[name]
+
+
+def engine_index(name: str = None) -> int:
+    """Position of engine name (or the default engine) in ENGINES, as results tables store it."""
+    engine_path(name)
+    return list(ENGINES).index(name or _default_engine)
+
+
+def engine_of(model_path: str):
+    """Name of the engine whose model is stored at model_path, None for any other model file."""
+    model_path = os.path.abspath(model_path)
+    for name, path in ENGINES.items():
+        if os.path.abspath(path) == model_path:
+            return name
+    return None
+
+
+def get_engine(name: str = None):
+    """Loaded model of engine name, or of the default engine."""
+    return model_registry.get(engine_path(name))
+
+
+def engine_predict_batch(x, R, q, lambda_, engine: str = None) -> np.ndarray:
+    """predict_batch with the model of the given (or default) engine."""
+    return predict_batch(get_engine(engine), x, R, q, lambda_)
+
+
+def accuracy_report(engine: str, reference: str = REFERENCE_ENGINE, n_samples: int = 100000, seed: int = 0,
+                    tolerance: float = 0.005) -> dict:
+    """Compare engine with the reference engine on random in-domain inputs.
+
+    Inputs are drawn over the training x range, the R values, the q buckets and the
+    catalogue lambda values. The report holds the overall and per-q absolute errors, the
+    share of rows within tolerance and the throughput of both engines.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(X_MIN, X_MAX, n_samples)
+    R = rng.choice(R_VALUES, n_samples)
+    q = rng.choice(Q_BUCKETS, n_samples)
+    lambda_ = rng.choice(np.unique(SECTIONS.column("lambda")), n_samples)
+
+    timings = {}
+    predictions = {}
+    for name in (engine, reference):
+        model = get_engine(name)
+        started = time.perf_counter()
+        predictions[name] = predict_batch(model, x, R, q, lambda_).astype(np.float64)
+        timings[name] = n_samples / (time.perf_counter() - started)
+
+    error = np.abs(predictions[engine] - predictions[reference])
+    covered = ~np.isnan(error)
+
+    def summary(mask: np.ndarray) -> dict:
+        errors = error[mask & covered]
+        if len(errors) == 0:
+            return {"rows": 0}
+        return {"rows": int(len(errors)), "mean_abs": float(errors.mean()),
+                "rmse": float(np.sqrt((errors ** 2).mean())), "p99_abs": float(np.percentile(errors, 99)),
+                "max_abs": float(errors.max()), "within_tolerance": float((errors <= tolerance).mean())}
+
+    return {"engine": engine, "reference": reference, "samples": n_samples, "tolerance": tolerance,
+            "coverage": float(covered.mean()), "overall": summary(np.ones(n_samples, dtype=bool)),
+            "by_q": {f"{value:.2f}": summary(q == value) for value in Q_BUCKETS},
+            "rows_per_s": timings[engine], "reference_rows_per_s": timings[reference]}
@@ -0,0 +1,152 @@
+"""Streaming exporters for a ResultsTable.
+
+Each exporter reads the results in column chunks and writes them straight out, so memory
+stays flat in the number of rows: Excel through xlsxwriter's constant_memory mode with real
+numbers, HTML chunk by chunk, and PDF drawn one page at a time on a reportlab canvas.
+The third-party writers are imported inside the exporter that needs them.
+"""
+import html
+
+from mmi.instrument import instrumentation
+from mmi.results import DISPLAY_COLUMNS, display_values
+
+
+HEADERS = [header for _, header, _ in DISPLAY_COLUMNS]
+COLUMNS = [column for column, _, _ in DISPLAY_COLUMNS]
+FORMATS = ["{}" if decimals is None else f"{{:.{decimals}f}}" for _, _, decimals in DISPLAY_COLUMNS]
+
+
+def _chunk_rows(chunk: dict):
+    """Display rows of one column chunk as tuples of floats, and engine names."""
+    return zip(*(display_values(column, chunk[column]).tolist() for column in COLUMNS))
+
+
+def _rows(results, chunk_rows: int = 65536):
+    """Yield display rows chunk by chunk."""
+    for chunk in results.iter_chunks(chunk_rows, COLUMNS):
+        yield from _chunk_rows(chunk)
+
+
+@instrumentation.timed("export_excel")
+def export_to_excel(results, file_path: str) -> None:
+    """Export the results to an Excel file with styling, numbers stored as numbers."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(file_path, {"constant_memory": True})
+    worksheet = workbook.add_worksheet()
+
+    # Define some formats
+    header_format = workbook.add_format({
+        'bold': True, 'bg_color': '#f4cccc', 'border': 1, 'align': 'center'
+    })
+    formats_by_decimals = {}
+    for _, _, decimals in DISPLAY_COLUMNS:
+        if decimals not in formats_by_decimals:
+            formats_by_decimals[decimals] = workbook.add_format({
+                'align': 'center', 'valign': 'vcenter', 'num_format': '@' if decimals is None else '0.' + '0' * decimals
+            })
+    number_formats = [formats_by_decimals[decimals] for _, _, decimals in DISPLAY_COLUMNS]
+
+    # Set column width
+    worksheet.set_column(0, len(HEADERS) - 1, 15)
+    worksheet.write_row(0, 0, HEADERS, header_format)
+
+    # Consecutive columns with the same format are written with one write_row call
+    groups = []
+    for col, number_format in enumerate(number_formats):
+        if groups and groups[-1][2] is number_format:
+            groups[-1][1] = col + 1
+        else:
+            groups.append([col, col + 1, number_format])
+    for row, values in enumerate(_rows(results), start=1):
+        for first, last, number_format in groups:
+            worksheet.write_row(row, first, values[first:last], number_format)
+
+    workbook.close()
+
+
+@instrumentation.timed("export_html")
+def export_to_html(results, file_path: str, chunk_rows: int = 4096) -> None:
+    """Export the results to an HTML file with styling, one chunk of rows at a time."""
+    row_template = "<tr>\n" + "".join(f"<td>{fmt}</td>\n" for fmt in FORMATS) + "</tr>\n"
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write("<html>\n<head>\n")
+        file.write("<style>\n")
+        file.write("table { border-collapse: collapse; width: 100%; }\n")
+        file.write("th, td { border: 1px solid #ddd; padding: 8px; }\n")
+        file.write("th { background-color: #f2f2f2; color: #333; text-align: center; }\n")
+        file.write("tr:nth-child(even) { background-color: #f9f9f9; }\n")
+        file.write("tr:hover { background-color: #f1f1f1; }\n")
+        file.write("</style>\n</head>\n<body>\n")
+        file.write("<h1>Table Export</h1>\n")
+        file.write("<table>\n")
+
+        # Write table headers
+        file.write("<thead>\n<tr>\n")
+        file.write("".join(f"<th>{html.escape(header)}</th>\n" for header in HEADERS))
+        file.write("</tr>\n</thead>\n")
+
+        # Write table data
+        file.write("<tbody>\n")
+        for chunk in results.iter_chunks(chunk_rows, COLUMNS):
+            file.write("".join(row_template.format(*row) for row in _chunk_rows(chunk)))
+        file.write("</tbody>\n</table>\n")
+        file.write("</body>\n</html>\n")
+
+
+@instrumentation.timed("export_pdf")
+def export_to_pdf(results, file_path: str) -> None:
+    """Export the results to a PDF file, drawing the table one page at a time."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    page_width, page_height = letter
+    margin = 72
+    column_width = 80
+    header_height = 28
+    row_height = 18
+    table_width = column_width * len(HEADERS)
+    left = (page_width - table_width) / 2
+    rows_per_page = int((page_height - 2 * margin - header_height) // row_height)
+
+    pdf = canvas.Canvas(file_path, pagesize=letter)
+
+    def draw_page(page_rows) -> None:
+        top = page_height - margin
+        bottom = top - header_height - row_height * len(page_rows)
+        # Header and body backgrounds
+        pdf.setFillColor(colors.grey)
+        pdf.rect(left, top - header_height, table_width, header_height, stroke=0, fill=1)
+        if page_rows:
+            pdf.setFillColor(colors.beige)
+            pdf.rect(left, bottom, table_width, top - header_height - bottom, stroke=0, fill=1)
+        # Header text
+        pdf.setFillColor(colors.whitesmoke)
+        pdf.setFont("Helvetica-Bold", 12)
+        for col, header in enumerate(HEADERS):
+            pdf.drawCentredString(left + (col + 0.5) * column_width, top - header_height + 12, header)
+        # Body text
+        pdf.setFillColor(colors.black)
+        pdf.setFont("Helvetica", 10)
+        for i, values in enumerate(page_rows):
+            baseline = top - header_height - (i + 1) * row_height + 5
+            for col, value in enumerate(values):
+                pdf.drawCentredString(left + (col + 0.5) * column_width, baseline, FORMATS[col].format(value))
+        # Grid
+        pdf.setStrokeColor(colors.black)
+        pdf.setLineWidth(1)
+        horizontal = [top, top - header_height] + [top - header_height - (i + 1) * row_height
+                                                   for i in range(len(page_rows))]
+        pdf.grid([left + col * column_width for col in range(len(HEADERS) + 1)], horizontal)
+        pdf.showPage()
+
+    page_rows = []
+    for values in _rows(results):
+        page_rows.append(values)
+        if len(page_rows) == rows_per_page:
+            draw_page(page_rows)
+            page_rows = []
+    if page_rows or len(results) == 0:
+        draw_page(page_rows)
+    pdf.save()
@@ -0,0 +1,646 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'inertia_calculator.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+import os
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from mmi.core import INTERNAL_DIRECTORY
+
+
+UI_SOURCE_SHA256 = "7315c958b64f6d98a8d7bdbf682fe65685efc4ca3df9c4c986dcc28a7fa62bba"
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(900, 730)
+        MainWindow.setMinimumSize(QtCore.QSize(900, 730))
+        MainWindow.setMaximumSize(QtCore.QSize(900, 730))
+        MainWindow.setStyleSheet("\n"
+"QMainWindow, QGroupBox, QFrame, QWidget {\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QTableWidget{\n"
+"    background_color: #bfbfbf\n"
+"}\n"
+"QDialog {\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QColorDialog {\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QTextEdit {\n"
+"    background-color:#1e1d23;\n"
+"    color: #a9b7c6;\n"
+"}\n"
+"QPlainTextEdit {\n"
+"    selection-background-color:#007b50;\n"
+"    background-color:#1e1d23;\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: transparent;\n"
+"    border-width: 1px;\n"
+"    color: #a9b7c6;\n"
+"}\n"
+"QToolButton {\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: #04b97f;\n"
+"    border-bottom-width: 1px;\n"
+"    border-style: solid;\n"
+"    color: #a9b7c6;\n"
+"    padding: 2px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QToolButton:hover{\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: #37efba;\n"
+"    border-bottom-width: 2px;\n"
+"    border-style: solid;\n"
+"    color: #FFFFFF;\n"
+"    padding-bottom: 1px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QPushButton{\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: #37efba;\n"
+"    border-bottom-width: 1px;\n"
+"    border-style: solid;\n"
+"    color: #FFFFFF;\n"
+"    padding-bottom: 2px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QPushButton:pressed{\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: #37efba;\n"
+"    border-bottom-width: 2px;\n"
+"    border-style: solid;\n"
+"    color: #37efba;\n"
+"    padding-bottom: 1px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QPushButton:disabled{\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: #808086;\n"
+"    border-bottom-width: 2px;\n"
+"    border-style: solid;\n"
+"    color: #808086;\n"
+"    padding-bottom: 1px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QLineEdit {\n"
+"    border-width: 1px; border-radius: 4px;\n"
+"    border-color: rgb(58, 58, 58);\n"
+"    border-style: inset;\n"
+"    padding: 0 8px;\n"
+"    color: #a9b7c6;\n"
+"    background:#1e1d23;\n"
+"    selection-background-color:#007b50;\n"
+"    selection-color: #FFFFFF;\n"
+"}\n"
+"QLabel {\n"
+"    color: #a9b7c6;\n"
+"}\n"
+"QLCDNumber {\n"
+"    color: #37e6b4;\n"
+"}\n"
+"QProgressBar {\n"
+"    text-align: center;\n"
+"    color: rgb(240, 240, 240);\n"
+"    border-width: 1px; \n"
+"    border-radius: 10px;\n"
+"    border-color: rgb(58, 58, 58);\n"
+"    border-style: inset;\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QProgressBar::chunk {\n"
+"    background-color: #04b97f;\n"
+"    border-radius: 5px;\n"
+"}\n"
+"QMenuBar {\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QMenuBar::item {\n"
+"    color: #a9b7c6;\n"
+"      spacing: 3px;\n"
+"      padding: 1px 4px;\n"
+"      background: #1e1d23;\n"
+"}\n"
+"\n"
+"QMenuBar::item:selected {\n"
+"      background:#1e1d23;\n"
+"    color: #FFFFFF;\n"
+"}\n"
+"QMenu::item:selected {\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: #04b97f;\n"
+"    border-bottom-color: transparent;\n"
+"    border-left-width: 2px;\n"
+"    color: #FFFFFF;\n"
+"    padding-left:15px;\n"
+"    padding-top:4px;\n"
+"    padding-bottom:4px;\n"
+"    padding-right:7px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QMenu::item {\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: transparent;\n"
+"    border-bottom-width: 1px;\n"
+"    border-style: solid;\n"
+"    color: #a9b7c6;\n"
+"    padding-left:17px;\n"
+"    padding-top:4px;\n"
+"    padding-bottom:4px;\n"
+"    padding-right:7px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QMenu{\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QTabWidget {\n"
+"    color:rgb(0,0,0);\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QTabWidget::pane {\n"
+"        border-color: rgb(77,77,77);\n"
+"        background-color:#1e1d23;\n"
+"        border-style: solid;\n"
+"        border-width: 1px;\n"
+"        border-radius: 6px;\n"
+"}\n"
+"QTabBar::tab {\n"
+"    border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: transparent;\n"
+"    border-bottom-width: 1px;\n"
+"    border-style: solid;\n"
+"    color: #808086;\n"
+"    padding: 3px;\n"
+"    margin-left:3px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QTabBar::tab:selected, QTabBar::tab:last:selected, QTabBar::tab:hover {\n"
+"      border-style: solid;\n"
+"    border-top-color: transparent;\n"
+"    border-right-color: transparent;\n"
+"    border-left-color: transparent;\n"
+"    border-bottom-color: #04b97f;\n"
+"    border-bottom-width: 2px;\n"
+"    border-style: solid;\n"
+"    color: #FFFFFF;\n"
+"    padding-left: 3px;\n"
+"    padding-bottom: 2px;\n"
+"    margin-left:3px;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"\n"
+"QCheckBox {\n"
+"    color: #a9b7c6;\n"
+"    padding: 2px;\n"
+"}\n"
+"QCheckBox:disabled {\n"
+"    color: #808086;\n"
+"    padding: 2px;\n"
+"}\n"
+"\n"
+"QCheckBox:hover {\n"
+"    border-radius:4px;\n"
+"    border-style:solid;\n"
+"    padding-left: 1px;\n"
+"    padding-right: 1px;\n"
+"    padding-bottom: 1px;\n"
+"    padding-top: 1px;\n"
+"    border-width:1px;\n"
+"    border-color: rgb(87, 97, 106);\n"
+"    background-color:#1e1d23;\n"
+"}\n"
+"QCheckBox::indicator:checked {\n"
+"\n"
+"    height: 10px;\n"
+"    width: 10px;\n"
+"    border-style:solid;\n"
+"    border-width: 1px;\n"
+"    border-color: #04b97f;\n"
+"    color: #a9b7c6;\n"
+"    background-color: #04b97f;\n"
+"}\n"
+"QCheckBox::indicator:unchecked {\n"
+"\n"
+"    height: 10px;\n"
+"    width: 10px;\n"
+"    border-style:solid;\n"
+"    border-width: 1px;\n"
+"    border-color: #04b97f;\n"
+"    color: #a9b7c6;\n"
+"    background-color: transparent;\n"
+"}\n"
+"QRadioButton {\n"
+"    color: #a9b7c6;\n"
+"    background-color: #1e1d23;\n"
+"    padding: 1px;\n"
+"}\n"
+"QRadioButton::indicator:checked {\n"
+"    height: 10px;\n"
+"    width: 10px;\n"
+"    border-style:solid;\n"
+"    border-radius:5px;\n"
+"    border-width: 1px;\n"
+"    border-color: #04b97f;\n"
+"    color: #a9b7c6;\n"
+"    background-color: #04b97f;\n"
+"}\n"
+"QRadioButton::indicator:!checked {\n"
+"    height: 10px;\n"
+"    width: 10px;\n"
+"    border-style:solid;\n"
+"    border-radius:5px;\n"
+"    border-width: 1px;\n"
+"    border-color: #04b97f;\n"
+"    color: #a9b7c6;\n"
+"    background-color: transparent;\n"
+"}\n"
+"QStatusBar {\n"
+"    color:#027f7f;\n"
+"}\n"
+"QSpinBox {\n"
+"    color: #a9b7c6;    \n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QDoubleSpinBox {\n"
+"    color: #a9b7c6;    \n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QTimeEdit {\n"
+"    color: #a9b7c6;    \n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QDateTimeEdit {\n"
+"    color: #a9b7c6;    \n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QDateEdit {\n"
+"    color: #a9b7c6;    \n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QComboBox {\n"
+"    color: #a9b7c6;    \n"
+"    background: #1e1d23;\n"
+"}\n"
+"QComboBox:editable {\n"
+"    background: #1e1d23;\n"
+"    color: #a9b7c6;\n"
+"    selection-background-color: #1e1d23;\n"
+"}\n"
+"QComboBox QAbstractItemView {\n"
+"    color: #a9b7c6;    \n"
+"    background: #1e1d23;\n"
+"    selection-color: #FFFFFF;\n"
+"    selection-background-color: #1e1d23;\n"
+"}\n"
+"QComboBox:!editable:on, QComboBox::drop-down:editable:on {\n"
+"    color: #a9b7c6;    \n"
+"    background: #1e1d23;\n"
+"}\n"
+"QFontComboBox {\n"
+"    color: #a9b7c6;    \n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QToolBox {\n"
+"    color: #a9b7c6;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QToolBox::tab {\n"
+"    color: #a9b7c6;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QToolBox::tab:selected {\n"
+"    color: #FFFFFF;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QScrollArea {\n"
+"    color: #FFFFFF;\n"
+"    background-color: #1e1d23;\n"
+"}\n"
+"QSlider::groove:horizontal {\n"
+"    height: 5px;\n"
+"    background: #04b97f;\n"
+"}\n"
+"QSlider::groove:vertical {\n"
+"    width: 5px;\n"
+"    background: #04b97f;\n"
+"}\n"
+"QSlider::handle:horizontal {\n"
+"    background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #b4b4b4, stop:1 #8f8f8f);\n"
+"    border: 1px solid #5c5c5c;\n"
+"    width: 14px;\n"
+"    margin: -5px 0;\n"
+"    border-radius: 7px;\n"
+"}\n"
+"QSlider::handle:vertical {\n"
+"    background: qlineargradient(x1:1, y1:1, x2:0, y2:0, stop:0 #b4b4b4, stop:1 #8f8f8f);\n"
+"    border: 1px solid #5c5c5c;\n"
+"    height: 14px;\n"
+"    margin: 0 -5px;\n"
+"    border-radius: 7px;\n"
+"}\n"
+"QSlider::add-page:horizontal {\n"
+"    background: white;\n"
+"}\n"
+"QSlider::add-page:vertical {\n"
+"    background: white;\n"
+"}\n"
+"QSlider::sub-page:horizontal {\n"
+"    background: #04b97f;\n"
+"}\n"
+"QSlider::sub-page:vertical {\n"
+"    background: #04b97f;\n"
+"}\n"
+"")
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.frame = QtWidgets.QFrame(self.centralwidget)
+        self.frame.setGeometry(QtCore.QRect(450, 10, 431, 311))
+        self.frame.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame.setObjectName("frame")
+        self.frame1 = QtWidgets.QFrame(self.centralwidget)
+        self.frame1.setGeometry(QtCore.QRect(20, 10, 371, 651))
+        self.frame1.setFrameShape(QtWidgets.QFrame.Box)
+        self.frame1.setObjectName("frame1")
+        self.gridLayout = QtWidgets.QGridLayout(self.frame1)
+        self.gridLayout.setObjectName("gridLayout")
+        self.comboBox_2 = QtWidgets.QComboBox(self.frame1)
+        self.comboBox_2.setMinimumSize(QtCore.QSize(0, 30))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.comboBox_2.setFont(font)
+        self.comboBox_2.setStyleSheet("COLOR:#04B97F")
+        self.comboBox_2.setObjectName("comboBox_2")
+        self.comboBox_2.addItem("")
+        self.comboBox_2.addItem("")
+        self.comboBox_2.addItem("")
+        self.gridLayout.addWidget(self.comboBox_2, 3, 2, 1, 1)
+        self.comboBox_3 = QtWidgets.QComboBox(self.frame1)
+        self.comboBox_3.setMinimumSize(QtCore.QSize(0, 30))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.comboBox_3.setFont(font)
+        self.comboBox_3.setStyleSheet("COLOR:#04B97F")
+        self.comboBox_3.setObjectName("comboBox_3")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.comboBox_3.addItem("")
+        self.gridLayout.addWidget(self.comboBox_3, 5, 2, 1, 1)
+        self.label = QtWidgets.QLabel(self.frame1)
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label.setFont(font)
+        self.label.setAlignment(QtCore.Qt.AlignCenter)
+        self.label.setObjectName("label")
+        self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
+        self.lineEdit = QtWidgets.QLineEdit(self.frame1)
+        self.lineEdit.setMinimumSize(QtCore.QSize(0, 0))
+        self.lineEdit.setMaximumSize(QtCore.QSize(150, 16777215))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.lineEdit.setFont(font)
+        self.lineEdit.setStyleSheet("COLOR:#04B97F")
+        self.lineEdit.setText("")
+        self.lineEdit.setAlignment(QtCore.Qt.AlignCenter)
+        self.lineEdit.setObjectName("lineEdit")
+        self.gridLayout.addWidget(self.lineEdit, 0, 2, 1, 1)
+        self.pushButton_2 = QtWidgets.QPushButton(self.frame1)
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pushButton_2.setFont(font)
+        self.pushButton_2.setObjectName("pushButton_2")
+        self.gridLayout.addWidget(self.pushButton_2, 7, 0, 1, 3)
+        self.label_4 = QtWidgets.QLabel(self.frame1)
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_4.setFont(font)
+        self.label_4.setToolTip("")
+        self.label_4.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_4.setObjectName("label_4")
+        self.gridLayout.addWidget(self.label_4, 5, 0, 1, 1)
+        self.pushButton = QtWidgets.QPushButton(self.frame1)
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pushButton.setFont(font)
+        self.pushButton.setObjectName("pushButton")
+        self.gridLayout.addWidget(self.pushButton, 6, 0, 1, 3)
+        self.label_3 = QtWidgets.QLabel(self.frame1)
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_3.setFont(font)
+        self.label_3.setToolTip("")
+        self.label_3.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_3.setObjectName("label_3")
+        self.gridLayout.addWidget(self.label_3, 3, 0, 1, 1)
+        self.label_2 = QtWidgets.QLabel(self.frame1)
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_2.setFont(font)
+        self.label_2.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout.addWidget(self.label_2, 1, 0, 1, 1)
+        self.lineEdit_2 = QtWidgets.QLineEdit(self.frame1)
+        self.lineEdit_2.setMinimumSize(QtCore.QSize(0, 0))
+        self.lineEdit_2.setMaximumSize(QtCore.QSize(150, 16777215))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.lineEdit_2.setFont(font)
+        self.lineEdit_2.setStyleSheet("COLOR:#04B97F")
+        self.lineEdit_2.setText("")
+        self.lineEdit_2.setAlignment(QtCore.Qt.AlignCenter)
+        self.lineEdit_2.setObjectName("lineEdit_2")
+        self.gridLayout.addWidget(self.lineEdit_2, 1, 2, 1, 1)
+        self.label_5 = QtWidgets.QLabel(self.centralwidget)
+        self.label_5.setGeometry(QtCore.QRect(450, 340, 431, 321))
+        self.label_5.setText("")
+        self.label_5.setPixmap(QtGui.QPixmap(os.path.join(INTERNAL_DIRECTORY, "image-removebg-preview.png")))
+        self.label_5.setScaledContents(True)
+        self.label_5.setObjectName("label_5")
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 900, 21))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.menubar.setFont(font)
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuEdit = QtWidgets.QMenu(self.menubar)
+        self.menuEdit.setObjectName("menuEdit")
+        self.menuSolve = QtWidgets.QMenu(self.menubar)
+        self.menuSolve.setObjectName("menuSolve")
+        self.menuEngine = QtWidgets.QMenu(self.menubar)
+        self.menuEngine.setObjectName("menuEngine")
+        self.menuHelp = QtWidgets.QMenu(self.menubar)
+        self.menuHelp.setObjectName("menuHelp")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.statusbar.setFont(font)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.actionExport_to_Excel = QtWidgets.QAction(MainWindow)
+        self.actionExport_to_Excel.setObjectName("actionExport_to_Excel")
+        self.actionExport_to_PDF = QtWidgets.QAction(MainWindow)
+        self.actionExport_to_PDF.setObjectName("actionExport_to_PDF")
+        self.actionExit = QtWidgets.QAction(MainWindow)
+        self.actionExit.setObjectName("actionExit")
+        self.actionLicense = QtWidgets.QAction(MainWindow)
+        self.actionLicense.setObjectName("actionLicense")
+        self.actionExport_to_HTML = QtWidgets.QAction(MainWindow)
+        self.actionExport_to_HTML.setObjectName("actionExport_to_HTML")
+        self.actionOpen_Results = QtWidgets.QAction(MainWindow)
+        self.actionOpen_Results.setObjectName("actionOpen_Results")
+        self.actionSave_Results = QtWidgets.QAction(MainWindow)
+        self.actionSave_Results.setObjectName("actionSave_Results")
+        self.actionAppend_Results = QtWidgets.QAction(MainWindow)
+        self.actionAppend_Results.setObjectName("actionAppend_Results")
+        self.actionApply_R = QtWidgets.QAction(MainWindow)
+        self.actionApply_R.setObjectName("actionApply_R")
+        self.actionApply_Opening = QtWidgets.QAction(MainWindow)
+        self.actionApply_Opening.setObjectName("actionApply_Opening")
+        self.actionApply_Section = QtWidgets.QAction(MainWindow)
+        self.actionApply_Section.setObjectName("actionApply_Section")
+        self.actionSolve_Opening = QtWidgets.QAction(MainWindow)
+        self.actionSolve_Opening.setObjectName("actionSolve_Opening")
+        self.actionSolve_Length = QtWidgets.QAction(MainWindow)
+        self.actionSolve_Length.setObjectName("actionSolve_Length")
+        self.actionOptimize_Section = QtWidgets.QAction(MainWindow)
+        self.actionOptimize_Section.setObjectName("actionOptimize_Section")
+        self.menuFile.addAction(self.actionOpen_Results)
+        self.menuFile.addAction(self.actionSave_Results)
+        self.menuFile.addAction(self.actionAppend_Results)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionExport_to_Excel)
+        self.menuFile.addAction(self.actionExport_to_PDF)
+        self.menuFile.addAction(self.actionExport_to_HTML)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionExit)
+        self.menuEdit.addAction(self.actionApply_R)
+        self.menuEdit.addAction(self.actionApply_Opening)
+        self.menuEdit.addAction(self.actionApply_Section)
+        self.menuSolve.addAction(self.actionSolve_Opening)
+        self.menuSolve.addAction(self.actionSolve_Length)
+        self.menuSolve.addSeparator()
+        self.menuSolve.addAction(self.actionOptimize_Section)
+        self.menuHelp.addAction(self.actionLicense)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuEdit.menuAction())
+        self.menubar.addAction(self.menuSolve.menuAction())
+        self.menubar.addAction(self.menuEngine.menuAction())
+        self.menubar.addAction(self.menuHelp.menuAction())
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+        MainWindow.setTabOrder(self.lineEdit, self.lineEdit_2)
+        MainWindow.setTabOrder(self.lineEdit_2, self.comboBox_2)
+        MainWindow.setTabOrder(self.comboBox_2, self.comboBox_3)
+        MainWindow.setTabOrder(self.comboBox_3, self.pushButton)
+        MainWindow.setTabOrder(self.pushButton, self.pushButton_2)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
+        self.comboBox_2.setItemText(0, _translate("MainWindow", "1.3"))
+        self.comboBox_2.setItemText(1, _translate("MainWindow", "1.4"))
+        self.comboBox_2.setItemText(2, _translate("MainWindow", "1.5"))
+        self.comboBox_3.setItemText(0, _translate("MainWindow", "IPE80"))
+        self.comboBox_3.setItemText(1, _translate("MainWindow", "IPE100"))
+        self.comboBox_3.setItemText(2, _translate("MainWindow", "IPE120"))
+        self.comboBox_3.setItemText(3, _translate("MainWindow", "IPE140"))
+        self.comboBox_3.setItemText(4, _translate("MainWindow", "IPE160"))
+        self.comboBox_3.setItemText(5, _translate("MainWindow", "IPE180"))
+        self.comboBox_3.setItemText(6, _translate("MainWindow", "IPE200"))
+        self.comboBox_3.setItemText(7, _translate("MainWindow", "IPE220"))
+        self.comboBox_3.setItemText(8, _translate("MainWindow", "IPE240"))
+        self.comboBox_3.setItemText(9, _translate("MainWindow", "IPE270"))
+        self.comboBox_3.setItemText(10, _translate("MainWindow", "IPE300"))
+        self.comboBox_3.setItemText(11, _translate("MainWindow", "IPE330"))
+        self.comboBox_3.setItemText(12, _translate("MainWindow", "IPE360"))
+        self.comboBox_3.setItemText(13, _translate("MainWindow", "IPE400"))
+        self.comboBox_3.setItemText(14, _translate("MainWindow", "IPE450"))
+        self.comboBox_3.setItemText(15, _translate("MainWindow", "IPE500"))
+        self.comboBox_3.setItemText(16, _translate("MainWindow", "IPE550"))
+        self.comboBox_3.setItemText(17, _translate("MainWindow", "IPE600"))
+        self.label.setText(_translate("MainWindow", "<html><head/><body><p>Beam Length (mm)</p></body></html>"))
+        self.pushButton_2.setToolTip(_translate("MainWindow", "Del Key"))
+        self.pushButton_2.setText(_translate("MainWindow", "Clear Table"))
+        self.pushButton_2.setShortcut(_translate("MainWindow", "Del"))
+        self.label_4.setText(_translate("MainWindow", "Parent Section"))
+        self.pushButton.setToolTip(_translate("MainWindow", "Shift + Enter"))
+        self.pushButton.setText(_translate("MainWindow", "Calculate"))
+        self.pushButton.setShortcut(_translate("MainWindow", "Shift+Return"))
+        self.label_3.setText(_translate("MainWindow", "R"))
+        self.label_2.setText(_translate("MainWindow", "<html><head/><body><p>Opening Diameter (mm)</p></body></html>"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuEdit.setTitle(_translate("MainWindow", "Edit"))
+        self.menuSolve.setTitle(_translate("MainWindow", "Solve"))
+        self.menuEngine.setTitle(_translate("MainWindow", "Engine"))
+        self.menuHelp.setTitle(_translate("MainWindow", "Help"))
+        self.actionExport_to_Excel.setText(_translate("MainWindow", "Export to Excel"))
+        self.actionExport_to_PDF.setText(_translate("MainWindow", "Export to PDF"))
+        self.actionExit.setText(_translate("MainWindow", "Exit"))
+        self.actionLicense.setText(_translate("MainWindow", "License"))
+        self.actionExport_to_HTML.setText(_translate("MainWindow", "Export to HTML"))
+        self.actionOpen_Results.setText(_translate("MainWindow", "Open Results..."))
+        self.actionSave_Results.setText(_translate("MainWindow", "Save Results..."))
+        self.actionAppend_Results.setText(_translate("MainWindow", "Append to Results..."))
+        self.actionApply_R.setText(_translate("MainWindow", "Apply R to Shown Rows"))
+        self.actionApply_Opening.setText(_translate("MainWindow", "Apply Opening Diameter to Shown Rows"))
+        self.actionApply_Section.setText(_translate("MainWindow", "Apply Section to Shown Rows"))
+        self.actionSolve_Opening.setText(_translate("MainWindow", "Largest Opening for Target Alpha..."))
+        self.actionSolve_Length.setText(_translate("MainWindow", "Shortest Span for Target Alpha..."))
+        self.actionOptimize_Section.setText(_translate("MainWindow", "Lightest Section for Required Inertia..."))
@@ -0,0 +1,238 @@
+"""Switchable per-stage timing, counters and profiling of the hot paths.
+
+Code marks its stages with ``with instrumentation.stage("predict"):`` and counts work
+with ``instrumentation.count("rows_scored", n)``. While instrumentation is off, stage()
+returns a shared no-op context manager and count() returns at once, so the marks cost a
+method call each. When it is on, stage times are taken with the monotonic
+perf_counter_ns and aggregated into Prometheus-style histograms; each stage can also be
+logged to a rotating log file.
+
+Modes:
+    off          nothing is recorded (the default)
+    timing       stage histograms and counters
+    profile      timing, plus a cProfile capture of every profile() block
+    tracemalloc  timing, plus the top allocations and peak of every profile() block
+
+The MMI_INSTRUMENT, MMI_INSTRUMENT_LOG, MMI_METRICS_FILE and MMI_PROFILE_DIR environment
+variables configure the process-wide instance at import; the metrics file is written at
+exit.
+"""
+import atexit
+import contextlib
+import os
+import threading
+import time
+
+
+MODES = ("off", "timing", "profile", "tracemalloc")
+
+# Upper bounds of the stage histogram buckets, in seconds
+BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0, float("inf"))
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ("instrumentation", "name", "started")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.instrumentation.record(self.name, (time.perf_counter_ns() - self.started) / 1e9)
+
+
+class Instrumentation:
+    """Stage timers, counters and profiling captures, all disabled by default."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.mode = "off"
+        self.enabled = False
+        self.profile_directory = "."
+        self.metrics_path = None
+        self._handler = None
+        self._logger = None
+        self._profiling = False
+        self._captures = 0
+        self._collectors = {}
+        self.reset()
+
+    def configure(self, mode: str = None, log_path: str = None, metrics_path: str = None,
+                  profile_directory: str = None, log_bytes: int = 1 << 20, log_backups: int = 3) -> None:
+        """Switch the mode and outputs; log_path starts a rotating log of every stage."""
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f"Unknown instrumentation mode: {mode}")
+            self.mode = mode
+            self.enabled = mode != "off"
+        if profile_directory is not None:
+            self.profile_directory = profile_directory
+        if log_path is not None:
+            # logging is only imported when a log is asked for, to keep imports cheap
+            import logging
+            from logging.handlers import RotatingFileHandler
+
+            logger = logging.getLogger("mmi.instrument")
+            if self._handler is not None:
+                logger.removeHandler(self._handler)
+                self._handler.close()
+            self._handler = RotatingFileHandler(log_path, maxBytes=log_bytes, backupCount=log_backups,
+                                                encoding="utf-8")
+            self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(self._handler)
+            logger.setLevel(logging.INFO)
+            self._logger = logger
+        if metrics_path is not None:
+            if self.metrics_path is None:
+                atexit.register(self._write_metrics_at_exit)
+            self.metrics_path = metrics_path
+
+    def configure_from_environment(self, environ=os.environ) -> None:
+        """Configure from the MMI_INSTRUMENT* environment variables, if any are set."""
+        self.configure(environ.get("MMI_INSTRUMENT") or None, environ.get("MMI_INSTRUMENT_LOG") or None,
+                       environ.get("MMI_METRICS_FILE") or None, environ.get("MMI_PROFILE_DIR") or None)
+
+    def reset(self) -> None:
+        """Forget every recorded stage and counter."""
+        with self._lock:
+            # name -> [count, sum of seconds, max seconds, bucket counts]
+            self._stages = {}
+            self._counters = {}
+
+    def register_gauges(self, prefix: str, collector) -> None:
+        """Add the numbers returned by collector() to every metrics dump, as prefix_<key> gauges."""
+        self._collectors[prefix] = collector
+
+    def stage(self, name: str):
+        """Context manager timing one run of a stage."""
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one run of a stage that took seconds."""
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats[3][i] += 1
+                    break
+        if self._handler is not None:
+            self._logger.info("stage=%s ms=%.3f", name, seconds * 1e3)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add value to a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timed(self, name: str):
+        """Decorator timing every call of a function as a stage."""
+        def decorator(function):
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+
+            wrapper.__name__ = function.__name__
+            wrapper.__doc__ = function.__doc__
+            wrapper.__wrapped__ = function
+            return wrapper
+
+        return decorator
+
+    @contextlib.contextmanager
+    def profile(self, name: str):
+        """Capture a cProfile or tracemalloc report of the block, in the matching mode.
+
+        Reports go to profile_directory as <name>-<n>.prof (cProfile, readable with pstats
+        or snakeviz) or <name>-<n>.txt (tracemalloc). Nested captures are ignored.
+        """
+        if self.mode not in ("profile", "tracemalloc") or self._profiling:
+            yield
+            return
+        self._profiling = True
+        self._captures += 1
+        path = os.path.join(self.profile_directory, f"{name}-{self._captures}")
+        try:
+            if self.mode == "profile":
+                import cProfile
+
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    yield
+                finally:
+                    profiler.disable()
+                    profiler.dump_stats(path + ".prof")
+            else:
+                import tracemalloc
+
+                tracemalloc.start()
+                try:
+                    yield
+                finally:
+                    snapshot = tracemalloc.take_snapshot()
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    with open(path + ".txt", "w", encoding="utf-8") as file:
+                        file.write(f"peak traced memory: {peak / 1024:.1f} KiB\n")
+                        for statistic in snapshot.statistics("lineno")[:25]:
+                            file.write(f"{statistic}\n")
+        finally:
+            self._profiling = False
+
+    def snapshot(self) -> dict:
+        """Copy of the recorded stages (count, total and max seconds) and counters."""
+        with self._lock:
+            stages = {name: {"count": stats[0], "total_s": stats[1], "max_s": stats[2]}
+                      for name, stats in self._stages.items()}
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            if self._stages:
+                lines += ["# HELP mmi_stage_seconds Time spent in each instrumented stage.",
+                          "# TYPE mmi_stage_seconds histogram"]
+            for name, (count, total, _, buckets) in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS, buckets):
+                    cumulative += bucket
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'mmi_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'mmi_stage_seconds_sum{{stage="{name}"}} {total}')
+                lines.append(f'mmi_stage_seconds_count{{stage="{name}"}} {count}')
+            for name, value in sorted(self._counters.items()):
+                lines += [f"# TYPE mmi_{name}_total counter", f"mmi_{name}_total {value}"]
+        for prefix, collector in sorted(self._collectors.items()):
+            for key, value in sorted(collector().items()):
+                lines += [f"# TYPE mmi_{prefix}_{key} gauge", f"mmi_{prefix}_{key} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, file_path: str = None) -> None:
+        """Write the Prometheus text dump to file_path, or to the configured metrics file."""
+        file_path = file_path or self.metrics_path
+        with open(file_path + ".tmp", "w", encoding="utf-8") as file:
+            file.write(self.prometheus())
+        os.replace(file_path + ".tmp", file_path)
+
+    def _write_metrics_at_exit(self) -> None:
+        if self.enabled and self.metrics_path:
+            self.write_metrics()
+
+
+instrumentation = Instrumentation()
+instrumentation.configure_from_environment()
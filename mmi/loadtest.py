@@ -0,0 +1,92 @@
+"""Load-test client of the scoring server.
+
+Opens a number of keep-alive connections and sends random in-domain requests through all
+of them at once, so the server sees concurrent traffic to coalesce. No two requests share
+a beam, so the server has to score every row. The report gives the
+throughput and the latency distribution of the requests, e.g.
+
+    python -m mmi serve &
+    python -m mmi loadtest --concurrency 64 --requests 20000
+"""
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from mmi.core import R_VALUES, SECTIONS
+
+
+def random_rows(count: int, rng: np.random.Generator) -> list:
+    """Raw beam inputs with q inside the model range."""
+    sections = rng.choice(SECTIONS.names, count)
+    R = rng.choice(R_VALUES, count)
+    dg = R * SECTIONS.take(SECTIONS.index(sections), "h")
+    length = dg * rng.uniform(7.0, 26.0, count)
+    opening_diameter = dg / rng.uniform(1.26, 1.74, count)
+    return [{"L": round(float(l), 1), "d0": round(float(d), 1), "section": str(s), "R": float(r)}
+            for l, d, s, r in zip(length, opening_diameter, sections, R)]
+
+
+async def _request(reader, writer, host: str, path: str, body: bytes) -> tuple:
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _worker(host: str, port: int, path: str, bodies: list, latencies: list, failures: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            started = time.perf_counter()
+            status, _ = await _request(reader, writer, host, path, body)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load_test(host: str = "127.0.0.1", port: int = 8765, requests: int = 10000, concurrency: int = 32,
+                        rows: int = 1, engine: str = None, seed: int = 0) -> dict:
+    """Send requests scoring rows beams each over concurrency connections and report the timings.
+
+    One row goes to /score, more to /score/batch.
+    """
+    rng = np.random.default_rng(seed)
+    path = "/score" if rows == 1 else "/score/batch"
+    if engine:
+        path += f"?engine={engine}"
+    # Every request gets beams of its own: repeated inputs would be answered by the server's
+    # prediction cache and the test would measure the cache rather than the model
+    beams = random_rows(requests * rows, rng)
+    schedule = [json.dumps(beams[i] if rows == 1 else {"rows": beams[i * rows:(i + 1) * rows]}).encode("utf-8")
+                for i in range(requests)]
+
+    latencies, failures = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, path, schedule[i::concurrency], latencies, failures)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.asarray(latencies) * 1e3
+    return {"requests": requests, "rows_per_request": rows, "concurrency": concurrency, "failures": len(failures),
+            "seconds": elapsed, "requests_per_s": requests / elapsed, "rows_per_s": requests * rows / elapsed,
+            "mean_ms": float(latencies.mean()), "p50_ms": float(np.percentile(latencies, 50)),
+            "p90_ms": float(np.percentile(latencies, 90)), "p99_ms": float(np.percentile(latencies, 99)),
+            "p999_ms": float(np.percentile(latencies, 99.9)), "max_ms": float(latencies.max())}
+
+
+def load_test(*args, **kwargs) -> dict:
+    """Blocking run_load_test."""
+    return asyncio.run(run_load_test(*args, **kwargs))
@@ -0,0 +1,93 @@
+"""Section selection: the lightest parent section and R reaching a required stiffness.
+
+Every beam (span and opening) is paired with every candidate section and R value, and
+all of the pairs are scored with one batched prediction. The modified moment of inertia
+of a candidate is alpha times the catalogue Ix of its parent section (cm^4). The
+candidates of each beam are ranked by weight per metre, and the Pareto front is the set
+that no lighter-or-equal candidate beats in modified inertia.
+
+Every candidate carries mmi.validate reason bits. Beams with a missing or non-positive L
+or d0 (or a missing or negative required inertia), and candidates whose q = R h / d0
+falls outside 1.25 <= q <= 1.75 or whose R is off the engine's grid, are not scored and
+never chosen. A candidate whose x = L / (R h) lies outside the training range is still
+scored and may be chosen, but is flagged X_EXTRAPOLATED.
+"""
+import numpy as np
+
+from mmi.core import Q_MAX, Q_MIN, R_VALUES, SECTIONS, model_covers, predict_batch, round_q_batch
+from mmi.engines import X_MAX, X_MIN, get_engine
+from mmi.validate import ERRORS, NON_NUMERIC, NON_POSITIVE, OUTSIDE_ENGINE, Q_OUT_OF_RANGE, X_EXTRAPOLATED
+
+
+def optimize_sections(length, opening_diameter, required_inertia=0.0, sections=None, R=None, model=None,
+                      engine: str = None) -> dict:
+    """Lightest candidate of every beam whose modified inertia reaches required_inertia.
+
+    length, opening_diameter and required_inertia broadcast to one value per beam;
+    sections (catalogue order by default) and R (R_VALUES by default) span the
+    candidates. The result holds the chosen candidate per beam (section_index -1 and NaN
+    when none qualifies) with its reason bits, or those of the beam's inputs when it has
+    none, and, under "candidates", (beams, candidates) arrays of every candidate sorted by
+    weight, with its reasons, its rank among the qualifying ones (-1 if it does not
+    qualify) and whether it is on the Pareto front.
+    """
+    model = model if model is not None else get_engine(engine)
+    length, opening_diameter, required_inertia = (
+        np.array(value, dtype=np.float64).ravel()
+        for value in np.broadcast_arrays(length, opening_diameter, required_inertia))
+    section_index = SECTIONS.index(list(SECTIONS) if sections is None else list(sections))
+    if (section_index < 0).any():
+        raise ValueError(f"Unknown sections: {', '.join(np.asarray(sections)[section_index < 0])}")
+    R_options = np.asarray(R_VALUES if R is None else R, dtype=np.float64).ravel()
+
+    candidate_section = np.repeat(section_index, len(R_options))
+    candidate_R = np.tile(R_options, len(section_index))
+    # Expanding the parent section by R does not change its weight per metre
+    weight = SECTIONS.take(candidate_section, "weight")
+
+    dg = candidate_R * SECTIONS.take(candidate_section, "h")
+    x = length[:, None] / dg
+    q = dg / opening_diameter[:, None]
+    # Reasons as in mmi.validate: a beam with a missing or non-positive input gets no candidate scored
+    non_numeric = ~(np.isfinite(length) & np.isfinite(opening_diameter) & np.isfinite(required_inertia))
+    non_positive = ~non_numeric & ((length <= 0) | (opening_diameter <= 0) | (required_inertia < 0))
+    computed = ~(non_numeric | non_positive)[:, None]
+    reason = ((non_numeric * NON_NUMERIC | non_positive * NON_POSITIVE)[:, None]
+              | (computed & ~((q >= Q_MIN) & (q <= Q_MAX))) * Q_OUT_OF_RANGE
+              | (computed & ~((x >= X_MIN) & (x <= X_MAX))) * X_EXTRAPOLATED).astype(np.uint8)
+    candidate_lambda = np.broadcast_to(SECTIONS.take(candidate_section, "lambda"), q.shape)
+    scorable = np.flatnonzero((reason & ERRORS) == 0)
+    covered = model_covers(model, x.ravel()[scorable], np.broadcast_to(candidate_R, q.shape).ravel()[scorable],
+                           round_q_batch(q.ravel()[scorable]), candidate_lambda.ravel()[scorable])
+    reason.ravel()[scorable[~covered]] |= OUTSIDE_ENGINE
+    valid = (reason & ERRORS) == 0
+    alpha = np.full(q.shape, np.nan)
+    alpha[valid] = predict_batch(model, x[valid], np.broadcast_to(candidate_R, q.shape)[valid],
+                                 round_q_batch(q[valid]),
+                                 candidate_lambda[valid])
+    inertia = alpha * SECTIONS.take(candidate_section, "Ix")
+    q_rounded = np.where(valid, round_q_batch(q), np.nan)
+
+    # Candidates by weight and, within a weight, stiffest first, so that one is chosen and on the front
+    order = np.lexsort((-np.nan_to_num(inertia, nan=-np.inf), np.broadcast_to(weight, q.shape)), axis=-1)
+    rows = np.arange(len(q))[:, None]
+    candidates = {"section_index": candidate_section[order], "R": candidate_R[order], "weight": weight[order],
+                  "x": x[rows, order], "q": q[rows, order], "q_rounded": q_rounded[rows, order],
+                  "alpha": alpha[rows, order], "inertia": inertia[rows, order], "reason": reason[rows, order]}
+    stiffness = np.nan_to_num(candidates["inertia"], nan=-np.inf)
+    best_before = np.maximum.accumulate(np.concatenate([np.full((len(q), 1), -np.inf), stiffness[:, :-1]], axis=1),
+                                        axis=1)
+    candidates["pareto"] = stiffness > best_before
+    qualifies = ((candidates["reason"] & ERRORS) == 0) & (stiffness >= required_inertia[:, None])
+    candidates["rank"] = np.where(qualifies, np.cumsum(qualifies, axis=1) - 1, -1)
+
+    found = qualifies.any(axis=1)
+    chosen = np.argmax(qualifies, axis=1)
+    result = {"L": length, "d0": opening_diameter, "required_inertia": required_inertia}
+    for name in ("section_index", "R", "weight", "x", "q", "q_rounded", "alpha", "inertia"):
+        values = candidates[name][np.arange(len(q)), chosen]
+        result[name] = np.where(found, values, -1 if name == "section_index" else np.nan)
+    result["reason"] = np.where(found, candidates["reason"][np.arange(len(q)), chosen],
+                                reason[:, 0] & (NON_NUMERIC | NON_POSITIVE)).astype(np.uint8)
+    result["candidates"] = candidates
+    return result
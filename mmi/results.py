@@ -0,0 +1,284 @@
+"""Columnar store of calculation results.
+
+Results are kept as raw numbers in preallocated NumPy columns that grow geometrically, so
+appending is amortized O(1) and exporters and views can read whole columns or chunks of
+them instead of formatted strings.
+
+Results are saved as a results directory (conventionally ``*.mmires``): one raw
+little-endian binary file per column plus a versioned ``manifest.json`` holding the row
+count, the column dtypes, the section and engine names that section_index and
+engine_index refer to and the list of appended runs. Opening memory-maps the column
+files, so it takes milliseconds whatever the size, and appending a run only writes the
+new rows and a new manifest.
+
+Every row records the engine that scored it, so results of different engines can share
+a table without being mixed up.
+"""
+import datetime
+import json
+import operator
+import os
+import re
+
+import numpy as np
+
+from mmi.core import SECTIONS
+from mmi.engines import ENGINES
+
+
+# Raw columns of a result row; section_index refers to the core section catalogue and engine_index
+# to mmi.engines.ENGINES (-1 if unknown)
+RESULT_COLUMNS = ("L", "d0", "section_index", "R", "x", "q", "lambda", "alpha", "engine_index")
+RESULT_DTYPES = {name: {"section_index": np.int32, "engine_index": np.int8}.get(name, np.float64)
+                 for name in RESULT_COLUMNS}
+
+# Columns shown by the calculator table and the exporters: (column, header, decimals), with
+# decimals None for the engine, shown by name (see display_values)
+DISPLAY_COLUMNS = (
+    ("alpha", "Alpha α", 3),
+    ("x", "L/dg", 3),
+    ("q", "q", 3),
+    ("R", "R", 3),
+    ("lambda", "λ", 4),
+    ("engine_index", "Engine", None),
+)
+
+RESULTS_FORMAT = "mmi-results"
+# Version 2 added engine_index; version 1 directories read as engine -1 and are upgraded on append
+RESULTS_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+FILTER_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq,
+                    "=": operator.eq, "!=": operator.ne}
+FILTER_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>|=)\s*(\S+)\s*$")
+
+
+def engine_names() -> np.ndarray:
+    """Engine name of every engine_index, with "" for -1 at the end."""
+    return np.asarray(list(ENGINES) + [""], dtype=object)
+
+
+def display_values(column: str, values: np.ndarray) -> np.ndarray:
+    """Values of a DISPLAY_COLUMNS column as shown: engine names for engine_index, else the numbers."""
+    return engine_names()[values] if column == "engine_index" else values
+
+
+class ResultsTable:
+    """Growable, columnar table of results."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._columns = {name: np.empty(capacity, dtype=RESULT_DTYPES[name]) for name in RESULT_COLUMNS}
+        self._size = 0
+
+    @classmethod
+    def open(cls, directory: str) -> "ResultsTable":
+        """Open a saved results directory without copying; the columns are copied on the first append."""
+        table = cls(0)
+        table._columns = open_results(directory)
+        table._size = len(table._columns["alpha"])
+        return table
+
+    def save(self, directory: str, append: bool = False) -> None:
+        """Write the rows to a results directory, replacing it unless append is set."""
+        if not append:
+            remove_results(directory)
+        append_results(directory, {name: self.column(name) for name in RESULT_COLUMNS})
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns["alpha"])
+
+    def _reserve(self, size: int) -> None:
+        # Columns opened from a results directory are read-only maps and are copied on first write
+        if size <= self.capacity and self._columns["alpha"].flags.writeable:
+            return
+        capacity = max(size, 2 * self.capacity)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, L: float, d0: float, section: str, R: float, x: float, q: float, lambda_: float,
+               alpha: float, engine: str) -> None:
+        """Append one result row scored by engine."""
+        self.extend({"L": L, "d0": d0, "section_index": SECTIONS.index([section]), "R": R, "x": x, "q": q,
+                     "lambda": lambda_, "alpha": alpha, "engine_index": list(ENGINES).index(engine)})
+
+    def extend(self, columns: dict) -> None:
+        """Append rows given as a mapping of column name to equally long arrays (or scalars)."""
+        arrays = np.broadcast_arrays(*(np.atleast_1d(columns[name]) for name in RESULT_COLUMNS))
+        count = len(arrays[0])
+        self._reserve(self._size + count)
+        for name, values in zip(RESULT_COLUMNS, arrays):
+            self._columns[name][self._size:self._size + count] = values
+        self._size += count
+
+    def clear(self) -> None:
+        """Remove every row, keeping the allocated capacity."""
+        self._size = 0
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def sections(self) -> np.ndarray:
+        """Section names of every row."""
+        names = np.asarray(SECTIONS.names + ("",), dtype=object)
+        return names[self.column("section_index")]
+
+    def engines(self) -> np.ndarray:
+        """Name of the engine that scored every row, "" where unknown."""
+        return engine_names()[self.column("engine_index")]
+
+    def filter_mask(self, expression: str) -> np.ndarray:
+        """Boolean mask of the rows matching expression, e.g. "alpha > 0.9 and section == IPE300".
+
+        Conditions compare a result column (or "section" or "engine") with a value and are
+        joined with "and"; an empty expression matches every row.
+        """
+        mask = np.ones(self._size, dtype=bool)
+        for condition in filter(None, (part.strip() for part in re.split(r"\band\b", expression))):
+            match = FILTER_CONDITION.match(condition)
+            if match is None:
+                raise ValueError(f"Invalid filter condition: {condition}")
+            name, symbol, value = match.groups()
+            compare = FILTER_OPERATORS[symbol]
+            if name == "section":
+                if value not in SECTIONS:
+                    raise ValueError(f"Unknown section: {value}")
+                mask &= compare(self.column("section_index"), SECTIONS.index([value])[0])
+            elif name == "engine":
+                if value not in ENGINES:
+                    raise ValueError(f"Unknown engine: {value}")
+                mask &= compare(self.column("engine_index"), list(ENGINES).index(value))
+            elif name in RESULT_COLUMNS and name not in ("section_index", "engine_index"):
+                mask &= compare(self.column(name), float(value))
+            else:
+                raise ValueError(f"Unknown filter column: {name}")
+        return mask
+
+    def iter_chunks(self, chunk_rows: int = 65536, columns=RESULT_COLUMNS):
+        """Yield dicts of read-only column views covering at most chunk_rows rows each."""
+        for start in range(0, self._size, chunk_rows):
+            stop = min(start + chunk_rows, self._size)
+            yield {name: self.column(name)[start:stop] for name in columns}
+
+
+def _read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as file:
+        manifest = json.load(file)
+    if manifest.get("format") != RESULTS_FORMAT:
+        raise ValueError(f"{directory} is not a results directory")
+    if manifest.get("version", 0) > RESULTS_VERSION:
+        raise ValueError(f"{directory} uses results format version {manifest['version']}, "
+                         f"newer than the supported version {RESULTS_VERSION}")
+    return manifest
+
+
+def _write_manifest(directory: str, manifest: dict) -> None:
+    # Written to a temporary file and renamed, so the manifest is never half written
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def append_results(directory: str, columns: dict, new_run: bool = True) -> int:
+    """Append rows to a results directory, creating it if needed, and return the new row count.
+
+    The rows are recorded as a new run, or added to the last one when new_run is False so a
+    run can be written in chunks. Only the new rows are written. Bytes beyond the manifest's row count, left by an
+    interrupted append, are truncated first.
+    """
+    if os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+        manifest = _read_manifest(directory)
+    else:
+        os.makedirs(directory, exist_ok=True)
+        manifest = {"format": RESULTS_FORMAT, "version": RESULTS_VERSION, "rows": 0,
+                    "columns": {name: np.dtype(RESULT_DTYPES[name]).newbyteorder("<").str for name in RESULT_COLUMNS},
+                    "sections": list(SECTIONS.names), "engines": list(ENGINES), "runs": []}
+    if "engine_index" not in manifest["columns"]:
+        # Version 1 did not record the engine; its rows are stored as unknown (-1)
+        dtype = np.dtype(RESULT_DTYPES["engine_index"]).newbyteorder("<")
+        with open(os.path.join(directory, "engine_index.bin"), "wb") as file:
+            file.write(np.full(manifest["rows"], -1, dtype=dtype).tobytes())
+        manifest["columns"]["engine_index"] = dtype.str
+        manifest["engines"] = []
+        manifest["version"] = RESULTS_VERSION
+
+    arrays = dict(zip(RESULT_COLUMNS, np.broadcast_arrays(*(np.atleast_1d(columns[name]) for name in RESULT_COLUMNS))))
+    count = len(arrays["alpha"])
+    # Store section indices against the directory's own section list, extended with new names
+    sections = manifest["sections"]
+    for name in SECTIONS.names:
+        if name not in sections:
+            sections.append(name)
+    to_stored = np.array([sections.index(name) for name in SECTIONS.names] + [-1], dtype=np.int32)
+    arrays["section_index"] = to_stored[np.asarray(arrays["section_index"], dtype=np.intp)]
+    engines = manifest["engines"]
+    for name in ENGINES:
+        if name not in engines:
+            engines.append(name)
+    to_stored = np.array([engines.index(name) for name in ENGINES] + [-1], dtype=np.int8)
+    arrays["engine_index"] = to_stored[np.asarray(arrays["engine_index"], dtype=np.intp)]
+
+    for name in RESULT_COLUMNS:
+        dtype = np.dtype(manifest["columns"][name])
+        with open(os.path.join(directory, f"{name}.bin"), "ab") as file:
+            file.truncate(manifest["rows"] * dtype.itemsize)
+            file.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+
+    manifest["rows"] += count
+    if new_run or not manifest["runs"]:
+        manifest["runs"].append({"rows": count, "created": datetime.datetime.now().isoformat(timespec="seconds")})
+    else:
+        manifest["runs"][-1]["rows"] += count
+    _write_manifest(directory, manifest)
+    return manifest["rows"]
+
+
+def open_results(directory: str) -> dict:
+    """Memory-map the columns of a results directory, read-only.
+
+    section_index and engine_index are translated to the current section catalogue and
+    engines when the directory was written with different ones, which costs a copy of
+    that column. Directories of version 1 have no engine_index; it reads as -1.
+    """
+    manifest = _read_manifest(directory)
+    rows = manifest["rows"]
+    columns = {}
+    for name in RESULT_COLUMNS:
+        if name not in manifest["columns"]:
+            columns[name] = np.full(rows, -1, dtype=RESULT_DTYPES[name])
+            continue
+        dtype = np.dtype(manifest["columns"][name])
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+    if manifest["sections"] != list(SECTIONS.names):
+        to_current = np.array([SECTIONS.index([name])[0] for name in manifest["sections"]] + [-1], dtype=np.int32)
+        columns["section_index"] = to_current[np.asarray(columns["section_index"], dtype=np.intp)]
+    engines = manifest.get("engines", [])
+    if engines != list(ENGINES)[:len(engines)]:
+        to_current = np.array([list(ENGINES).index(name) if name in ENGINES else -1 for name in engines] + [-1],
+                              dtype=np.int8)
+        columns["engine_index"] = to_current[np.asarray(columns["engine_index"], dtype=np.intp)]
+    return columns
+
+
+def remove_results(directory: str) -> None:
+    """Delete a results directory written by append_results, if it exists."""
+    if not os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+        return
+    _read_manifest(directory)
+    for name in RESULT_COLUMNS:
+        path = os.path.join(directory, f"{name}.bin")
+        if os.path.exists(path):
+            os.remove(path)
+    os.remove(os.path.join(directory, MANIFEST_FILE))
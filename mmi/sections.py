@@ -0,0 +1,94 @@
+"""Immutable, array-backed catalogue of steel sections.
+
+Sections are read from CSV files with a ``name`` and ``family`` column followed by numeric
+properties (``lambda``, ``h``, ``Ix``, ``weight``, ...). Each family lives in its own file
+under ``mmi/data/sections``, so HEA/HEB/UPN tables can be added by dropping in another
+file with the same header.
+"""
+import csv
+import glob
+import os
+
+import numpy as np
+
+
+SECTIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sections")
+
+
+class SectionCatalogue:
+    """Read-only table of sections stored as one structured NumPy array."""
+
+    __slots__ = ("records", "names", "_index")
+
+    def __init__(self, records: np.ndarray) -> None:
+        records = records.copy()
+        records.flags.writeable = False
+        self.records = records
+        self.names = tuple(records["name"].tolist())
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Duplicate section names in catalogue")
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_csv(cls, *file_paths: str) -> "SectionCatalogue":
+        """Build a catalogue from one or more section CSV files sharing the same header."""
+        header = None
+        rows = []
+        for file_path in file_paths:
+            with open(file_path, newline="", encoding="utf-8") as file:
+                reader = csv.reader(file)
+                file_header = next(reader)
+                if header is None:
+                    header = file_header
+                elif file_header != header:
+                    raise ValueError(f"{file_path} does not match the catalogue header")
+                rows.extend(row for row in reader if row)
+        if header is None or header[:2] != ["name", "family"]:
+            raise ValueError("Section files must start with the name and family columns")
+        dtype = [("name", "U16"), ("family", "U16")] + [(column, np.float64) for column in header[2:]]
+        records = np.array([(row[0], row[1], *map(float, row[2:])) for row in rows], dtype=dtype)
+        return cls(records)
+
+    @property
+    def properties(self) -> tuple:
+        """Names of the numeric section properties."""
+        return self.records.dtype.names[2:]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __getitem__(self, name: str):
+        """Return the record of a section; fields are read as record["h"], record["Ix"], ..."""
+        return self.records[self._index[name]]
+
+    def column(self, prop: str) -> np.ndarray:
+        """Return one property for every section, in catalogue order."""
+        return self.records[prop]
+
+    def index(self, names) -> np.ndarray:
+        """Map section names to catalogue indices, -1 for unknown names.
+
+        Only the distinct names go through the Python lookup, so a million rows drawn from
+        a handful of sections cost a handful of dict accesses plus NumPy indexing.
+        """
+        names = np.asarray(names, dtype=str)
+        unique, inverse = np.unique(names, return_inverse=True)
+        unique_index = np.array([self._index.get(name, -1) for name in unique.tolist()], dtype=np.intp)
+        return unique_index[inverse].reshape(names.shape)
+
+    def take(self, indices, prop: str) -> np.ndarray:
+        """Fancy-index one property by catalogue index; -1 yields NaN."""
+        indices = np.asarray(indices, dtype=np.intp)
+        values = self.records[prop][np.where(indices >= 0, indices, 0)]
+        return np.where(indices >= 0, values, np.nan)
+
+
+def load_sections(directory: str = SECTIONS_DIRECTORY) -> SectionCatalogue:
+    """Load every section family CSV found in directory into one catalogue."""
+    return SectionCatalogue.from_csv(*sorted(glob.glob(os.path.join(directory, "*.csv"))))
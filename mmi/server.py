@@ -0,0 +1,318 @@
+"""Local HTTP/JSON scoring service with micro-batching.
+
+The server keeps the model resident and coalesces concurrent requests: every request is
+queued with its model inputs, and a batching task gathers whatever arrived within
+max_wait (up to max_batch rows) into one prediction call, then hands each request its
+slice of the result. Predictions run on a dedicated thread, so the event loop keeps
+accepting requests while a batch is scored, and those requests form the next batch.
+
+It is built on asyncio streams with a minimal HTTP/1.1 implementation (keep-alive,
+Content-Length bodies) and binds to localhost by default, so it needs no network access
+and no packages beyond NumPy.
+
+Endpoints:
+    GET  /health        status and default engine
+    GET  /stats         requests, rows and batches per engine
+    POST /score         one row: {"L", "d0", "section", "R"} or {"x", "R", "q", "lambda"}
+    POST /score/batch   {"rows": [row, ...]} or columns: {"L": [...], "d0": [...], ...}
+
+Every endpoint takes an optional ``?engine=name`` query parameter.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from mmi.cache import PredictionCache
+from mmi.core import model_registry
+from mmi.engines import X_MAX, X_MIN, default_engine, engine_path
+from mmi.validate import (ERRORS, NON_NUMERIC, OUTSIDE_ENGINE, WARNINGS, X_EXTRAPOLATED, as_float, reason_messages,
+                          validate)
+
+
+RAW_INPUTS = ("L", "d0", "section", "R")
+FEATURE_INPUTS = ("x", "R", "q", "lambda")
+MAX_BODY_BYTES = 64 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """Client error answered with an HTTP status and a message."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _check_scalars(columns: dict) -> None:
+    for name, values in columns.items():
+        for row, value in enumerate(values):
+            if isinstance(value, (list, dict)):
+                raise RequestError(422, f"{name} of row {row} must be a number or a string, not {type(value).__name__}")
+
+
+def prepare_features(columns: dict, count: int, feature_rows: np.ndarray = None) -> dict:
+    """Turn raw inputs or model features into the (x, R, q, lambda) model inputs, with reasons per row.
+
+    feature_rows marks the rows given as model features, the others being raw inputs; by
+    default that follows from which columns are present. Raw inputs are validated with
+    mmi.validate and get q rounded to its bucket as in the calculator. Rows with errors
+    get an error message and are not scored; an x outside the training range only gets a
+    warning. Rows outside the input domain of the engine are only known once scored, see
+    ScoringServer.score.
+    """
+    if any(len(values) != count for values in columns.values()):
+        raise RequestError(422, "Every input column needs the same number of values")
+    _check_scalars(columns)
+    if feature_rows is None:
+        if all(name in columns for name in FEATURE_INPUTS):
+            feature_rows = np.ones(count, dtype=bool)
+        elif all(name in columns for name in RAW_INPUTS):
+            feature_rows = np.zeros(count, dtype=bool)
+        else:
+            raise RequestError(422, f"Expected either {', '.join(RAW_INPUTS)} or {', '.join(FEATURE_INPUTS)}")
+
+    validation = {name: np.full(count, np.nan) for name in ("x", "R", "q", "q_rounded", "lambda")}
+    validation["reason"] = np.zeros(count, dtype=np.uint8)
+    for kind, rows in ((FEATURE_INPUTS, np.flatnonzero(feature_rows)), (RAW_INPUTS, np.flatnonzero(~feature_rows))):
+        if not len(rows):
+            continue
+        # Rows of a mixed batch lack the other kind's columns, and single-kind batches need no copy
+        values = {name: (columns[name] if len(rows) == count else np.asarray(columns[name], dtype=object)[rows])
+                  if name in columns else [None] * len(rows) for name in kind}
+        if kind is FEATURE_INPUTS:
+            x, R, q, lambda_ = (as_float(values[name]) for name in FEATURE_INPUTS)
+            finite = np.isfinite(x) & np.isfinite(R) & np.isfinite(q) & np.isfinite(lambda_)
+            with np.errstate(invalid="ignore"):
+                extrapolated = finite & ~((x >= X_MIN) & (x <= X_MAX))
+            reason = (~finite * NON_NUMERIC | extrapolated * X_EXTRAPOLATED).astype(np.uint8)
+            part = {"x": x, "R": R, "q": q, "q_rounded": q, "lambda": lambda_, "reason": reason}
+        else:
+            part = validate(values["L"], values["d0"], values["section"], values["R"])
+        for name in validation:
+            validation[name][rows] = part[name]
+    validation["error"] = reason_messages(validation, ERRORS)
+    validation["warning"] = reason_messages(validation, WARNINGS)
+    validation["valid"] = (validation["reason"] & ERRORS) == 0
+    return validation
+
+
+class MicroBatcher:
+    """Coalesces concurrent prediction requests into one model call per batch."""
+
+    def __init__(self, model_path: str, max_batch: int = 8192, max_wait: float = 0.002) -> None:
+        self.model_path = model_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = PredictionCache()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mmi-score")
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "rows": self.rows, "batches": self.batches,
+                "rows_per_batch": self.rows / self.batches if self.batches else 0.0, **self.cache.stats()}
+
+    async def predict(self, features: np.ndarray) -> np.ndarray:
+        """Alpha for a (rows, 4) matrix of x, R, q, lambda, scored together with concurrent requests."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    def _drain(self, pending: list, rows: int) -> int:
+        while rows < self.max_batch and not self._queue.empty():
+            item = self._queue.get_nowait()
+            pending.append(item)
+            rows += len(item[0])
+        return rows
+
+    def _score(self, features: np.ndarray) -> np.ndarray:
+        model = model_registry.get(self.model_path)
+        return self.cache.predict_batch(model, features[:, 0], features[:, 1], features[:, 2], features[:, 3])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            rows = self._drain(pending, len(pending[0][0]))
+            if rows < self.max_batch and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+                rows = self._drain(pending, rows)
+            features = np.concatenate([item[0] for item in pending])
+            try:
+                alpha = await loop.run_in_executor(self._executor, self._score, features)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.requests += len(pending)
+            self.rows += rows
+            self.batches += 1
+            bounds = np.cumsum([len(item[0]) for item in pending])[:-1]
+            for (_, future), part in zip(pending, np.split(alpha, bounds)):
+                if not future.done():
+                    future.set_result(part)
+
+
+class ScoringServer:
+    """HTTP front end of one MicroBatcher per engine."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, engine: str = None, max_batch: int = 8192,
+                 max_wait: float = 0.002) -> None:
+        self.host = host
+        self.port = port
+        self.engine = engine or default_engine()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._batchers = {}
+
+    def batcher(self, engine: str = None) -> MicroBatcher:
+        engine = engine or self.engine
+        if engine not in self._batchers:
+            try:
+                model_path = engine_path(engine)
+            except ValueError as e:
+                raise RequestError(400, str(e))
+            self._batchers[engine] = MicroBatcher(model_path, self.max_batch, self.max_wait)
+        return self._batchers[engine]
+
+    async def score(self, columns: dict, count: int, engine: str = None, feature_rows: np.ndarray = None) -> dict:
+        """Score count rows given as columns and return the columnar result.
+
+        feature_rows marks the rows given as model features, see prepare_features.
+        """
+        batcher = self.batcher(engine)
+        if count == 0:
+            return {name: [] for name in ("alpha", "x", "q", "lambda", "reason", "error", "warning")}
+        features = prepare_features(columns, count, feature_rows)
+        valid = features["valid"]
+        alpha = np.full(count, np.nan)
+        if valid.any():
+            matrix = np.column_stack([features[name][valid] for name in ("x", "R", "q_rounded", "lambda")])
+            alpha[valid] = await batcher.predict(matrix)
+            # Engines answer NaN exactly outside their input domain, which saves validating
+            # every request against the engine's grid as well
+            outside = valid & np.isnan(alpha)
+            if outside.any():
+                features["reason"][outside] |= OUTSIDE_ENGINE
+                features["error"] = reason_messages(features, ERRORS)
+                valid = valid & ~outside
+
+        def listed(values: np.ndarray) -> list:
+            # JSON has no NaN or infinity, so unscored values become null
+            return np.where(np.isfinite(values), values, None).tolist()
+
+        return {"alpha": listed(alpha), "x": listed(features["x"]),
+                "q": listed(np.where(valid, features["q_rounded"], features["q"])),
+                "lambda": listed(features["lambda"]), "reason": features["reason"].tolist(),
+                "error": [message or None for message in features["error"].tolist()],
+                "warning": [message or None for message in features["warning"].tolist()]}
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        """Return the (status, payload) answer to one request."""
+        url = urlsplit(target)
+        engine = parse_qs(url.query).get("engine", [None])[0]
+        routes = {"/health": "GET", "/stats": "GET", "/score": "POST", "/score/batch": "POST"}
+        if url.path not in routes:
+            raise RequestError(404, f"No such endpoint: {url.path}")
+        if method != routes[url.path]:
+            raise RequestError(405, f"{url.path} only accepts {routes[url.path]}")
+        if url.path == "/health":
+            return 200, {"status": "ok", "engine": self.engine, "model": engine_path(self.engine)}
+        if url.path == "/stats":
+            return 200, {name: batcher.stats() for name, batcher in self._batchers.items()}
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError as e:
+            raise RequestError(400, f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "Expected a JSON object")
+        if url.path == "/score":
+            result = await self.score({name: [value] for name, value in payload.items()}, 1, engine)
+            row = {name: values[0] for name, values in result.items()}
+            return (422 if row["error"] else 200), row
+        rows = payload.get("rows")
+        if rows is not None:
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise RequestError(400, "rows must be a list of objects")
+            names = set().union(*rows) if rows else set()
+            columns = {name: [row.get(name) for row in rows] for name in names}
+            count = len(rows)
+            # Every row is given either as raw inputs or as model features, independently of the others
+            feature_rows = np.array([all(name in row for name in FEATURE_INPUTS) for row in rows], dtype=bool)
+            if count and not feature_rows.all() and not all(name in names for name in RAW_INPUTS):
+                raise RequestError(422, f"Expected either {', '.join(RAW_INPUTS)} or {', '.join(FEATURE_INPUTS)}")
+            return 200, await self.score(columns, count, engine, feature_rows)
+        columns = {name: values for name, values in payload.items() if isinstance(values, list)}
+        count = len(next(iter(columns.values()))) if columns else 0
+        return 200, await self.score(columns, count, engine)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                try:
+                    if length > MAX_BODY_BYTES:
+                        raise RequestError(413, f"Request bodies are limited to {MAX_BODY_BYTES} bytes")
+                    body = await reader.readexactly(length)
+                    status, payload = await self.dispatch(method, target, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close" \
+                    and status != 413
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}"
+                             f"\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self, ready=None) -> None:
+        """Load the default engine, then answer requests until cancelled."""
+        model_registry.get(engine_path(self.engine))
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready(self)
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, engine: str = None, max_batch: int = 8192,
+          max_wait: float = 0.002, ready=None) -> None:
+    """Run a scoring server in the current thread until interrupted."""
+    try:
+        asyncio.run(ScoringServer(host, port, engine, max_batch, max_wait).serve_forever(ready))
+    except KeyboardInterrupt:
+        pass
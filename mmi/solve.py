@@ -0,0 +1,228 @@
+"""Inverse problems: the opening diameter or span at which alpha reaches a target.
+
+    solve_opening   the largest d0 with alpha >= target, within 1.25 <= q <= 1.75
+    solve_length    the shortest L with alpha >= target, within the training x range,
+                    and the shortest L from which every longer span in that range
+                    reaches the target as well
+
+Alpha is not monotonic in either unknown, so neither is found by bisection over the
+whole range. The opening only reaches the model through its q bucket and the span
+through x = L / dg, on which the engines are step functions (a tree ensemble is
+constant between its x split points, and so is the surface built on them). Both
+solvers therefore score every cell of the range for every distinct (R, q, lambda) of
+the beams in one batched prediction and read the boundary off those cells. Engines
+without x split points are scored on a uniform grid of X_CELLS cells, and the boundary
+is bisected within its cell.
+
+The results are columns like those of a sweep, with a status per beam:
+
+    solved      a value inside the search range reaches the target
+    bound       the range limit already reaches the target; the value is that limit
+    infeasible  no value in the range reaches the target
+    invalid     unknown section, missing or non-positive input, missing target, inputs
+                outside the engine's domain or, for solve_length, q out of range; d0 or L
+                and alpha are NaN
+"""
+import numpy as np
+
+from mmi.core import MODEL_FILE_PATH, Q_BUCKETS, Q_MIN, SECTIONS, model_registry, predict_batch, round_q_batch
+from mmi.engines import X_MAX, X_MIN, engine_of, get_engine
+from mmi.surface import AlphaSurface
+from mmi.validate import ERRORS, NON_NUMERIC, NON_POSITIVE, UNKNOWN_SECTION, as_float, validate
+
+
+STATUSES = ("solved", "bound", "infeasible", "invalid")
+# Solved column -> input column held fixed
+UNKNOWNS = {"d0": "L", "L": "d0"}
+OUTPUT_COLUMNS = ["L", "d0", "section", "R", "target", "x", "q", "q_rounded", "lambda", "alpha", "status"]
+# Extra output columns when solving for a column
+SOLVED_COLUMNS = {"d0": [], "L": ["L_stable"]}
+# Uniform x cells scored for engines whose x split points are not known
+X_CELLS = 512
+
+
+def _bisect(evaluate, lo: np.ndarray, hi: np.ndarray, target: np.ndarray, rising: bool, tolerance: float) -> tuple:
+    """Boundary of alpha >= target between lo and hi for every beam, and its status code.
+
+    evaluate(values, rows) returns the alpha of beams rows at values. When alpha is rising
+    the feasible side is hi and the boundary is the smallest feasible value, otherwise it
+    is the largest. The returned boundary always meets the target. Alpha is assumed to
+    cross the target once between lo and hi, so callers bracket a single cell.
+    """
+    count = len(lo)
+    rows = np.arange(count)
+    ends = evaluate(np.concatenate([lo, hi]), np.concatenate([rows, rows]))
+    feasible_end, infeasible_end = (hi, lo) if rising else (lo, hi)
+    alpha_feasible, alpha_infeasible = (ends[count:], ends[:count]) if rising else (ends[:count], ends[count:])
+    # NaN compares False, so beams the model cannot score come out infeasible
+    status = np.where(alpha_feasible >= target, np.where(alpha_infeasible >= target, 1, 0), 2)
+    value = np.where(status == 1, infeasible_end, np.where(status == 0, feasible_end, np.nan))
+
+    active = np.flatnonzero(status == 0)
+    good, bad = feasible_end[active], infeasible_end[active]
+    while len(active):
+        middle = (good + bad) / 2
+        meets = evaluate(middle, active) >= target[active]
+        good = np.where(meets, middle, good)
+        bad = np.where(meets, bad, middle)
+        done = np.abs(good - bad) <= tolerance
+        value[active[done]] = good[done]
+        active, good, bad = active[~done], good[~done], bad[~done]
+    return value, status
+
+
+def _beams(fixed, section, R, target) -> tuple:
+    fixed, R, target = (np.atleast_1d(as_float(value)) for value in (fixed, R, target))
+    fixed, R, target, section = (np.array(value).ravel() for value in np.broadcast_arrays(
+        fixed, R, target, np.atleast_1d(np.asarray(section, dtype=object))))
+    return fixed, section, R, target
+
+
+def _results(section_index, R, target, L, d0, dg, lambda_, alpha, status) -> dict:
+    q = dg / d0
+    return {"section_index": section_index, "R": R, "target": target, "L": L, "d0": d0, "x": L / dg, "q": q,
+            "q_rounded": round_q_batch(q), "lambda": lambda_, "alpha": alpha,
+            "status": np.asarray(STATUSES)[status]}
+
+
+def solve_opening(length, section, R, target, model=None, engine: str = None, tolerance: float = 0.1) -> dict:
+    """Largest opening diameter of every beam whose alpha still reaches target.
+
+    length, section, R and target broadcast against each other. The opening only reaches
+    the model through its q bucket, so alpha is a step function of d0 and the bracket is
+    found exactly: every bucket of every valid beam is scored in one batched prediction,
+    and the opening is the largest one in the smallest bucket that reaches target. A
+    bucket q_b covers q in (q_b-1, q_b], so its largest opening, dg / q_b-1, is not part of
+    it and d0 ends up tolerance (in the units of length) below it.
+    """
+    model = model if model is not None else get_engine(engine)
+    length, section, R, target = _beams(length, section, R, target)
+    # d0 is the unknown, so a unit opening stands in for it and only L, section and R are checked
+    validation = validate(length, 1.0, section, R)
+    section_index, x, lambda_ = validation["section_index"], validation["x"], validation["lambda"]
+    dg = R * SECTIONS.take(section_index, "h")
+    valid = np.flatnonzero(((validation["reason"] & (NON_NUMERIC | NON_POSITIVE | UNKNOWN_SECTION)) == 0)
+                           & np.isfinite(target))
+
+    buckets = np.asarray(Q_BUCKETS)
+    alpha_by_bucket = predict_batch(model, x[valid, None], R[valid, None], buckets, lambda_[valid, None])
+    # Beams the engine has no answer for in any bucket (e.g. an R off its grid) are invalid
+    covered = ~np.isnan(alpha_by_bucket).all(axis=1)
+    meets = alpha_by_bucket >= target[valid, None]
+    # The largest opening belongs to the smallest q, i.e. the first bucket meeting target
+    first = np.argmax(meets, axis=1)
+    feasible = meets.any(axis=1)
+    lower_q = np.concatenate([[Q_MIN], buckets[:-1]])[first]
+    d0 = np.full(len(x), np.nan)
+    alpha = np.full(len(x), np.nan)
+    status = np.full(len(x), 3)
+    d0[valid] = np.where(feasible, np.where(first == 0, dg[valid] / Q_MIN, dg[valid] / lower_q - tolerance), np.nan)
+    alpha[valid] = np.where(feasible, alpha_by_bucket[np.arange(len(valid)), first], np.nan)
+    status[valid] = np.where(~covered, 3, np.where(~feasible, 2, np.where(first == 0, 1, 0)))
+    return _results(section_index, R, target, length, d0, dg, lambda_, alpha, status)
+
+
+def _x_cells(model) -> tuple:
+    """Start x of the cells of X_MIN..X_MAX on which model is scored, and whether it is constant on each."""
+    if hasattr(model, "split_points"):
+        edges, steps = model.split_points(0).astype(np.float64), True
+    elif isinstance(model, AlphaSurface):
+        edges, steps = model.x.astype(np.float64), model.interpolation == "previous"
+    else:
+        edges, steps = np.linspace(X_MIN, X_MAX, X_CELLS + 1), False
+    # A cell starting at an edge covers [edge, next edge), so X_MAX itself still starts one
+    return np.concatenate([[X_MIN], edges[(edges > X_MIN) & (edges <= X_MAX)]]), steps
+
+
+def solve_length(opening_diameter, section, R, target, model=None, engine: str = None,
+                 tolerance: float = 1.0) -> dict:
+    """Shortest span of every beam whose alpha reaches target, and the shortest from which every longer one does.
+
+    opening_diameter, section, R and target broadcast against each other; spans range
+    from X_MIN to X_MAX times dg. Alpha depends on the span only through x, so every x
+    cell is scored once per distinct (R, q, lambda) of the beams. L is the start of the
+    first cell reaching target and L_stable the start of the first cell from which every
+    later one does (NaN if the last one does not). On engines that are not constant
+    within a cell, both are bisected to within tolerance (in the units of
+    opening_diameter) inside their cell.
+    """
+    model = model if model is not None else get_engine(engine)
+    opening_diameter, section, R, target = _beams(opening_diameter, section, R, target)
+    # L is the unknown, so a unit span stands in for it; its x is only ever a warning
+    validation = validate(1.0, opening_diameter, section, R, model=model)
+    section_index, q_rounded, lambda_ = validation["section_index"], validation["q_rounded"], validation["lambda"]
+    dg = R * SECTIONS.take(section_index, "h")
+    valid = np.flatnonzero(((validation["reason"] & ERRORS) == 0) & np.isfinite(target))
+
+    cells, steps = _x_cells(model)
+    curves, curve = np.unique(np.column_stack([R[valid], q_rounded[valid], lambda_[valid]]), axis=0,
+                              return_inverse=True)
+    alpha_by_cell = predict_batch(model, cells, curves[:, 0, None], curves[:, 1, None], curves[:, 2, None])
+    meets = alpha_by_cell[curve.ravel()] >= target[valid, None]
+    reached = meets.any(axis=1)
+    first = np.argmax(meets, axis=1)
+    # Every cell from stable on meets the target; len(cells) when the last one does not
+    stable = len(cells) - np.argmax(~meets[:, ::-1], axis=1)
+    stable = np.where(meets.all(axis=1), 0, stable)
+
+    length = np.full(len(dg), np.nan)
+    length_stable = np.full(len(dg), np.nan)
+    status = np.full(len(dg), 3)
+    length[valid] = np.where(reached, cells[first] * dg[valid], np.nan)
+    length_stable[valid] = np.where(stable < len(cells), cells[np.minimum(stable, len(cells) - 1)] * dg[valid],
+                                    np.nan)
+    status[valid] = np.where(~reached, 2, np.where(first == 0, 1, 0))
+
+    def evaluate(values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return predict_batch(model, values / dg[rows], R[rows], q_rounded[rows], lambda_[rows])
+
+    if not steps:
+        # Alpha crosses the target somewhere in the cell before the first one reaching it
+        for column, index in ((length, first), (length_stable, stable)):
+            inside = (index > 0) & (index < len(cells)) & reached
+            rows = valid[inside]
+            column[rows], _ = _bisect(lambda values, bracket: evaluate(values, rows[bracket]),
+                                      cells[index[inside] - 1] * dg[rows], column[rows], target[rows], True,
+                                      tolerance)
+    alpha = np.full(len(dg), np.nan)
+    solved = ~np.isnan(length)
+    alpha[solved] = evaluate(length[solved], np.flatnonzero(solved))
+    result = _results(section_index, R, target, length, opening_diameter, dg, lambda_, alpha, status)
+    result["L_stable"] = length_stable
+    return result
+
+
+def run_solve(input_path: str, output_path: str, unknown: str = "d0", model_path: str = MODEL_FILE_PATH,
+              chunksize: int = 10000, tolerance: float = None) -> dict:
+    """Solve every row of a schedule for d0 or L and write the results; return counts per status.
+
+    The schedule needs section, R and target columns, plus L when solving for d0 or d0
+    when solving for L. Any output format of mmi.batch.write_results works.
+    """
+    import pandas as pd
+
+    from mmi.batch import read_schedule, write_results
+
+    solver = solve_opening if unknown == "d0" else solve_length
+    tolerance = tolerance if tolerance is not None else (0.1 if unknown == "d0" else 1.0)
+    model = model_registry.get(model_path)
+    summary = dict.fromkeys(STATUSES, 0)
+
+    def solved_chunks():
+        for frame in read_schedule(input_path, chunksize):
+            missing = {"section", "R", "target", UNKNOWNS[unknown]} - set(frame.columns)
+            if missing:
+                raise ValueError(f"Missing input columns: {', '.join(sorted(missing))}")
+            fixed = pd.to_numeric(frame[UNKNOWNS[unknown]], errors="coerce").to_numpy(np.float64)
+            columns = solver(fixed, frame["section"].fillna("").astype(str).str.strip().tolist(),
+                             pd.to_numeric(frame["R"], errors="coerce").to_numpy(np.float64),
+                             pd.to_numeric(frame["target"], errors="coerce").to_numpy(np.float64),
+                             model, tolerance=tolerance)
+            columns["section"] = frame["section"].to_numpy(dtype=object)
+            for status in STATUSES:
+                summary[status] += int(np.count_nonzero(columns["status"] == status))
+            output = OUTPUT_COLUMNS + SOLVED_COLUMNS[unknown]
+            yield pd.DataFrame({name: columns[name] for name in output}, columns=output)
+
+    write_results(solved_chunks(), output_path, engine_of(model_path))
+    return summary
@@ -0,0 +1,186 @@
+"""Studies of many beams with dependency-tracked, incremental recomputation.
+
+A study keeps the four inputs of every beam (L, d0, section, R) together with every
+derived quantity, and knows which quantity is computed from which columns. Editing an
+input only marks the edited rows whose value really changed; recomputing then walks the
+stages in dependency order and evaluates each one on the rows where one of its
+dependencies changed. A stage whose new values equal the old ones stops the propagation,
+so revising an opening diameter that leaves q in the same bucket never reaches the
+model, and the rows that do reach it go through the prediction cache.
+"""
+import numpy as np
+
+from mmi.cache import prediction_cache
+from mmi.core import Q_MAX, Q_MIN, SECTIONS, round_q_batch
+from mmi.engines import engine_index, get_engine
+from mmi.results import ResultsTable
+
+
+INPUTS = ("L", "d0", "section_index", "R")
+
+# Derived quantities in evaluation order, with the columns each one is computed from
+STAGES = {
+    "h": ("section_index",),
+    "lambda": ("section_index",),
+    "dg": ("R", "h"),
+    "x": ("L", "dg"),
+    "q": ("dg", "d0"),
+    "q_rounded": ("q",),
+    "alpha": ("x", "R", "q_rounded", "lambda"),
+}
+
+
+def _changed(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Elementwise old != new, with NaN equal to NaN."""
+    if old.dtype.kind != "f":
+        return old != new
+    return ~((old == new) | (np.isnan(old) & np.isnan(new)))
+
+
+class Study:
+    """Beams of a study with their derived quantities, recomputed incrementally.
+
+    Rows whose q is out of range, or whose section is unknown, get a NaN alpha. Alpha comes
+    from model when one is given, otherwise from the named (or default) engine, and
+    engine_index records per row which engine last scored it (-1 for a given model).
+    """
+
+    def __init__(self, model=None, cache=prediction_cache, engine: str = None) -> None:
+        self.model = model
+        self.engine = engine
+        self.cache = cache
+        self._columns = {name: np.empty(0, dtype=np.int32 if name == "section_index" else np.float64)
+                         for name in INPUTS + tuple(STAGES)}
+        self._columns["engine_index"] = np.empty(0, dtype=np.int8)
+        # Rows of each column whose value changed since the last recompute
+        self._changed = {name: np.zeros(0, dtype=bool) for name in self._columns}
+
+    @classmethod
+    def from_results(cls, results: ResultsTable, model=None, cache=prediction_cache, engine: str = None) -> "Study":
+        """Build a study from saved results, reusing their alpha and engine instead of scoring again.
+
+        Rows rescored later take the study's engine, so a study can hold rows of several.
+        """
+        study = cls(model, cache, engine)
+        study.extend({name: results.column(name) for name in INPUTS})
+        study._evaluate_stages([stage for stage in STAGES if stage != "alpha"])
+        study._columns["alpha"][:] = results.column("alpha")
+        study._columns["engine_index"][:] = results.column("engine_index")
+        for changed in study._changed.values():
+            changed[:] = False
+        return study
+
+    @classmethod
+    def open(cls, directory: str, model=None, cache=prediction_cache, engine: str = None) -> "Study":
+        """Open a results directory as a study."""
+        return cls.from_results(ResultsTable.open(directory), model, cache, engine)
+
+    def __len__(self) -> int:
+        return len(self._columns["L"])
+
+    @property
+    def pending(self) -> bool:
+        """Whether edits are waiting to be recomputed."""
+        return any(self._changed[name].any() for name in INPUTS + tuple(STAGES))
+
+    def extend(self, columns: dict) -> None:
+        """Add beams given as a mapping of input name (or "section" with names) to arrays or scalars."""
+        columns = dict(columns)
+        if "section" in columns:
+            columns["section_index"] = SECTIONS.index(list(np.atleast_1d(columns.pop("section"))))
+        arrays = np.broadcast_arrays(*(np.atleast_1d(columns[name]) for name in INPUTS))
+        count = len(arrays[0])
+        for name, column in self._columns.items():
+            if name in INPUTS:
+                added = arrays[INPUTS.index(name)]
+            else:
+                added = np.full(count, -1 if name == "engine_index" else np.nan)
+            self._columns[name] = np.concatenate([column, np.asarray(added, dtype=column.dtype)])
+            self._changed[name] = np.concatenate([self._changed[name], np.full(count, name in INPUTS)])
+
+    def edit(self, name: str, values, rows=None) -> int:
+        """Set an input on the given rows (every row by default) and return how many changed.
+
+        name is one of L, d0, R, section_index, or "section" with section names.
+        Nothing is recomputed until recompute() or column() is called.
+        """
+        if name == "section":
+            name, values = "section_index", SECTIONS.index(list(np.atleast_1d(values)))
+        if name not in INPUTS:
+            raise ValueError(f"Unknown input: {name}")
+        rows = np.arange(len(self)) if rows is None else np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        column = self._columns[name]
+        new = np.broadcast_to(np.asarray(values, dtype=column.dtype), rows.shape)
+        changed = _changed(column[rows], new)
+        column[rows[changed]] = new[changed]
+        self._changed[name][rows[changed]] = True
+        return int(np.count_nonzero(changed))
+
+    def invalidate(self, name: str = "alpha") -> None:
+        """Force a stage to be recomputed on every row, e.g. after switching models."""
+        self._changed[STAGES[name][0]][:] = True
+
+    def recompute(self) -> dict:
+        """Bring every derived quantity up to date and return the rows evaluated per stage."""
+        counts = self._evaluate_stages(STAGES)
+        for changed in self._changed.values():
+            changed[:] = False
+        return counts
+
+    def _evaluate_stages(self, stages) -> dict:
+        counts = {}
+        for stage in stages:
+            rows = np.flatnonzero(np.logical_or.reduce([self._changed[name] for name in STAGES[stage]]))
+            counts[stage] = len(rows)
+            if len(rows) == 0:
+                continue
+            new = self._evaluate(stage, rows)
+            if stage == "alpha":
+                self._columns["engine_index"][rows] = -1 if self.model is not None else engine_index(self.engine)
+            changed = _changed(self._columns[stage][rows], new)
+            self._columns[stage][rows[changed]] = new[changed]
+            self._changed[stage][rows[changed]] = True
+        return counts
+
+    def _evaluate(self, stage: str, rows: np.ndarray) -> np.ndarray:
+        columns = {name: self._columns[name][rows] for name in STAGES[stage]}
+        if stage in ("h", "lambda"):
+            return SECTIONS.take(columns["section_index"], stage)
+        if stage == "dg":
+            return columns["R"] * columns["h"]
+        if stage == "x":
+            return columns["L"] / columns["dg"]
+        if stage == "q":
+            return columns["dg"] / columns["d0"]
+        if stage == "q_rounded":
+            q = columns["q"]
+            return np.where((q >= Q_MIN) & (q <= Q_MAX), round_q_batch(q), np.nan)
+        # alpha
+        alpha = np.full(len(rows), np.nan)
+        valid = ~(np.isnan(columns["q_rounded"]) | np.isnan(columns["lambda"]) | np.isnan(columns["x"]))
+        if valid.any():
+            model = self.model if self.model is not None else get_engine(self.engine)
+            alpha[valid] = self.cache.predict_batch(model, columns["x"][valid], columns["R"][valid],
+                                                    columns["q_rounded"][valid], columns["lambda"][valid])
+        return alpha
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of an input or derived column, recomputing pending edits first."""
+        if self.pending:
+            self.recompute()
+        view = self._columns[name][:]
+        view.flags.writeable = False
+        return view
+
+    def to_results(self) -> ResultsTable:
+        """Results table of the scored rows, with q rounded as the model saw it."""
+        scored = ~np.isnan(self.column("alpha"))
+        results = ResultsTable(int(np.count_nonzero(scored)))
+        columns = {name: self.column(name)[scored] for name in INPUTS + ("x", "lambda", "alpha", "engine_index")}
+        columns["q"] = self.column("q_rounded")[scored]
+        results.extend(columns)
+        return results
+
+    def save(self, directory: str, append: bool = False) -> None:
+        """Save the scored rows to a results directory."""
+        self.to_results().save(directory, append)
@@ -0,0 +1,139 @@
+"""Precomputed alpha surface for instant, vectorized queries.
+
+q, R and lambda only take a handful of discrete values (the round_q buckets, the R values
+of the calculator and the lambda values of the section catalogue), so only x = L/dg is
+continuous. The surface evaluates the model once on an x grid for every (q, R, lambda)
+combination and answers queries by indexing into that table.
+
+Two kinds of grid are supported:
+
+* ``previous``: the grid holds the x split points of a tree ensemble. The ensemble is
+  constant between consecutive split points, so looking up the cell that contains x
+  reproduces the model exactly.
+* ``linear``: a uniform x grid with linear interpolation, for models whose split points
+  are not known.
+
+A surface is saved as a directory holding ``values.npy``, which is memory-mapped on load,
+and ``axes.npz``.
+"""
+import os
+
+import numpy as np
+
+from mmi.core import INTERNAL_DIRECTORY, Q_BUCKETS, R_VALUES, SECTIONS, predict_batch
+
+
+SURFACE_DIRECTORY = os.path.join(INTERNAL_DIRECTORY, "alpha_surface")
+# Tolerance when matching q, R and lambda inputs to the surface axes
+AXIS_TOLERANCE = 1e-5
+
+
+def _axis_index(axis: np.ndarray, values: np.ndarray, tolerance: float = AXIS_TOLERANCE):
+    """Return the index of the axis value nearest to each value and a mask of the matches."""
+    if len(axis) == 1:
+        position = np.zeros(values.shape, dtype=np.intp)
+    else:
+        upper = np.clip(np.searchsorted(axis, values), 1, len(axis) - 1)
+        lower = upper - 1
+        position = np.where(np.abs(axis[lower] - values) <= np.abs(axis[upper] - values), lower, upper)
+    matched = np.abs(axis[position] - values) <= tolerance
+    return position, matched
+
+
+class AlphaSurface:
+    """Alpha tabulated over (q, R, lambda, x), queried like a model."""
+
+    def __init__(self, q, R, lambda_, x, values, interpolation: str, max_error: float = float("nan")) -> None:
+        if interpolation not in ("previous", "linear"):
+            raise ValueError(f"Unknown interpolation: {interpolation}")
+        self.q = np.asarray(q, dtype=np.float64)
+        self.R = np.asarray(R, dtype=np.float64)
+        self.lambda_ = np.asarray(lambda_, dtype=np.float64)
+        self.x = np.asarray(x, dtype=np.float32 if interpolation == "previous" else np.float64)
+        self.values = values
+        self.interpolation = interpolation
+        self.max_error = float(max_error)
+
+    @classmethod
+    def build(cls, model, q=Q_BUCKETS, R=R_VALUES, lambda_=None, x=None, n_check: int = 20000,
+              seed: int = 0) -> "AlphaSurface":
+        """Evaluate model over every (q, R, lambda) combination and the x grid.
+
+        Without an explicit x grid the model's own x split points are used when it exposes
+        them (FlatForest), which makes the surface exact. max_error is measured against
+        the live model on n_check random points spread over the grid.
+        """
+        q = np.unique(np.asarray(q, dtype=np.float64))
+        R = np.unique(np.asarray(R, dtype=np.float64))
+        lambda_ = np.unique(SECTIONS.column("lambda") if lambda_ is None else np.asarray(lambda_, dtype=np.float64))
+        if x is None and hasattr(model, "split_points"):
+            edges = model.split_points(0)
+            # Cell i covers [edges[i - 1], edges[i]); cell 0 is everything below the first split
+            x_samples = np.concatenate(([edges[0] - 1.0], edges)) if len(edges) else np.zeros(1)
+            surface = cls(q, R, lambda_, edges, None, "previous")
+        else:
+            if x is None:
+                raise ValueError("An x grid is required for models without split points")
+            x_samples = np.unique(np.asarray(x, dtype=np.float64))
+            surface = cls(q, R, lambda_, x_samples, None, "linear")
+
+        grid = np.meshgrid(q, R, lambda_, x_samples, indexing="ij")
+        surface.values = predict_batch(model, grid[3], grid[1], grid[0], grid[2])
+
+        rng = np.random.default_rng(seed)
+        x_low, x_high = float(x_samples[0]), float(x_samples[-1])
+        if surface.interpolation == "previous":
+            check_x = rng.uniform(x_low - 1.0, x_high + 1.0, n_check)
+        else:
+            check_x = rng.uniform(x_low, x_high, n_check)
+        check_q = rng.choice(q, n_check)
+        check_R = rng.choice(R, n_check)
+        check_lambda = rng.choice(lambda_, n_check)
+        expected = predict_batch(model, check_x, check_R, check_q, check_lambda)
+        surface.max_error = float(np.max(np.abs(surface.predict_batch(check_x, check_R, check_q, check_lambda)
+                                                - expected)))
+        return surface
+
+    def save(self, directory: str) -> None:
+        """Write the surface to directory as values.npy and axes.npz."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "values.npy"), np.asarray(self.values, dtype=np.float32))
+        np.savez(os.path.join(directory, "axes.npz"), q=self.q, R=self.R, lambda_=self.lambda_, x=self.x,
+                 interpolation=self.interpolation, max_error=self.max_error)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "AlphaSurface":
+        """Open a saved surface; the value table is memory-mapped unless mmap is False."""
+        values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r" if mmap else None)
+        with np.load(os.path.join(directory, "axes.npz")) as axes:
+            return cls(axes["q"], axes["R"], axes["lambda_"], axes["x"], values, str(axes["interpolation"]),
+                       float(axes["max_error"]))
+
+    def covers(self, x, R, q, lambda_) -> np.ndarray:
+        """Mask of the inputs whose q, R and lambda lie on the surface axes; x is never limited."""
+        x, R, q, lambda_ = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (x, R, q, lambda_)))
+        return _axis_index(self.q, q)[1] & _axis_index(self.R, R)[1] & _axis_index(self.lambda_, lambda_)[1]
+
+    def predict_batch(self, x, R, q, lambda_) -> np.ndarray:
+        """Look up alpha for every (x, R, q, lambda); scalars broadcast, off-grid q/R/lambda give NaN."""
+        x, R, q, lambda_ = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (x, R, q, lambda_)))
+        iq, q_matched = _axis_index(self.q, q)
+        iR, R_matched = _axis_index(self.R, R)
+        il, lambda_matched = _axis_index(self.lambda_, lambda_)
+        if self.interpolation == "previous":
+            # Compare in float32, as the ensemble does
+            ix = np.searchsorted(self.x, x.astype(np.float32), side="right")
+            result = self.values[iq, iR, il, ix].astype(np.float64)
+        else:
+            xs = np.clip(x, self.x[0], self.x[-1])
+            ix = np.clip(np.searchsorted(self.x, xs, side="right") - 1, 0, len(self.x) - 2)
+            fraction = (xs - self.x[ix]) / (self.x[ix + 1] - self.x[ix])
+            lower = self.values[iq, iR, il, ix].astype(np.float64)
+            upper = self.values[iq, iR, il, ix + 1].astype(np.float64)
+            result = lower + fraction * (upper - lower)
+        return np.where(q_matched & R_matched & lambda_matched, result, np.nan)
+
+    def predict(self, data) -> np.ndarray:
+        """Model-style prediction on a (rows, 4) matrix of x, R, q, lambda."""
+        data = np.asarray(data)
+        return self.predict_batch(data[:, 0], data[:, 1], data[:, 2], data[:, 3]).astype(np.float32)
@@ -0,0 +1,64 @@
+"""Closed-form logistic surrogate of the alpha model.
+
+more_Equations.py fits alpha = L / (1 + exp(-k (x - x0))) to the training data of every
+(q, R, lambda) combination and writes the (L, k, x0) table as a CSV file. Evaluating the
+surrogate is a table lookup and one exponential per row, with no trees to walk.
+
+The training data holds lambda at full precision while the section catalogue rounds it
+to four decimals, so lambda is matched with a looser tolerance than q and R.
+"""
+import os
+
+import numpy as np
+
+from mmi.core import INTERNAL_DIRECTORY
+from mmi.surface import _axis_index
+
+
+SURROGATE_FILE_PATH = os.path.join(INTERNAL_DIRECTORY, "logistic_surrogate.csv")
+LAMBDA_TOLERANCE = 1e-4
+
+
+class LogisticSurrogate:
+    """Logistic curves of alpha over x, one per (q, R, lambda), queried like a model."""
+
+    def __init__(self, q, R, lambda_, params, rmse=None) -> None:
+        q, R, lambda_ = (np.asarray(values, dtype=np.float64) for values in (q, R, lambda_))
+        params = np.asarray(params, dtype=np.float64)
+        self.q, self.R, self.lambda_ = np.unique(q), np.unique(R), np.unique(lambda_)
+        # (L, k, x0) on the (q, R, lambda) grid; combinations without a fit are NaN
+        self.params = np.full((len(self.q), len(self.R), len(self.lambda_), 3), np.nan)
+        cells = np.searchsorted(self.q, q), np.searchsorted(self.R, R), np.searchsorted(self.lambda_, lambda_)
+        self.params[cells] = params
+        self.rmse = None if rmse is None else np.asarray(rmse, dtype=np.float64)
+
+    @classmethod
+    def load(cls, file_path: str = SURROGATE_FILE_PATH) -> "LogisticSurrogate":
+        """Read a surrogate table written by more_Equations.py."""
+        table = np.genfromtxt(file_path, delimiter=",", names=True, dtype=None, encoding="utf-8")
+        return cls(table["q"], table["R"], table["lambda"], np.column_stack([table["L"], table["k"], table["x0"]]),
+                   table["rmse"])
+
+    def covers(self, x, R, q, lambda_) -> np.ndarray:
+        """Mask of the inputs whose (q, R, lambda) combination has a fitted curve."""
+        x, R, q, lambda_ = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (x, R, q, lambda_)))
+        iq, q_matched = _axis_index(self.q, q)
+        iR, R_matched = _axis_index(self.R, R)
+        il, lambda_matched = _axis_index(self.lambda_, lambda_, LAMBDA_TOLERANCE)
+        return q_matched & R_matched & lambda_matched & ~np.isnan(self.params[iq, iR, il, 0])
+
+    def predict_batch(self, x, R, q, lambda_) -> np.ndarray:
+        """Evaluate the curve of every row's (q, R, lambda) at x; scalars broadcast, unfitted combinations give NaN."""
+        x, R, q, lambda_ = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (x, R, q, lambda_)))
+        iq, q_matched = _axis_index(self.q, q)
+        iR, R_matched = _axis_index(self.R, R)
+        il, lambda_matched = _axis_index(self.lambda_, lambda_, LAMBDA_TOLERANCE)
+        params = self.params[iq, iR, il]
+        with np.errstate(over="ignore"):
+            result = params[..., 0] / (1.0 + np.exp(-params[..., 1] * (x - params[..., 2])))
+        return np.where(q_matched & R_matched & lambda_matched, result, np.nan)
+
+    def predict(self, data) -> np.ndarray:
+        """Model-style prediction on a (rows, 4) matrix of x, R, q, lambda."""
+        data = np.asarray(data)
+        return self.predict_batch(data[:, 0], data[:, 1], data[:, 2], data[:, 3]).astype(np.float32)
@@ -0,0 +1,138 @@
+"""Sharded, multi-process parametric sweeps over length, opening, section and R.
+
+The sweep grid is the Cartesian product of its four axes and is never materialized: each
+shard is a range of flat grid indices that a worker unravels, scores with one batched
+prediction and writes to its own file. Workers load the model once, in the pool
+initializer, and only shard ranges and file names cross process boundaries. The shard
+files are merged into the final output once every shard is done.
+
+Grid points are validated like the rows of a batch (see mmi.validate): points with
+errors, such as a non-positive input, q out of range or an R off the engine's grid, are
+not scored, and every point carries its reason bits and error and warning messages.
+"""
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mmi.core import MODEL_FILE_PATH, R_VALUES, SECTIONS, model_registry, predict_batch
+from mmi.engines import engine_of
+from mmi.validate import ERRORS, REASONS, WARNINGS, reason_messages, validate
+
+
+SHARD_COLUMNS = ["L", "d0", "section_index", "R", "x", "q", "q_rounded", "lambda", "alpha", "reason"]
+
+# Model of the current worker process, loaded once by _initialize_worker
+_worker_model = None
+
+
+class SweepGrid:
+    """Cartesian product of beam lengths, opening diameters, sections and R values."""
+
+    def __init__(self, lengths, opening_diameters, sections=None, R=None) -> None:
+        self.lengths = np.asarray(lengths, dtype=np.float64).ravel()
+        self.opening_diameters = np.asarray(opening_diameters, dtype=np.float64).ravel()
+        self.sections = list(SECTIONS) if sections is None else list(sections)
+        unknown = [name for name in self.sections if name not in SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+        self.section_index = SECTIONS.index(self.sections)
+        self.R = np.asarray(R_VALUES if R is None else R, dtype=np.float64).ravel()
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.lengths), len(self.opening_diameters), len(self.sections), len(self.R)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def columns(self, start: int, stop: int) -> dict:
+        """Return the model inputs and derived features of grid points start to stop."""
+        i_length, i_opening, i_section, i_R = np.unravel_index(np.arange(start, stop), self.shape)
+        section_index = self.section_index[i_section]
+        length = self.lengths[i_length]
+        opening_diameter = self.opening_diameters[i_opening]
+        R = self.R[i_R]
+        dg = R * SECTIONS.take(section_index, "h")
+        return {"L": length, "d0": opening_diameter, "section_index": section_index, "R": R, "x": length / dg,
+                "q": dg / opening_diameter, "lambda": SECTIONS.take(section_index, "lambda")}
+
+
+def parse_values(text: str) -> np.ndarray:
+    """Parse "start:stop:step" (stop included) or a comma-separated list of numbers."""
+    if ":" in text:
+        start, stop, step = (float(part) for part in text.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(part) for part in text.split(",")])
+
+
+def _initialize_worker(model_path: str) -> None:
+    global _worker_model
+    _worker_model = model_registry.get(model_path)
+
+
+def score_shard(grid: SweepGrid, start: int, stop: int, model) -> dict:
+    """Score grid points start to stop; points with errors (see mmi.validate) get a NaN alpha."""
+    columns = grid.columns(start, stop)
+    section = np.asarray(SECTIONS.names, dtype=object)[columns["section_index"]]
+    validation = validate(columns["L"], columns["d0"], section, columns["R"], model=model)
+    valid = validation["valid"]
+    alpha = np.full(stop - start, np.nan)
+    if valid.any():
+        alpha[valid] = predict_batch(model, validation["x"][valid], validation["R"][valid],
+                                     validation["q_rounded"][valid], validation["lambda"][valid])
+    return {**{name: validation[name] for name in SHARD_COLUMNS if name in validation},
+            "section_index": columns["section_index"], "alpha": alpha}
+
+
+def _run_shard(grid: SweepGrid, start: int, stop: int, shard_path: str) -> tuple:
+    columns = score_shard(grid, start, stop, _worker_model)
+    np.savez(shard_path, **columns)
+    reason = columns["reason"]
+    return (shard_path, int(np.count_nonzero(~np.isnan(columns["alpha"]))),
+            {code: int(np.count_nonzero(reason & code)) for code in (*REASONS, ERRORS, WARNINGS)})
+
+
+def _shard_frames(shard_paths):
+    import pandas as pd
+
+    for shard_path in shard_paths:
+        with np.load(shard_path) as shard:
+            columns = {name: shard[name] for name in SHARD_COLUMNS}
+        columns["section"] = np.asarray(SECTIONS.names, dtype=object)[columns["section_index"]]
+        frame = pd.DataFrame(columns, columns=SHARD_COLUMNS)
+        frame.insert(3, "section", columns["section"])
+        frame["error"] = reason_messages(columns, ERRORS)
+        frame["warning"] = reason_messages(columns, WARNINGS)
+        yield frame.drop(columns="section_index")
+
+
+def run_sweep(grid: SweepGrid, output_path: str, model_path: str = MODEL_FILE_PATH, workers: int = None,
+              shard_size: int = 1000000, keep_shards: bool = False) -> dict:
+    """Score every grid point across a process pool and merge the shards into output_path.
+
+    Shards are written next to the output, in a "<output>.shards" directory that is removed
+    after the merge unless keep_shards is set. The summary counts the points scored, those
+    with errors and warnings, and those carrying each mmi.validate reason.
+    """
+    from mmi.batch import write_results
+
+    shard_directory = output_path + ".shards"
+    os.makedirs(shard_directory, exist_ok=True)
+    bounds = [(start, min(start + shard_size, grid.size)) for start in range(0, grid.size, shard_size)]
+    shard_paths = [os.path.join(shard_directory, f"shard-{i:05d}.npz") for i in range(len(bounds))]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(model_path,)) as pool:
+        futures = [pool.submit(_run_shard, grid, start, stop, shard_path)
+                   for (start, stop), shard_path in zip(bounds, shard_paths)]
+        shards = [future.result() for future in futures]
+    scored = sum(shard[1] for shard in shards)
+    counts = {code: sum(shard[2][code] for shard in shards) for code in (*REASONS, ERRORS, WARNINGS)}
+
+    write_results(_shard_frames(shard_paths), output_path, engine_of(model_path))
+    if not keep_shards:
+        shutil.rmtree(shard_directory)
+    return {"rows": grid.size, "scored": scored, "shards": len(bounds), "errors": counts[ERRORS],
+            "warnings": counts[WARNINGS], "reasons": {name: counts[code] for code, name in REASONS.items()}}
@@ -0,0 +1,68 @@
+"""The main window layout, compiled ahead of time from its Qt Designer file.
+
+Parsing inertia_calculator.ui with uic.loadUi at every launch imports the uic compiler
+and walks the XML before the window can appear. compile_ui() turns the .ui file into the
+Python module mmi/inertia_calculator_ui.py once (``python -m mmi compile-ui``), and
+setup_ui() builds the window from that module. The module records the SHA-256 of the
+.ui file it came from, so an edited .ui file is picked up through uic.loadUi until it
+is compiled again.
+"""
+import hashlib
+import importlib
+import io
+import os
+import re
+
+from mmi.core import INTERNAL_DIRECTORY
+
+
+UI_FILE_PATH = os.path.join(INTERNAL_DIRECTORY, "inertia_calculator.ui")
+COMPILED_UI_MODULE = "mmi.inertia_calculator_ui"
+COMPILED_UI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inertia_calculator_ui.py")
+
+
+def _source_hash(ui_path: str) -> str:
+    with open(ui_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def compile_ui(ui_path: str = UI_FILE_PATH, output_path: str = COMPILED_UI_PATH) -> None:
+    """Write the Python module building the window described by ui_path."""
+    from PyQt5 import uic
+
+    with open(ui_path, encoding="utf-8") as ui_file:
+        code = io.StringIO()
+        uic.compileUi(ui_file, code)
+    # uic.loadUi finds images next to the .ui file; the compiled code must too
+    source = re.sub(r'QtGui\.QPixmap\("([^"]+)"\)', r'QtGui.QPixmap(os.path.join(INTERNAL_DIRECTORY, "\1"))',
+                    code.getvalue())
+    source = source.replace(ui_file.name, os.path.basename(ui_path))
+    source = source.replace("from PyQt5 import QtCore, QtGui, QtWidgets\n",
+                            "import os\n\nfrom PyQt5 import QtCore, QtGui, QtWidgets\n\n"
+                            "from mmi.core import INTERNAL_DIRECTORY\n\n\n"
+                            f'UI_SOURCE_SHA256 = "{_source_hash(ui_path)}"\n', 1)
+    with open(output_path + ".tmp", "w", encoding="utf-8") as file:
+        file.write(source)
+    os.replace(output_path + ".tmp", output_path)
+
+
+def setup_ui(window, ui_path: str = UI_FILE_PATH) -> bool:
+    """Build the widgets of ui_path into window; True when the compiled module was used.
+
+    Like uic.loadUi, every named widget and action becomes an attribute of window.
+    """
+    try:
+        module = importlib.import_module(COMPILED_UI_MODULE)
+        compiled = module.UI_SOURCE_SHA256 == _source_hash(ui_path)
+    except (ImportError, AttributeError):
+        compiled = False
+    if not compiled:
+        from PyQt5 import uic
+
+        uic.loadUi(ui_path, window)
+        return False
+    ui = module.Ui_MainWindow()
+    ui.setupUi(window)
+    for name, value in vars(ui).items():
+        setattr(window, name, value)
+    return True
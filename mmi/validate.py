@@ -0,0 +1,144 @@
+"""Vectorized validation of beam inputs, with a reason code for every row.
+
+validate() checks whole columns of L, d0, section and R in one pass and returns the
+derived features together with a bit mask of everything wrong with each row, so bulk
+callers score the valid rows and report the rest instead of stopping at the first bad
+one. q is rounded to its bucket with core.round_q_batch, as in the calculator.
+
+Reasons:
+    NON_NUMERIC      an input is missing or not a number
+    NON_POSITIVE     L, d0 or R is zero or negative
+    UNKNOWN_SECTION  the section is not in the catalogue
+    Q_OUT_OF_RANGE   q = dg / d0 is outside Q_MIN..Q_MAX
+    X_EXTRAPOLATED   x = L / dg is outside the x range of the training data
+    OUTSIDE_ENGINE   the model given to validate() has no answer for the row's R, q and
+                     lambda, e.g. an R between the grid values of a surface
+
+All but X_EXTRAPOLATED make a row invalid. X_EXTRAPOLATED is a warning: the model still answers
+there, but it was never trained on such beams, and callers can choose to reject it.
+"""
+import numpy as np
+
+from mmi.core import Q_MAX, Q_MIN, SECTIONS, QOutOfRangeError, model_covers, round_q_batch
+from mmi.engines import X_MAX, X_MIN
+
+
+NON_NUMERIC = 1
+NON_POSITIVE = 2
+UNKNOWN_SECTION = 4
+Q_OUT_OF_RANGE = 8
+X_EXTRAPOLATED = 16
+OUTSIDE_ENGINE = 32
+
+REASONS = {
+    NON_NUMERIC: "non_numeric",
+    NON_POSITIVE: "non_positive",
+    UNKNOWN_SECTION: "unknown_section",
+    Q_OUT_OF_RANGE: "q_out_of_range",
+    X_EXTRAPOLATED: "x_extrapolated",
+    OUTSIDE_ENGINE: "outside_engine",
+}
+ERRORS = NON_NUMERIC | NON_POSITIVE | UNKNOWN_SECTION | Q_OUT_OF_RANGE | OUTSIDE_ENGINE
+WARNINGS = X_EXTRAPOLATED
+
+
+def as_float(values) -> np.ndarray:
+    """Convert values to float64, with NaN for every value that is not a number."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        values = list(values)
+        converted = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                converted[i] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return converted
+
+
+def validate(length, opening_diameter, section, R, allow_extrapolation: bool = True, model=None) -> dict:
+    """Validate beams given as columns (or scalars) and derive their model features.
+
+    The result holds the inputs as float arrays, section_index, the features x, q and
+    lambda, the reason bit mask of every row and the valid mask: rows without errors, and
+    without extrapolation unless allow_extrapolation. q_rounded is the bucketed q of the
+    valid rows and NaN elsewhere. When model is given, rows outside its input domain (see
+    core.model_covers) are flagged OUTSIDE_ENGINE.
+    """
+    section = np.atleast_1d(np.asarray(section, dtype=object))
+    length, opening_diameter, R = np.broadcast_arrays(*(np.atleast_1d(as_float(values))
+                                                        for values in (length, opening_diameter, R)))
+    section = np.broadcast_to(section, length.shape)
+    section_index = SECTIONS.index([str(name).strip() for name in section.tolist()])
+    lambda_ = SECTIONS.take(section_index, "lambda")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dg = R * SECTIONS.take(section_index, "h")
+        x = length / dg
+        q = dg / opening_diameter
+
+    non_numeric = ~(np.isfinite(length) & np.isfinite(opening_diameter) & np.isfinite(R))
+    with np.errstate(invalid="ignore"):
+        non_positive = ~non_numeric & ((length <= 0) | (opening_diameter <= 0) | (R <= 0))
+    unknown_section = section_index < 0
+    computed = ~(non_numeric | non_positive | unknown_section)
+    q_in_range = (q >= Q_MIN) & (q <= Q_MAX)
+    outside_engine = np.zeros(length.shape, dtype=bool)
+    if model is not None:
+        rows = np.flatnonzero(computed & q_in_range)
+        outside_engine[rows] = ~model_covers(model, x[rows], R[rows], round_q_batch(q[rows]), lambda_[rows])
+    reason = (non_numeric * NON_NUMERIC | non_positive * NON_POSITIVE | unknown_section * UNKNOWN_SECTION
+              | (computed & ~q_in_range) * Q_OUT_OF_RANGE
+              | (computed & ~((x >= X_MIN) & (x <= X_MAX))) * X_EXTRAPOLATED
+              | outside_engine * OUTSIDE_ENGINE).astype(np.uint8)
+
+    rejected = ERRORS if allow_extrapolation else ERRORS | WARNINGS
+    valid = (reason & rejected) == 0
+    q_rounded = np.where(valid, round_q_batch(q), np.nan)
+    return {"L": length, "d0": opening_diameter, "section": section, "R": R, "section_index": section_index,
+            "x": x, "q": q, "q_rounded": q_rounded, "lambda": lambda_, "reason": reason, "valid": valid}
+
+
+def _format_unique(describe, values: np.ndarray) -> np.ndarray:
+    """describe(value) for every value as an object array, calling describe once per distinct value."""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.array([describe(value) for value in distinct.tolist()], dtype=object)[inverse.ravel()]
+
+
+def reason_messages(validation: dict, codes: int = ERRORS) -> np.ndarray:
+    """Readable description of the given reasons of every row, "" where none applies.
+
+    Only the flagged rows are looked at, and each distinct section, q or x (to the three
+    decimals shown) is formatted once, so clean columns cost a few mask operations.
+    """
+    reason = validation["reason"]
+    messages = np.full(len(reason), "", dtype=object)
+    present = int(np.bitwise_or.reduce(reason, initial=0)) & codes
+    for code in REASONS:
+        if not code & present:
+            continue
+        rows = np.flatnonzero(reason & code)
+        if code == NON_NUMERIC:
+            text = "Non-numeric input"
+        elif code == NON_POSITIVE:
+            text = "Non-positive input"
+        elif code == UNKNOWN_SECTION:
+            text = _format_unique(lambda name: f"Unknown section: {name}" if name else "Missing section",
+                                  validation["section"][rows].astype(str))
+        elif code == OUTSIDE_ENGINE:
+            text = "Outside the input domain of the engine (R, q or lambda not on its grid)"
+        elif code == Q_OUT_OF_RANGE:
+            text = _format_unique(lambda value: str(QOutOfRangeError(value)), np.round(validation["q"][rows], 3))
+        else:
+            text = _format_unique(
+                lambda value: f"x = {value:.3f} is outside the training range {X_MIN} ≤ x ≤ {X_MAX}",
+                np.round(validation["x"][rows], 3))
+        # Object arrays concatenate elementwise, joining the reasons of rows with several
+        separator = np.where(messages[rows] == "", "", "; ").astype(object)
+        messages[rows] = messages[rows] + separator + text
+    return messages
+
+
+def reason_counts(reason: np.ndarray) -> dict:
+    """Number of rows carrying each reason."""
+    return {name: int(np.count_nonzero(reason & code)) for code, name in REASONS.items()}
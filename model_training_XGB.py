@@ -1,22 +1,92 @@
 import pandas as pd
 from sklearn.model_selection import train_test_split
+import xgboost
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error
 import joblib
+import argparse
+import json
+import os
 import matplotlib.pyplot as plt
 import numpy as np
 
+FEATURES = ['x', 'R', 'q', 'lambda']
+TARGET = 'y'
+
 # Step 1: Read the Excel file
 def read_excel(file_path):
     df = pd.read_excel(file_path)
     return df
 
+# Step 1b: Read training shards lazily, a chunk at a time
+def read_shard_chunks(file_paths, chunk_rows=1000000):
+    # CSV and Parquet shards are streamed; Excel files cannot be, and are read whole
+    for file_path in file_paths:
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == '.csv':
+            for chunk in pd.read_csv(file_path, usecols=FEATURES + [TARGET], chunksize=chunk_rows):
+                yield chunk
+        elif extension == '.parquet':
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows, columns=FEATURES + [TARGET]):
+                yield batch.to_pandas()
+        elif extension in ('.xlsx', '.xls'):
+            df = pd.read_excel(file_path)
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start:start + chunk_rows]
+        else:
+            raise ValueError(f"Unsupported training file: {file_path}")
+
 # Step 2: Preprocess the data
 def preprocess_data(df):
-    X = df[['x', 'R', 'q', 'lambda']]
-    y = df['y']
+    X = df[FEATURES]
+    y = df[TARGET]
     return X, y
 
+# Step 2b: Feed the shards to XGBoost through a DataIter
+class ShardIter(xgboost.DataIter):
+    """Streams the training shards chunk by chunk, keeping either the training rows or the
+    held-out test rows. Each chunk is split with its own seeded generator, so every pass
+    over the data (XGBoost makes several) sees the same split.
+
+    With n_folds, the training rows are further split into folds for cross-validation:
+    subset 'train' keeps the training rows outside fold, 'valid' the ones inside it. The
+    test rows are the same with or without folds."""
+
+    def __init__(self, file_paths, subset='train', test_size=0.1, random_state=50, chunk_rows=1000000,
+                 cache_prefix=None, n_folds=0, fold=0):
+        self.file_paths = list(file_paths)
+        self.subset = subset
+        self.test_size = test_size
+        self.random_state = random_state
+        self.chunk_rows = chunk_rows
+        self.n_folds = n_folds
+        self.fold = fold
+        self._chunks = None
+        self._index = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = read_shard_chunks(self.file_paths, self.chunk_rows)
+        for chunk in self._chunks:
+            rng = np.random.default_rng([self.random_state, self._index])
+            self._index += 1
+            test = rng.random(len(chunk)) < self.test_size
+            keep = test if self.subset == 'test' else ~test
+            if self.n_folds and self.subset != 'test':
+                in_fold = rng.integers(self.n_folds, size=len(chunk)) == self.fold
+                keep &= in_fold if self.subset == 'valid' else ~in_fold
+            if keep.any():
+                X, y = preprocess_data(chunk[keep])
+                input_data(data=X.to_numpy(np.float32), label=y.to_numpy(np.float32))
+                return True
+        return False
+
+    def reset(self):
+        self._chunks = None
+        self._index = 0
+
 # Step 3: Train the XGBoost Regressor with Hyperparameter Tuning
 def train_model(X, y):
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.1, random_state=50)
@@ -27,21 +97,188 @@ def train_model(X, y):
     print(f"Model trained. Mean Squared Error on test set: {mse}")
     return model
 
-# Step 4: Save the trained model
+# Step 3b: Train on streamed shards, with hist trees on quantized (optionally external-memory) data
+def train_model_streaming(file_paths, n_jobs=-1, chunk_rows=1000000, external_memory=False, cache_dir='.',
+                          max_bin=256, n_estimators=2000):
+    # Same hyperparameters as train_model; only the quantized histograms are kept in memory,
+    # or paged to cache_dir with external_memory, never the raw rows
+    cache_prefix = os.path.join(cache_dir, 'xgb-cache') if external_memory else None
+    train_iter = ShardIter(file_paths, 'train', chunk_rows=chunk_rows, cache_prefix=cache_prefix)
+    test_iter = ShardIter(file_paths, 'test', chunk_rows=chunk_rows)
+    if external_memory:
+        dtrain = xgboost.ExtMemQuantileDMatrix(train_iter, max_bin=max_bin, nthread=n_jobs)
+    else:
+        dtrain = xgboost.QuantileDMatrix(train_iter, max_bin=max_bin, nthread=n_jobs)
+    dtest = xgboost.QuantileDMatrix(test_iter, ref=dtrain, nthread=n_jobs)
+    params = {'objective': 'reg:squarederror', 'tree_method': 'hist', 'learning_rate': 0.01, 'max_depth': 4,
+              'subsample': 0.7, 'colsample_bytree': 0.7, 'max_bin': max_bin, 'nthread': n_jobs,
+              'eval_metric': 'rmse'}
+    evals_result = {}
+    booster = xgboost.train(params, dtrain, num_boost_round=n_estimators, evals=[(dtest, 'test')],
+                            evals_result=evals_result, verbose_eval=False)
+    mse = evals_result['test']['rmse'][-1] ** 2
+    print(f"Model trained on {dtrain.num_row()} rows. Mean Squared Error on test set: {mse}")
+    return booster
+
+# Step 3c: Cross-validated hyperparameter search across a process pool
+TUNING_SPACE = {
+    'learning_rate': [0.01, 0.03, 0.05, 0.1, 0.2],
+    'max_depth': [3, 4, 5, 6],
+    'subsample': [0.7, 0.85, 1.0],
+    'colsample_bytree': [0.7, 1.0],
+    'min_child_weight': [1, 3],
+}
+
+def sample_candidates(n_trials, random_state=0):
+    # The current hand-picked parameters are always the first candidate, as the baseline
+    rng = np.random.default_rng(random_state)
+    candidates = [{'learning_rate': 0.01, 'max_depth': 4, 'subsample': 0.7, 'colsample_bytree': 0.7,
+                   'min_child_weight': 1}]
+    while len(candidates) < n_trials:
+        candidate = {name: values[rng.integers(len(values))] for name, values in TUNING_SPACE.items()}
+        if candidate not in candidates:
+            candidates.append(candidate)
+    return candidates
+
+def build_fold_matrices(file_paths, n_folds, chunk_rows=1000000, n_jobs=-1, max_bin=256):
+    # Quantized once per fold in the parent; every candidate shares them instead of re-reading the shards
+    folds = []
+    for fold in range(n_folds):
+        dtrain = xgboost.QuantileDMatrix(ShardIter(file_paths, 'train', chunk_rows=chunk_rows, n_folds=n_folds,
+                                                   fold=fold), max_bin=max_bin, nthread=n_jobs)
+        dvalid = xgboost.QuantileDMatrix(ShardIter(file_paths, 'valid', chunk_rows=chunk_rows, n_folds=n_folds,
+                                                   fold=fold), ref=dtrain, nthread=n_jobs)
+        folds.append((dtrain, dvalid))
+    return folds
+
+def evaluate_candidate(candidate, folds, n_jobs=1, max_rounds=2000, early_stopping_rounds=50):
+    # k-fold MSE of one candidate, each fold stopped once validation stops improving
+    import time
+    started = time.perf_counter()
+    params = dict(candidate, objective='reg:squarederror', tree_method='hist', eval_metric='rmse',
+                  nthread=n_jobs)
+    mses, rounds = [], []
+    for dtrain, dvalid in folds:
+        booster = xgboost.train(params, dtrain, num_boost_round=max_rounds, evals=[(dvalid, 'valid')],
+                                early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+        mses.append(booster.best_score ** 2)
+        rounds.append(booster.best_iteration + 1)
+    return dict(candidate, cv_mse=float(np.mean(mses)), cv_mse_std=float(np.std(mses)),
+                n_estimators=int(round(np.mean(rounds))), seconds=time.perf_counter() - started)
+
+def tune_model(file_paths, n_trials=24, n_folds=5, workers=None, n_jobs=None, chunk_rows=1000000,
+               max_rounds=2000, early_stopping_rounds=50, random_state=0,
+               leaderboard_path='tuning_leaderboard.csv'):
+    from concurrent.futures import ThreadPoolExecutor
+
+    candidates = sample_candidates(n_trials, random_state)
+    folds = build_fold_matrices(file_paths, n_folds, chunk_rows)
+    workers = workers or min(os.cpu_count() or 1, len(candidates))
+    # Split the cores between the workers rather than oversubscribing them
+    n_jobs = n_jobs or max(1, (os.cpu_count() or 1) // workers)
+    # Threads, not processes: xgboost releases the GIL while training, and the matrices cannot be pickled
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(evaluate_candidate, candidate, folds, n_jobs, max_rounds, early_stopping_rounds)
+                   for candidate in candidates]
+        results = [future.result() for future in futures]
+
+    leaderboard = pd.DataFrame(results)
+    leaderboard['baseline'] = [True] + [False] * (len(results) - 1)
+    # Ties on MSE go to the model with fewer trees, which is cheaper to score
+    leaderboard = leaderboard.sort_values(['cv_mse', 'n_estimators']).reset_index(drop=True)
+    leaderboard.insert(0, 'rank', np.arange(1, len(leaderboard) + 1))
+    leaderboard.to_csv(leaderboard_path, index=False)
+    print(f"Leaderboard of {len(leaderboard)} candidates saved to {leaderboard_path}")
+    print(leaderboard.head(10).to_string(index=False))
+    return leaderboard
+
+def train_tuned_model(file_paths, row, n_jobs=-1, chunk_rows=1000000, max_bin=256):
+    # Refit a leaderboard row on all training rows and report its MSE on the held-out test rows
+    dtrain = xgboost.QuantileDMatrix(ShardIter(file_paths, 'train', chunk_rows=chunk_rows), max_bin=max_bin,
+                                     nthread=n_jobs)
+    dtest = xgboost.QuantileDMatrix(ShardIter(file_paths, 'test', chunk_rows=chunk_rows), ref=dtrain,
+                                    nthread=n_jobs)
+    params = {name: row[name] for name in TUNING_SPACE}
+    params = dict(params, max_depth=int(params['max_depth']), objective='reg:squarederror', tree_method='hist',
+                  eval_metric='rmse', max_bin=max_bin, nthread=n_jobs)
+    evals_result = {}
+    booster = xgboost.train(params, dtrain, num_boost_round=int(row['n_estimators']), evals=[(dtest, 'test')],
+                            evals_result=evals_result, verbose_eval=False)
+    mse = evals_result['test']['rmse'][-1] ** 2
+    print(f"Model with {int(row['n_estimators'])} trees. Mean Squared Error on test set: {mse}")
+    return booster, mse
+
+# Step 4: Save the trained model in XGBoost's native format (.ubj or .json)
 def save_model(model, file_path):
-    joblib.dump(model, file_path)
+    model.save_model(file_path)
     print(f"Model saved to {file_path}")
 
-# Step 5: Load the trained model
+# Step 4b: Export the trees as flat arrays for mmi.core.FlatForest, which scores without xgboost
+def export_flat_model(model, file_path):
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    booster = learner["gradient_booster"]
+    if booster["name"] != "gbtree" or learner["objective"]["name"] != "reg:squarederror":
+        raise ValueError("Only gbtree models with the reg:squarederror objective can be exported")
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+    feature, threshold, left, default_left, value, roots = [], [], [], [], [], []
+    max_depth = 0
+    for tree in booster["model"]["trees"]:
+        roots.append(len(feature))
+        # Breadth-first relayout so the two children of a split always sit next to each other
+        order, depth = [0], {0: 0}
+        for node in order:
+            if tree["left_children"][node] != -1:
+                for child in (tree["left_children"][node], tree["right_children"][node]):
+                    order.append(child)
+                    depth[child] = depth[node] + 1
+        position = {node: roots[-1] + i for i, node in enumerate(order)}
+        for node in order:
+            left_child = tree["left_children"][node]
+            if left_child == -1:
+                # Leaves loop back to themselves so every tree can be walked for max_depth steps
+                feature.append(0)
+                threshold.append(np.inf)
+                left.append(position[node])
+                default_left.append(True)
+                value.append(tree["split_conditions"][node])
+            else:
+                feature.append(tree["split_indices"][node])
+                threshold.append(tree["split_conditions"][node])
+                left.append(position[left_child])
+                default_left.append(bool(tree["default_left"][node]))
+                value.append(0.0)
+        max_depth = max(max_depth, max(depth.values()))
+
+    np.savez_compressed(
+        file_path,
+        feature=np.array(feature, dtype=np.int32), threshold=np.array(threshold, dtype=np.float32),
+        left=np.array(left, dtype=np.int32), default_left=np.array(default_left, dtype=bool),
+        value=np.array(value, dtype=np.float32), roots=np.array(roots, dtype=np.int32),
+        base_score=np.float32(base_score), max_depth=max_depth)
+    print(f"Flat model exported to {file_path}")
+
+# Step 5: Load the trained model; native .ubj/.json files, or older joblib pickles
 def load_model(file_path):
+    if os.path.splitext(file_path)[1].lower() in ('.ubj', '.json'):
+        model = XGBRegressor()
+        model.load_model(file_path)
+        return model
     model = joblib.load(file_path)
     return model
 
 # Step 6: Predict using the trained model
+def predict_batch(model, x, R, q, lambda_):
+    # Scalars broadcast against arrays; everything is scored in one booster call
+    columns = np.broadcast_arrays(*(np.asarray(value, dtype=np.float32) for value in (x, R, q, lambda_)))
+    input_data = np.empty((columns[0].size, 4), dtype=np.float32)
+    for i, column in enumerate(columns):
+        input_data[:, i] = column.ravel()
+    return model.predict(input_data).reshape(columns[0].shape)
+
 def predict(model, x, R, q, lambda_):
-    input_data = pd.DataFrame([[x, R, q, lambda_]], columns=['x', 'R', 'q', 'lambda'])
-    y_pred = model.predict(input_data)
-    return y_pred[0]
+    return predict_batch(model, x, R, q, lambda_).item()
 
 # Step 7: Apply Smoothing Function
 def smooth_predictions(y_values, alpha=0.1):
@@ -65,41 +302,74 @@ def plot_relationship(x_values, y_values):
 
 # Main script
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or tune the alpha model on Excel, CSV or Parquet files.")
+    subparsers = parser.add_subparsers(dest='command')
+    train_parser = subparsers.add_parser('train', help="train with the current parameters (the default)")
+    tune_parser = subparsers.add_parser('tune', help="cross-validated hyperparameter search")
+    for subparser in (train_parser, tune_parser):
+        subparser.add_argument('files', nargs='*', default=['sample.xlsx'],
+                               help="training files (default: sample.xlsx)")
+        subparser.add_argument('--chunk-rows', type=int, default=1000000, help="rows read per chunk")
+    train_parser.add_argument('--n-jobs', type=int, default=-1, help="training threads, all cores by default")
+    train_parser.add_argument('--external-memory', action='store_true',
+                              help="page the quantized training data to disk instead of keeping it in memory")
+    tune_parser.add_argument('--trials', type=int, default=24, help="candidates to evaluate, the baseline included")
+    tune_parser.add_argument('--folds', type=int, default=5, help="cross-validation folds")
+    tune_parser.add_argument('--workers', type=int, help="worker threads, one per core by default")
+    tune_parser.add_argument('--n-jobs', type=int, help="training threads per worker, cores / workers by default")
+    tune_parser.add_argument('--early-stopping-rounds', type=int, default=50,
+                             help="stop a fold once validation MSE has not improved for this many rounds")
+    tune_parser.add_argument('--leaderboard', default='tuning_leaderboard.csv', help="leaderboard CSV to write")
+    args = parser.parse_args()
+
     # File paths
-    excel_file_path = 'sample.xlsx'  # Update this path to your actual Excel file
-    model_file_path = 'xgboost_model.pkl'
-
-    # Step 1: Read the data
-    df = read_excel(excel_file_path)
-
-    # Step 2: Preprocess the data
-    X, y = preprocess_data(df)
-
-    # Step 3: Train the model
-    model = train_model(X, y)
-
-    # Step 4: Save the model
-    save_model(model, model_file_path)
-
-    # For user input and prediction
-    # Load the trained model
-    model = load_model(model_file_path)
-
-    # User input for R, q, and lambda
-    R_input = 1.5 # float(input("Enter value for R: "))
-    q_input = 1.75 # float(input("Enter value for q: "))
-    lambda_input = 0.5238 # float(input("Enter value for lambda: "))
-    x_value = 6.86
-    y_pred = predict(model, x_value, R_input, q_input, lambda_input)
-    #smoothed_y_pred = smooth_predictions(y_pred)
-    # print(f"{y_pred:.2f}")
-
-    # Predict and store the output for x from 1 to 100
-    x_values = np.linspace(1, 100, 100)  # Using np.linspace for smoother plot
-    y_values = [predict(model, x, R_input, q_input, lambda_input) for x in x_values]
-    #
-    # Apply smoothing to the predicted values
-    smoothed_y_values = smooth_predictions(y_values)
-    #
-    # Plot the relationship between x and predicted y
-    plot_relationship(x_values, smoothed_y_values)
+    model_file_path = 'xgboost_model.ubj'
+    flat_model_file_path = 'xgboost_model.npz'
+
+    if args.command == 'tune':
+        # The tuned model is written next to the current one, which it does not replace
+        leaderboard = tune_model(args.files, n_trials=args.trials, n_folds=args.folds, workers=args.workers,
+                                 n_jobs=args.n_jobs, chunk_rows=args.chunk_rows,
+                                 early_stopping_rounds=args.early_stopping_rounds, leaderboard_path=args.leaderboard)
+        baseline_model, baseline_mse = train_tuned_model(
+            args.files, dict(leaderboard[leaderboard['baseline']].iloc[0], n_estimators=2000),
+            chunk_rows=args.chunk_rows)
+        model, mse = train_tuned_model(args.files, leaderboard.iloc[0], chunk_rows=args.chunk_rows)
+        print(f"Tuned: {model.num_boosted_rounds()} trees, MSE {mse}; "
+              f"current: {baseline_model.num_boosted_rounds()} trees, MSE {baseline_mse}")
+        save_model(model, 'xgboost_model_tuned.ubj')
+        export_flat_model(model, 'xgboost_model_tuned.npz')
+    else:
+        if args.command is None:
+            args = train_parser.parse_args([])
+
+        # Steps 1-3: Stream the data and train the model
+        model = train_model_streaming(args.files, n_jobs=args.n_jobs, chunk_rows=args.chunk_rows,
+                                      external_memory=args.external_memory)
+
+        # Step 4: Save the model
+        save_model(model, model_file_path)
+        export_flat_model(model, flat_model_file_path)
+
+        # For user input and prediction
+        # Load the trained model
+        model = load_model(model_file_path)
+
+        # User input for R, q, and lambda
+        R_input = 1.5 # float(input("Enter value for R: "))
+        q_input = 1.75 # float(input("Enter value for q: "))
+        lambda_input = 0.5238 # float(input("Enter value for lambda: "))
+        x_value = 6.86
+        y_pred = predict(model, x_value, R_input, q_input, lambda_input)
+        #smoothed_y_pred = smooth_predictions(y_pred)
+        # print(f"{y_pred:.2f}")
+
+        # Predict and store the output for x from 1 to 100
+        x_values = np.linspace(1, 100, 100)  # Using np.linspace for smoother plot
+        y_values = predict_batch(model, x_values, R_input, q_input, lambda_input)
+        #
+        # Apply smoothing to the predicted values
+        smoothed_y_values = smooth_predictions(y_values)
+        #
+        # Plot the relationship between x and predicted y
+        plot_relationship(x_values, smoothed_y_values)
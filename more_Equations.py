@@ -1,19 +1,83 @@
 import pandas as pd
 import numpy as np
 from scipy.optimize import curve_fit
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import matplotlib.pyplot as plt
 
+# Every (q, R, lambda) combination gets its own curve of y over x
+GROUP_KEYS = ['q', 'R', 'lambda']
+SURROGATE_COLUMNS = GROUP_KEYS + ['L', 'k', 'x0', 'rmse', 'n', 'converged']
+
 # Logistic function definition
 def logistic_func(x, L, k, x0):
     return L / (1 + np.exp(-k * (x - x0)))
 
 # Function to fit logistic curve and generate equation string
-def fit_logistic_curve(x_data, y_data):
-    popt, _ = curve_fit(logistic_func, x_data, y_data, maxfev=10000)
+def fit_logistic_curve(x_data, y_data, p0=None):
+    popt, _ = curve_fit(logistic_func, x_data, y_data, p0=p0, maxfev=10000)
     L, k, x0 = popt
     equation = f"y = {L:.4f} / (1 + exp(-{k:.4f} * (x - {x0:.4f})))"
     return popt, equation
 
+# Closed-form starting point of every group at once: L just above the group's largest y,
+# then k and x0 from a least-squares line through the logit log(y / (L - y)) = k * (x - x0)
+def estimate_initial_params(x, y, group, n_groups):
+    L = np.full(n_groups, -np.inf)
+    np.maximum.at(L, group, y)
+    L = np.where(L > 0, L * 1.05, 1.0)
+    z = np.log(np.clip(y / (L[group] - y), 1e-12, None))
+    n = np.bincount(group, minlength=n_groups)
+    sum_x = np.bincount(group, x, n_groups)
+    sum_z = np.bincount(group, z, n_groups)
+    sum_xx = np.bincount(group, x * x, n_groups)
+    sum_xz = np.bincount(group, x * z, n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = n * sum_xx - sum_x ** 2
+        k = np.where(variance > 0, (n * sum_xz - sum_x * sum_z) / variance, 0.0)
+        k = np.where(np.abs(k) > 1e-6, k, 1e-6)
+        x0 = (sum_x - sum_z / k) / n
+    return np.column_stack([L, k, x0])
+
+# Fit one group from its seed; a group that does not converge keeps the seed
+def fit_group(arguments):
+    x_data, y_data, p0 = arguments
+    try:
+        popt, _ = fit_logistic_curve(x_data, y_data, p0)
+        converged = True
+    except (RuntimeError, ValueError):
+        popt, converged = np.asarray(p0), False
+    rmse = float(np.sqrt(np.mean((logistic_func(x_data, *popt) - y_data) ** 2)))
+    return popt, rmse, converged
+
+# Fit every (q, R, lambda) group across a process pool and return the (L, k, x0) table
+def fit_surrogate_table(df, workers=None):
+    groups = df.groupby(GROUP_KEYS, sort=True)
+    keys = groups.size().index.to_frame(index=False)
+    group = groups.ngroup().to_numpy()
+    x = df['x'].to_numpy(np.float64)
+    y = df['y'].to_numpy(np.float64)
+    p0 = estimate_initial_params(x, y, group, len(keys))
+
+    order = np.argsort(group, kind='stable')
+    bounds = np.cumsum(np.bincount(group, minlength=len(keys)))[:-1]
+    tasks = [(x_group, y_group, seed) for x_group, y_group, seed
+             in zip(np.split(x[order], bounds), np.split(y[order], bounds), p0)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fit_group, tasks, chunksize=max(1, len(tasks) // (4 * (workers or 8)))))
+
+    table = keys.copy()
+    table[['L', 'k', 'x0']] = np.array([popt for popt, _, _ in results])
+    table['rmse'] = [rmse for _, rmse, _ in results]
+    table['n'] = np.bincount(group, minlength=len(keys))
+    table['converged'] = [converged for _, _, converged in results]
+    return table[SURROGATE_COLUMNS]
+
+# Save the table read by mmi.surrogate.LogisticSurrogate
+def save_surrogate_table(table, file_path):
+    table.to_csv(file_path, index=False, float_format='%.10g')
+    print(f"Surrogate table of {len(table)} groups saved to {file_path}")
+
 # Function to plot the fitted logistic curve
 def plot_logistic_fit(x_data, y_data, popt, label):
     plt.scatter(x_data, y_data, label=f'Data (q = {label})')
@@ -23,32 +87,35 @@ def plot_logistic_fit(x_data, y_data, popt, label):
 
 # Main script
 if __name__ == "__main__":
-    # File path
-    excel_file_path = 'sample.xlsx'  # Update this path to your actual Excel file
+    parser = argparse.ArgumentParser(description="Fit a logistic curve of y over x to every (q, R, lambda) group.")
+    parser.add_argument('file', nargs='?', default='sample.xlsx', help="Excel file with x, R, q, lambda and y")
+    parser.add_argument('-o', '--output', default='logistic_surrogate.csv', help="surrogate table to write")
+    parser.add_argument('--workers', type=int, help="worker processes, one per core by default")
+    parser.add_argument('--no-plot', action='store_true', help="skip the plot")
+    args = parser.parse_args()
 
     # Step 1: Read the data
-    df = pd.read_excel(excel_file_path)
-
     # Assuming the Excel file has columns 'x', 'R', 'q', 'lambda', and 'y'
-    # Group the data by 'q' value
-    curves = df.groupby('q')
-
-    # Step 2-4: Fit logistic function and print equations
-    for q_value, group in curves:
-        x_data = group['x'].values
-        y_data = group['y'].values
-        try:
-            popt, equation = fit_logistic_curve(x_data, y_data)
-            print(f"Fitted parameters for q = {q_value}: {popt}")
-            print(f"Equation for q = {q_value}: {equation}")
-            plot_logistic_fit(x_data, y_data, popt, q_value)
-        except Exception as e:
-            print(f"Could not fit logistic function for q = {q_value}: {e}")
-
-    # Step 5: Plot all curves with fitted logistic functions
+    df = pd.read_excel(args.file)
+
+    # Step 2-4: Fit every (q, R, lambda) group and save the table
+    table = fit_surrogate_table(df, args.workers)
+    save_surrogate_table(table, args.output)
+    print(f"{int(table['converged'].sum())} of {len(table)} groups converged; "
+          f"RMSE median {table['rmse'].median():.2e}, max {table['rmse'].max():.2e}")
+
+    # Step 5: Plot the fitted curves of every q value for the first (R, lambda)
+    if args.no_plot:
+        raise SystemExit(0)
+    R_value, lambda_value = table['R'].iloc[0], table['lambda'].iloc[0]
+    for row in table[(table['R'] == R_value) & (table['lambda'] == lambda_value)].itertuples():
+        group = df[(df['q'] == row.q) & (df['R'] == R_value) & (df['lambda'] == lambda_value)]
+        popt = (row.L, row.k, row.x0)
+        print(f"Equation for q = {row.q}: y = {row.L:.4f} / (1 + exp(-{row.k:.4f} * (x - {row.x0:.4f})))")
+        plot_logistic_fit(group['x'].values, group['y'].values, popt, row.q)
     plt.xlabel('x')
     plt.ylabel('y')
-    plt.title('Logistic Fit for Each q Value')
+    plt.title(f'Logistic Fit for Each q Value (R = {R_value}, lambda = {lambda_value:.4f})')
     plt.legend()
     plt.grid(True)
     plt.show()